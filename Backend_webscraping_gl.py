@@ -1,146 +1,478 @@
 import os
 import requests
 import json
+import time
+import asyncio
+import aiohttp
+from gl_http_client import GlassLewisClient
+from response_cache import ResponseCache, open_default_cache
+from output_sink import JsonFileSink, open_sink
+from scrape_metrics import get_metrics, start_run
+from crawl_checkpoint import CheckpointJournal, load_last_date_end, save_last_date_end, incremental_start_date
 
-def fetch_page_data(start_date, end_date, page_size, page_number):
-    url = 'https://votedisclosure.glasslewis.com/vote-disclosure/api/v1/Meetings'
-    headers = {
-        'User-Agent': 'Mozilla/5.0',
-        'Accept': 'application/json',
-        'Content-Type': 'application/json'
-    }
-    
-    # Create the payload according to the expected structure
-    payload = {
+try:
+    import ijson
+except ImportError:  # Streaming decode of listing pages is optional
+    ijson = None
+
+# Maximum number of meeting-detail requests in flight at once
+MAX_CONCURRENT_REQUESTS = int(os.environ.get('GL_MAX_CONCURRENCY', '10'))
+
+# Maximum number of meetings waiting between the listing producer and the detail workers
+QUEUE_SIZE = int(os.environ.get('GL_QUEUE_SIZE', '200'))
+
+# Resume interrupted runs from a checkpoint journal, and optionally only fetch meetings after the last synced window
+CHECKPOINT_ENABLED = os.environ.get('GL_CHECKPOINT', '1') == '1'
+INCREMENTAL_MODE = os.environ.get('GL_INCREMENTAL', '0') == '1'
+
+# Print every listing page in full; off by default because formatting large pages is expensive
+DEBUG_DUMP = os.environ.get('GL_DEBUG_DUMP', '0') == '1'
+
+# Decode listing pages incrementally instead of loading the whole response (needs ijson)
+STREAM_PAGES = os.environ.get('GL_STREAM_PAGES', '0') == '1'
+
+_default_client = None
+
+def get_default_client():
+    """Return the process-wide client so every call shares one connection pool."""
+    global _default_client
+    if _default_client is None:
+        _default_client = GlassLewisClient()
+    return _default_client
+
+# Fund IDs queried on every Meetings listing request
+FUND_IDS = [
+    1781, 1875, 1912, 1876, 1861, 1826, 1813, 1823, 4804, 1816,
+    1820, 1833, 1834, 1782, 1878, 1872, 1806, 1807, 1812, 1786,
+    1815, 1923, 1800, 1802, 1797, 1943, 1944, 1942, 1882, 1884,
+    7058, 5367, 1818, 1837, 2375, 5947, 1810, 1805, 1914, 5948,
+    1915, 5949, 1916, 5952, 1917, 5955, 1918, 5956, 1919, 5957,
+    1920, 5958, 4167, 5959, 4168, 5960, 4169, 5961, 5962, 5963,
+    7279, 7280, 1866, 1839, 1864, 3297, 5964, 6165, 6166, 6167,
+    1887, 1888, 5368, 4026, 4027, 4028
+]
+
+# Point GL_API_BASE at a local stand-in (see mock_gl_server.py) to run without the live site
+API_BASE = os.environ.get('GL_API_BASE', 'https://votedisclosure.glasslewis.com/vote-disclosure/api/v1')
+MEETINGS_URL = f'{API_BASE}/Meetings'
+SITE_ID = os.environ.get('GL_SITE_ID', 'CSIM')
+
+PAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0',
+    'Accept': 'application/json',
+    'Content-Type': 'application/json'
+}
+
+def build_page_payload(start_date, end_date, page_size, page_number, funds=None):
+    """Create the Meetings listing payload according to the expected structure."""
+    return {
         "companySearch": "",
         "dateEnd": end_date + "T23:59:59",
         "dateStart": start_date,
-        "funds": [
-            1781, 1875, 1912, 1876, 1861, 1826, 1813, 1823, 4804, 1816,
-            1820, 1833, 1834, 1782, 1878, 1872, 1806, 1807, 1812, 1786,
-            1815, 1923, 1800, 1802, 1797, 1943, 1944, 1942, 1882, 1884,
-            7058, 5367, 1818, 1837, 2375, 5947, 1810, 1805, 1914, 5948,
-            1915, 5949, 1916, 5952, 1917, 5955, 1918, 5956, 1919, 5957,
-            1920, 5958, 4167, 5959, 4168, 5960, 4169, 5961, 5962, 5963,
-            7279, 7280, 1866, 1839, 1864, 3297, 5964, 6165, 6166, 6167,
-            1887, 1888, 5368, 4026, 4027, 4028
-        ],
+        "funds": funds if funds is not None else FUND_IDS,
         "pagination": {
             "pageNumber": page_number,
             "pageSize": page_size
         },
-        "siteId": "CSIM",
+        "siteId": SITE_ID,
         "sorting": {
             "column": "companyName",
             "direction": "asc"
         }
     }
 
-    # Make the POST request
-    response = requests.post(url, headers=headers, json=payload)
-    
+def fetch_page_data(start_date, end_date, page_size, page_number, client=None):
+    payload = build_page_payload(start_date, end_date, page_size, page_number)
+
+    # Make the POST request (retried with backoff by the client)
+    client = client or get_default_client()
+    try:
+        response = client.request('POST', MEETINGS_URL, headers=PAGE_HEADERS, json=payload)
+    except requests.RequestException as e:
+        print(f"Error fetching page data: {e}")
+        return None
+
     if not response.ok:
         print(f"Error fetching page data: {response.status_code} - {response.text}")
         return None
-    
+
     return response.json()
 
-def fetch_meeting_data(meeting_id, fund_ids):
-    """Fetch meeting data for a specific meeting ID and multiple fund IDs."""
+async def fetch_page_data_async(client, start_date, end_date, page_size, page_number, funds=None):
+    """Fetch one page of the Meetings listing over the client's async session."""
+    payload = build_page_payload(start_date, end_date, page_size, page_number, funds)
+
+    try:
+        response, body = await client.request_async('POST', MEETINGS_URL, headers=PAGE_HEADERS, json=payload)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Error fetching page data: {e}")
+        return None
+
+    if not response.ok:
+        print(f"Error fetching page data: {response.status} - {body.decode('utf-8', 'replace')}")
+        return None
+
+    return json.loads(body)
+
+class ListingError(Exception):
+    """Raised when a Meetings listing page cannot be fetched or decoded."""
+
+async def iter_page_meetings(client, start_date, end_date, page_size, page_number, funds=None, stream=STREAM_PAGES):
+    """Yield the meetings on one listing page, one at a time.
+
+    In streaming mode the response body is decoded incrementally with ijson, so
+    the decoded page never exists in memory as a whole. The listing_fetch stage
+    only counts time spent here, not time the consumer holds a meeting.
+    """
+    busy = 0.0
+    resumed = time.perf_counter()
+    try:
+        if not stream or ijson is None:
+            page_data = await fetch_page_data_async(client, start_date, end_date, page_size, page_number, funds)
+            if page_data is None:
+                raise ListingError(f"page {page_number} could not be fetched")
+            for meeting in page_data:
+                busy += time.perf_counter() - resumed
+                yield meeting
+                resumed = time.perf_counter()
+            return
+
+        payload = build_page_payload(start_date, end_date, page_size, page_number, funds)
+        try:
+            async with client.stream_async('POST', MEETINGS_URL, headers=PAGE_HEADERS, json=payload) as response:
+                if not response.ok:
+                    raise ListingError(f"{response.status} - {await response.text()}")
+                async for meeting in ijson.items_async(response.content, 'item', use_float=True):
+                    busy += time.perf_counter() - resumed
+                    yield meeting
+                    resumed = time.perf_counter()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ijson.JSONError) as e:
+            raise ListingError(str(e))
+    finally:
+        busy += time.perf_counter() - resumed
+        get_metrics().observe('listing_fetch', busy)
+
+def build_meeting_url(meeting_id, fund_ids, site_id=SITE_ID):
+    """Build the meeting-detail URL for a meeting ID and its fund IDs."""
     fund_id_params = "&".join([f"fundId={fund_id}" for fund_id in fund_ids])
-    url = f'https://votedisclosure.glasslewis.com/vote-disclosure/api/v1/Meetings/{meeting_id}?siteId=CSIM&{fund_id_params}'
+    return f'{MEETINGS_URL}/{meeting_id}?siteId={site_id}&{fund_id_params}'
+
+def cache_lookup(cache, meeting_id, fund_ids):
+    """Return ``(key, cached_entry, request_headers)`` for a meeting-detail request."""
     headers = {
         'User-Agent': 'Mozilla/5.0',
         'Accept': 'application/json'
     }
+    if cache is None:
+        return None, None, headers
+
+    key = ResponseCache.make_key(meeting_id, fund_ids)
+    cached = cache.get(key)
 
-    response = requests.get(url, headers=headers)
+    # Revalidate stale entries with a conditional request when the server gave us validators
+    if cached and not cached['fresh']:
+        if cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+    return key, cached, headers
+
+def fetch_meeting_data(meeting_id, fund_ids, client=None, cache=None):
+    """Fetch meeting data for a specific meeting ID and multiple fund IDs."""
+    key, cached, headers = cache_lookup(cache, meeting_id, fund_ids)
+    if cached and cached['fresh']:
+        return json.loads(cached['body'])
+
+    url = build_meeting_url(meeting_id, fund_ids)
+    client = client or get_default_client()
+    metrics = get_metrics()
+    try:
+        with metrics.stage('detail_fetch'):
+            response = client.request('GET', url, headers=headers)
+    except requests.RequestException as e:
+        print(f"Error fetching meeting data for Meeting ID {meeting_id}: {e}")
+        return None
+
+    if response.status_code == 304 and cached:
+        cache.touch(key)
+        return json.loads(cached['body'])
 
     if response.ok:
+        if cache is not None:
+            cache.put(key, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
         return response.json()
     else:
         print(f"Failed to fetch meeting data for Meeting ID {meeting_id} with Fund IDs {fund_ids}. Status code: {response.status_code}")
         return None
 
-def save_data_to_json(data, directory, filename):
-    """Save the given data to a JSON file in the specified directory."""
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-    
-    file_path = os.path.join(directory, filename)
-    with open(file_path, 'w') as json_file:
-        json.dump(data, json_file, indent=4)
-    
-    print(f"Data saved to {file_path}")
-
-def load_cache_mapping(filename):
-    """Load the cache mapping from a JSON file."""
-    with open(filename, 'r') as json_file:
-        return json.load(json_file)
-
-# Dynamic inputs
-start_date = input("Enter start date (YYYY-MM-DD): ")
-end_date = input("Enter end date (YYYY-MM-DD): ")
-page_size = int(input("Enter page Data size: "))
-total_pages = int(input("Enter total number of pages: "))
-internalcode = input("Enter internal code: ")
-month = input("Enter month: ")
-source = input("Enter source: ")
-base_path = input("Enter the base path to save files: ")
-
-# Fetch page data using a for loop
-for page_number in range(1, total_pages + 1):
-    page_data = fetch_page_data(start_date, end_date, page_size, page_number)
-
-    # Debugging: Print the full response
-    print(f"Fetching page {page_number}...")
-    if page_data:
-        print(json.dumps(page_data, indent=4))  # Print the full response for debugging
-        
-        # Save the page data with dynamic file name
-        page_filename = f'PageData_{internalcode}_{month}_PG{page_number}_{source}.json'
-        save_data_to_json(page_data, base_path, page_filename)
-
-        # Create cache mapping for meetingId and fundId
-        cache_mapping = {}
-
-        # Iterate over page_data since it's a list
-        for meeting in page_data:
-            meeting_id = meeting.get("meetingId")
-            funds = meeting.get("funds", [])
-            
-            if meeting_id:
-                # Initialize an empty list for this meetingId in the cache
-                cache_mapping[meeting_id] = []
-                
-                # Populate the list with fundIds
-                for fund in funds:
-                    fund_id = fund.get("fundId")
-                    if fund_id:
-                        cache_mapping[meeting_id].append(fund_id)
-
-        # Save the cache mapping to a JSON file in the current directory
-        save_data_to_json(cache_mapping, '.', 'meeting_fund_cache.json')
-
-        # Load the cache mapping
-        cache_mapping = load_cache_mapping('meeting_fund_cache.json')
-
-        # Iterate through the cache to fetch meeting data
-        record_number = 1  # To track the record index
-        for meeting_id, fund_ids in cache_mapping.items():
-            meeting_data = fetch_meeting_data(meeting_id, fund_ids)
-            if meeting_data:
-                meeting_filename = f'MeetData_{internalcode}_{month}_PG{page_number}_R{record_number}_{source}.json'
-                save_data_to_json(meeting_data, base_path, meeting_filename)
-                
-                # Log whether it was a single or multiple fund IDs
-                if len(fund_ids) == 1:
-                    print(f"Data saved with single fund ID to {meeting_filename}")
-                else:
-                    print(f"Data saved with multiple fund IDs to {meeting_filename}")
+async def fetch_meeting_data_async(client, meeting_id, fund_ids, cache=None, site_id=SITE_ID):
+    """Fetch meeting data for a meeting ID over the client's async session.
 
-            record_number += 1  # Increment record number after each meeting
+    Cache reads and writes are SQLite calls, so they run on a worker thread
+    rather than holding up every other request on the event loop.
+    """
+    if cache is not None:
+        key, cached, headers = await asyncio.to_thread(cache_lookup, cache, meeting_id, fund_ids)
+    else:
+        key, cached, headers = cache_lookup(cache, meeting_id, fund_ids)
+    if cached and cached['fresh']:
+        return json.loads(cached['body'])
+
+    url = build_meeting_url(meeting_id, fund_ids, site_id)
+    try:
+        with get_metrics().stage('detail_fetch'):
+            response, body = await client.request_async('GET', url, headers=headers)
+        if response.status == 304 and cached:
+            await asyncio.to_thread(cache.touch, key)
+            return json.loads(cached['body'])
+        if response.ok:
+            # Only the decode is profiled: a capture spanning an await would time the other requests too
+            with get_metrics().profile('meeting_json_decode'):
+                meeting_data = json.loads(body)
+            if cache is not None:
+                await asyncio.to_thread(cache.put, key, body, response.headers.get('ETag'),
+                                        response.headers.get('Last-Modified'))
+            return meeting_data
+        print(f"Failed to fetch meeting data for Meeting ID {meeting_id} with Fund IDs {fund_ids}. Status code: {response.status}")
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        # One failed meeting should not cancel the rest of the page
+        print(f"Error fetching meeting data for Meeting ID {meeting_id}: {e}")
+    return None
+
+def meeting_fund_ids(meeting):
+    """Return the fundIds that voted at a meeting on a listing page."""
+    return [fund.get("fundId") for fund in meeting.get("funds", []) if fund.get("fundId")]
 
+def save_meeting_record(sink, meeting_data, fund_ids, page_number, record_number, internalcode, month, source,
+                        callback=None):
+    """Queue one meeting-detail payload on the sink under its deterministic page/record file name."""
+    meeting_filename = f'MeetData_{internalcode}_{month}_PG{page_number}_R{record_number}_{source}.json'
+    sink.write(meeting_filename, meeting_data, callback)
+
+    # Log whether it was a single or multiple fund IDs
+    if len(fund_ids) == 1:
+        print(f"Data saved with single fund ID to {meeting_filename}")
     else:
-        print("No response from fetch_page_data. Exiting loop.")
-        break
+        print(f"Data saved with multiple fund IDs to {meeting_filename}")
+
+async def crawl(start_date, end_date, page_size, internalcode, month, source, base_path,
+                client=None, cache=None, journal=None, sink=None, max_concurrency=MAX_CONCURRENT_REQUESTS,
+                queue_size=QUEUE_SIZE, max_pages=None):
+    """Page through the Meetings listing and fetch meeting details in a pipeline.
+
+    A producer walks the listing until an empty or short page comes back and
+    pushes ``(page_number, record_number, meeting_id, fund_ids)`` onto a bounded
+    queue, so the next listing request overlaps with detail fetching. Record
+    numbers are assigned by the producer, so file names do not depend on which
+    worker finishes first. Meeting details are served from ``cache`` when fresh,
+    and pages and meetings already recorded in ``journal`` are skipped. Records go
+    to ``sink`` (the legacy one-file-per-record layout in ``base_path`` by default);
+    a meeting is journaled only after the sink has written it.
+
+    Returns a summary dict; ``complete`` is True only when the whole listing was
+    walked and every meeting was saved.
+    """
+    client = client or get_default_client()
+    metrics = get_metrics()
+    own_sink = sink is None
+    if own_sink:
+        sink = JsonFileSink(base_path)
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=queue_size)
+    summary = {'pages': 0, 'meetings_saved': 0, 'meetings_skipped': 0, 'meetings_failed': 0, 'complete': False}
+
+    # Record numbers still outstanding per page. A page is journaled once its listing
+    # has been read in full (its size is in page_sizes) and nothing is outstanding.
+    # Only tracked with a journal, since nothing else ever clears it.
+    pending = {}
+    page_sizes = {}
+
+    def finish_page_if_done(page_number):
+        if page_number in page_sizes and not pending.get(page_number):
+            pending.pop(page_number, None)
+            journal.record_page(page_number, page_sizes.pop(page_number))
+
+    def finish_record(page_number, record_number, meeting_id):
+        journal.record_meeting(page_number, record_number, meeting_id)
+        pending.get(page_number, set()).discard(record_number)
+        finish_page_if_done(page_number)
+
+    async def producer():
+        page_number = 1
+        while max_pages is None or page_number <= max_pages:
+            done_count = journal.page_count(page_number) if journal else None
+            if done_count is not None:
+                print(f"Page {page_number} already completed in a previous run. Skipping.")
+                if done_count < page_size:
+                    summary['complete'] = True
+                    return
+                page_number += 1
+                continue
+
+            print(f"Fetching page {page_number}...")
+            page_filename = f'PageData_{internalcode}_{month}_PG{page_number}_{source}.json'
+            if journal:
+                pending[page_number] = set()
+            seen_meetings = set()
+            meeting_count = 0
+            record_number = 0
+
+            # Meetings flow straight from the listing into the page file and onto the queue
+            try:
+                async for meeting in iter_page_meetings(client, start_date, end_date, page_size, page_number):
+                    meeting_count += 1
+                    if DEBUG_DUMP:
+                        print(json.dumps(meeting, indent=4))  # Print the full response for debugging
+                    sink.write_item(page_filename, meeting)
+
+                    meeting_id = meeting.get("meetingId")
+                    if not meeting_id or meeting_id in seen_meetings:
+                        continue
+                    seen_meetings.add(meeting_id)
+                    record_number += 1
+
+                    # Meetings saved by an earlier run keep their record numbers but are not fetched again
+                    if journal and journal.is_meeting_done(meeting_id):
+                        summary['meetings_skipped'] += 1
+                        continue
+
+                    # Blocks while the queue is full, so the listing never runs far ahead of the workers
+                    if journal:
+                        pending[page_number].add(record_number)
+                    await queue.put((page_number, record_number, meeting_id, meeting_fund_ids(meeting)))
+                    metrics.set_gauge('queue_depth', queue.qsize())
+            except ListingError as e:
+                print(f"No response from fetch_page_data ({e}). Stopping the listing.")
+                return
+
+            if meeting_count == 0:
+                print(f"Page {page_number} is empty. Listing complete.")
+                if journal:
+                    journal.record_page(page_number, 0)
+                summary['complete'] = True
+                return
+
+            sink.end_stream(page_filename)
+            summary['pages'] += 1
+            if journal:
+                page_sizes[page_number] = meeting_count
+                finish_page_if_done(page_number)
+
+            if meeting_count < page_size:
+                print(f"Page {page_number} is short ({meeting_count} < {page_size}). Listing complete.")
+                summary['complete'] = True
+                return
+            page_number += 1
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            metrics.set_gauge('queue_depth', queue.qsize())
+            try:
+                if item is None:
+                    return
+                page_number, record_number, meeting_id, fund_ids = item
+                meeting_data = await fetch_meeting_data_async(client, meeting_id, fund_ids, cache)
+                if meeting_data:
+                    callback = None
+                    if journal:
+                        # The sink calls back from its writer thread; hop back onto the event loop
+                        def callback(page_number=page_number, record_number=record_number, meeting_id=meeting_id):
+                            loop.call_soon_threadsafe(finish_record, page_number, record_number, meeting_id)
+                    save_meeting_record(sink, meeting_data, fund_ids, page_number, record_number,
+                                        internalcode, month, source, callback)
+                    summary['meetings_saved'] += 1
+                    metrics.inc('meetings_saved_total')
+                else:
+                    summary['meetings_failed'] += 1
+                    metrics.inc('meetings_failed_total')
+            finally:
+                queue.task_done()
+
+    # One extra connection so the listing request never waits behind the detail workers
+    await client.start_async(limit=max_concurrency + 1)
+    workers = [asyncio.create_task(worker()) for _ in range(max_concurrency)]
+    try:
+        await producer()
+    finally:
+        # One sentinel per worker lets them drain the queue and exit
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+        await client.close_async()
+
+        # Wait for the writer, then let the journal callbacks it scheduled run
+        await asyncio.to_thread(sink.flush)
+        await asyncio.sleep(0)
+        if own_sink:
+            sink.close()
+
+    summary['complete'] = summary['complete'] and summary['meetings_failed'] == 0
+    if summary['complete'] and journal:
+        journal.record_complete()
+    return summary
+
+def main():
+    # Dynamic inputs
+    start_date = input("Enter start date (YYYY-MM-DD): ")
+    end_date = input("Enter end date (YYYY-MM-DD): ")
+    page_size = int(input("Enter page Data size: "))
+    internalcode = input("Enter internal code: ")
+    month = input("Enter month: ")
+    source = input("Enter source: ")
+    base_path = input("Enter the base path to save files: ")
+
+    # Incremental mode only asks for meetings after the last window that finished cleanly
+    sync_key = f'{internalcode}_{source}'
+    if INCREMENTAL_MODE:
+        start_date = incremental_start_date(start_date, load_last_date_end(sync_key))
+        if start_date > end_date:
+            print(f"Already synced up to {end_date}. Nothing to fetch.")
+            return
+        print(f"Incremental mode: fetching meetings from {start_date} to {end_date}.")
+
+    metrics = start_run('backend')
+
+    if STREAM_PAGES and ijson is None:
+        print("GL_STREAM_PAGES is set but ijson is not installed. Decoding whole pages instead.")
+
+    client = get_default_client()
+    cache = open_default_cache()
+
+    sink = open_sink(base_path, f'Records_{internalcode}_{month}_{source}')
+
+    journal = None
+    if CHECKPOINT_ENABLED:
+        journal_path = os.path.join(base_path, f'checkpoint_{internalcode}_{month}_{source}.jsonl')
+        run_params = {
+            'start_date': start_date, 'end_date': end_date, 'page_size': page_size,
+            'internalcode': internalcode, 'month': month, 'source': source
+        }
+        journal = CheckpointJournal(journal_path, run_params)
+
+    # Pages are discovered automatically; the crawl stops at the first empty or short page
+    with metrics.profile('backend_main'):
+        summary = asyncio.run(crawl(start_date, end_date, page_size, internalcode, month, source, base_path,
+                                    client, cache, journal, sink))
+    sink.close()
+    print(f"Crawl summary: {json.dumps(summary)}")
+    print(f"Output summary: {json.dumps(sink.stats())}")
+
+    if journal:
+        journal.close()
+    if summary['complete']:
+        last_date_end = load_last_date_end(sync_key)
+        if not last_date_end or end_date > last_date_end:
+            save_last_date_end(sync_key, end_date)
+
+    # Report how much retrying the run needed and how much the cache saved
+    print(f"Request summary: {json.dumps(client.stats.summary())}")
+    client.close()
+    if cache is not None:
+        print(f"Cache summary: {json.dumps(cache.stats())}")
+        cache.close()
+    print(f"Metrics saved to {metrics.write()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import sys
+import json
+import time
+import random
+import argparse
+
+from iss_extract import REQUIRED_KEYS, available_extractors, get_extractor
+
+
+def synthetic_page(meetings=40, ballot_items=30, seed=1):
+    """An ISS-like document: the meeting grid, one ballot-detail grid and the edge cases the extractors must agree on.
+
+    Besides plain rows it carries hidden columns, empty cells, entities and
+    non-breaking spaces, comments and scripts inside cells, a nested table
+    and columns that are not in REQUIRED_KEYS.
+    """
+    rng = random.Random(seed)
+    parts = ['<!DOCTYPE html><html><head><title>VDS</title><script>var grid = "<td>";</script></head><body>',
+             '<div id="gview_list"><table id="list"><tbody>']
+    for index in range(meetings):
+        meeting_id = 900000 + index
+        parts.append(
+            f'<tr role="row" id="{index + 1}">'
+            f'<td aria-describedby="list_Ticker" title="T{index}">'
+            f'<a href="javascript:showMeeting(\'MTcy\',\'{meeting_id}\',\'0\')">T{index}</a></td>'
+            f'<td aria-describedby="list_Company" title="Company {index} &amp; Sons">Company {index} &amp; Sons</td>'
+            f'<td aria-describedby="list_MeetingDate" style="display:none">2023-0{index % 9 + 1}-15</td>'
+            '</tr>'
+        )
+    parts.append('</tbody></table></div>')
+
+    parts.append('<div id="gview_listDetail"><table id="listDetail"><tbody>')
+    for item in range(1, ballot_items + 1):
+        proposal = rng.choice(['Elect Director', 'Approve Remuneration Report', 'Ratify Auditors'])
+        vote = rng.choice(['For', 'Against', 'Abstain'])
+        hidden = ' style="display:none"' if item % 7 == 0 else ''
+        parts.append(
+            f'<tr role="row" id="d{item}">'
+            f'<td aria-describedby="listDetail_BallotItemNumber" title="{item}">  {item}\n</td>'
+            f'<td aria-describedby="listDetail_Proposal" title="{proposal}">{proposal}<!-- note --> <b>{item}</b></td>'
+            f'<td aria-describedby="listDetail_ShareholderProposal"{hidden}>{"Yes" if item % 5 == 0 else ""}</td>'
+            f'<td aria-describedby="listDetail_MgtRecVote">&nbsp;For&nbsp;</td>'
+            f'<td aria-describedby="listDetail_ClientVoteList" title="{vote}">{vote}<script>track({item})</script></td>'
+            f'<td aria-describedby="listDetail_Rationale">Not extracted</td>'
+            '</tr>'
+        )
+    # A detail cell inside a nested table counts for the inner and the outer row
+    parts.append(
+        '<tr role="row" id="nested"><td aria-describedby="listDetail_BallotItemNumber">99</td><td>'
+        '<table><tr><td aria-describedby="listDetail_Proposal">Nested proposal</td>'
+        '<td aria-describedby="listDetail_MgtRecVote">Against</td></tr></table></td></tr>'
+    )
+    parts.append('</tbody></table></div></body></html>')
+    return ''.join(parts)
+
+
+def time_call(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat
+
+
+def run_benchmark(page_content, repeat):
+    """Time every installed extractor on ``page_content`` and check its output against BeautifulSoup's."""
+    reference = get_extractor('bs4')
+    expected = (reference.meeting_details(page_content, 'M1'), reference.grid_page(page_content))
+
+    results = []
+    for name in available_extractors():
+        extractor = get_extractor(name)
+        matches = (extractor.meeting_details(page_content, 'M1'), extractor.grid_page(page_content)) == expected
+        detail_seconds = time_call(lambda: extractor.meeting_details(page_content, 'M1'), repeat)
+        grid_seconds = time_call(lambda: extractor.grid_page(page_content), repeat)
+        results.append({
+            'extractor': name,
+            'identical_output': matches,
+            'meeting_details_ms': round(detail_seconds * 1000, 3),
+            'grid_page_ms': round(grid_seconds * 1000, 3)
+        })
+
+    baseline = results[-1]['meeting_details_ms']  # bs4 is always installed and listed last
+    for result in results:
+        result['speedup'] = round(baseline / result['meeting_details_ms'], 1) if result['meeting_details_ms'] else None
+    return {
+        'document_bytes': len(page_content.encode('utf-8')),
+        'ballot_rows': len(expected[0]['Details']),
+        'required_keys': list(REQUIRED_KEYS),
+        'results': results
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare the ISS HTML extractors on a saved or synthetic page.')
+    parser.add_argument('--fixture', help='HTML file saved from page.content(); a synthetic page is used otherwise')
+    parser.add_argument('--meetings', type=int, default=100, help='grid rows in the synthetic page')
+    parser.add_argument('--ballot-items', type=int, default=60, help='ballot rows in the synthetic page')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.fixture:
+        with open(args.fixture, 'r', encoding='utf-8') as f:
+            page_content = f.read()
+    else:
+        page_content = synthetic_page(args.meetings, args.ballot_items)
+
+    report = run_benchmark(page_content, args.repeat)
+    print(json.dumps(report, indent=4))
+
+    # A faster extractor is only usable if it returns exactly what BeautifulSoup does
+    sys.exit(0 if all(result['identical_output'] for result in report['results']) else 1)
@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import multiprocessing
+
+from mock_gl_server import add_api_arguments, api_from_arguments, start_server
+
+
+def count_files(directory):
+    total = 0
+    for _, _, files in os.walk(directory):
+        total += len(files)
+    return total
+
+
+def run_crawl(api_base, output_dir, options, results):
+    """Child-process body: configure the backend through its environment, crawl, report metrics."""
+    os.environ['GL_API_BASE'] = api_base
+    os.environ['GL_CACHE_PATH'] = ''  # Every run must hit the server, or runs stop being comparable
+    os.environ['GL_CHECKPOINT'] = '0'
+    os.environ['GL_MAX_CONCURRENCY'] = str(options['concurrency'])
+    os.environ['GL_REQUESTS_PER_SECOND'] = str(options['requests_per_second'])
+    os.environ['GL_OUTPUT_FORMAT'] = options['output_format']
+    os.environ['GL_OUTPUT_COMPRESSION'] = options['compression']
+    os.environ['GL_STREAM_PAGES'] = '1' if options['stream'] else '0'
+
+    import asyncio
+    import Backend_webscraping_gl as backend
+    from output_sink import open_sink
+
+    # Keep per-record progress lines from skewing the timings
+    sys.stdout = open(os.devnull, 'w')
+
+    client = backend.get_default_client()
+    sink = open_sink(output_dir, 'Records_BENCH_M_SRC')
+    started = time.perf_counter()
+    summary = asyncio.run(backend.crawl(options['start_date'], options['end_date'], options['page_size'],
+                                        'BENCH', 'M', 'SRC', output_dir, client, None, None, sink))
+    sink.close()
+    elapsed = time.perf_counter() - started
+
+    requests = client.stats.summary()
+    results.put({
+        'complete': summary['complete'],
+        'meetings': summary['meetings_saved'],
+        'meetings_failed': summary['meetings_failed'],
+        'seconds': round(elapsed, 3),
+        'records_per_sec': round(summary['meetings_saved'] / elapsed, 1) if elapsed else None,
+        'requests': requests['requests'],
+        'retries': requests['retries'],
+        'latency_p50_ms': requests['latency_p50_ms'],
+        'latency_p99_ms': requests['latency_p99_ms'],
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),  # ru_maxrss is KiB on Linux
+        'files_written': count_files(output_dir),
+        'bytes_written': sink.stats()['bytes']
+    })
+
+
+def run_crawl_safely(api_base, output_dir, options, results):
+    """Report a failed run instead of leaving the parent waiting on the queue."""
+    try:
+        run_crawl(api_base, output_dir, options, results)
+    except Exception as e:
+        results.put({'complete': False, 'error': repr(e)})
+
+
+def run_benchmark(args):
+    """Start the mock API, run ``args.repeat`` crawls against it in fresh processes, return the results."""
+    api = api_from_arguments(args)
+    server, api_base = start_server(api)
+
+    # A fresh interpreter per run so peak RSS is the crawl's own, not the harness's
+    context = multiprocessing.get_context('spawn')
+    options = {
+        'start_date': args.start_date,
+        'end_date': args.end_date,
+        'page_size': args.page_size,
+        'concurrency': args.concurrency,
+        'requests_per_second': args.requests_per_second,
+        'output_format': args.output_format,
+        'compression': args.compression,
+        'stream': args.stream
+    }
+
+    runs = []
+    try:
+        for _ in range(args.repeat):
+            output_dir = tempfile.mkdtemp(prefix='gl_bench_')
+            results = context.Queue()
+            process = context.Process(target=run_crawl_safely, args=(api_base, output_dir, options, results))
+            process.start()
+            result = results.get()
+            process.join()
+            shutil.rmtree(output_dir, ignore_errors=True)
+            runs.append(result)
+    finally:
+        server.shutdown()
+
+    return {'options': options, 'server': api.counts, 'runs': runs}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark Backend_webscraping_gl.py against the local mock API.')
+    add_api_arguments(parser)
+    parser.add_argument('--start-date', default='2024-01-01')
+    parser.add_argument('--end-date', default='2024-12-31')
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--requests-per-second', type=float, default=0, help='client rate limit (0 = off)')
+    parser.add_argument('--output-format', choices=['json', 'ndjson'], default='json')
+    parser.add_argument('--compression', choices=['', 'gzip', 'zstd'], default='')
+    parser.add_argument('--stream', action='store_true', help='stream-decode listing pages (needs ijson)')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    text = json.dumps(report, indent=4)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+    # Fail CI when a run could not finish the crawl
+    sys.exit(0 if all(run['complete'] for run in report['runs']) else 1)
@@ -0,0 +1,181 @@
+import os
+import sys
+import glob
+import json
+import time
+import resource
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+try:
+    import psutil
+except ImportError:  # Optional: samples the whole browser process tree; getrusage is the fallback
+    psutil = None
+
+SAMPLE_INTERVAL = 0.25  # Seconds between process-tree samples
+SUMMARY_FILE = 'run_summary.json'  # Written by the child into its working directory
+
+# Date ranges in each scraper's own input format
+DEFAULT_DATES = {
+    'iss': ('01-Jan-2023', '30-Jan-2024'),
+    'glnew': ('01.01.2023', '01.30.2024')
+}
+
+
+def run_scraper(scraper, start_date, end_date):
+    """Child-process entry point: one scraper run writing into the current directory; returns its summary."""
+    if scraper == 'iss':
+        from frontend_webscraping_ISS import run_scraping_process
+        return run_scraping_process(start_date, end_date)
+    from frontend_webscraping_glnew import scrape_votedisclosure
+    return scrape_votedisclosure(start_date, end_date)
+
+
+def run_succeeded(summary):
+    """The scrapers log and swallow their own errors, so only a complete run without failures counts."""
+    return bool(summary) and summary.get('complete') is True and not summary.get('failed')
+
+
+class TreeSampler:
+    """CPU seconds and peak resident memory of a process and all of its descendants (needs psutil)."""
+
+    def __init__(self, pid):
+        self.root = psutil.Process(pid)
+        self.cpu = {}  # pid -> latest user+system seconds; exited processes keep their last reading
+        self.peak_rss = 0
+
+    def sample(self):
+        try:
+            processes = [self.root] + self.root.children(recursive=True)
+        except psutil.Error:
+            return
+        rss = 0
+        for process in processes:
+            try:
+                times = process.cpu_times()
+                self.cpu[process.pid] = times.user + times.system
+                rss += process.memory_info().rss
+            except psutil.Error:
+                continue
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def result(self):
+        return {'cpu_seconds': round(sum(self.cpu.values()), 2), 'peak_rss_mb': round(self.peak_rss / 2 ** 20, 1),
+                'memory_source': 'psutil process tree'}
+
+
+def measure_run(scraper, start_date, end_date, env, work_dir):
+    """Run one scraper in a child process and report wall time, pages, CPU, memory and stage timings."""
+    usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    command = [sys.executable, os.path.abspath(__file__), '--child', scraper, start_date, end_date]
+    started = time.perf_counter()
+    child = subprocess.Popen(command, cwd=work_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    sampler = TreeSampler(child.pid) if psutil is not None else None
+    while child.poll() is None:
+        if sampler is not None:
+            sampler.sample()
+        time.sleep(SAMPLE_INTERVAL)
+    wall_seconds = time.perf_counter() - started
+
+    if sampler is not None:
+        usage = sampler.result()
+    else:
+        # Only descendants the child waited for are counted, and ru_maxrss is the largest single process
+        usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        usage = {
+            'cpu_seconds': round((usage_after.ru_utime + usage_after.ru_stime)
+                                 - (usage_before.ru_utime + usage_before.ru_stime), 2),
+            'peak_rss_mb': round(usage_after.ru_maxrss / 1024, 1),
+            'memory_source': 'getrusage (largest single process)'
+        }
+
+    summary = None
+    summary_path = os.path.join(work_dir, SUMMARY_FILE)
+    if os.path.exists(summary_path):
+        with open(summary_path, 'r') as f:
+            summary = json.load(f)
+
+    pages = len(glob.glob(os.path.join(work_dir, 'page_data_*.json')))
+    meetings = len(glob.glob(os.path.join(work_dir, 'meeting_data_*.json')))
+    metrics_path = os.path.join(env['SCRAPE_METRICS_DIR'], f'{scraper}_metrics.json')
+    metrics = {}
+    if os.path.exists(metrics_path):
+        with open(metrics_path, 'r') as f:
+            metrics = json.load(f)
+
+    return {
+        'exit_code': child.returncode,
+        'summary': summary,
+        'wall_seconds': round(wall_seconds, 2),
+        'pages': pages,
+        'meetings': meetings,
+        'pages_per_second': round(pages / wall_seconds, 3) if wall_seconds else None,
+        'meetings_per_second': round(meetings / wall_seconds, 3) if wall_seconds else None,
+        **usage,
+        'stages': metrics.get('stages', {}),
+        'fixture_requests': {counter['labels'].get('mode'): counter['value'] for counter in metrics.get('counters', [])
+                             if counter['name'] == 'fixture_requests_total'}
+    }
+
+
+def run_benchmark(scraper, start_date, end_date, fixture_dir, mode='replay', repeat=3, latency_ms=0, jitter_ms=0):
+    """Run ``scraper`` ``repeat`` times against the fixture archive and summarise the runs.
+
+    Every run starts cold in a fresh directory (no saved session), so runs
+    differ only in the code under test. ``mode='record'`` does a live run
+    that fills the archive instead.
+    """
+    env = dict(os.environ, SCRAPE_FIXTURE_MODE=mode, SCRAPE_FIXTURE_DIR=os.path.abspath(fixture_dir),
+               SCRAPE_REPLAY_LATENCY_MS=str(latency_ms), SCRAPE_REPLAY_JITTER_MS=str(jitter_ms),
+               SCRAPE_SESSION_MAX_AGE='0', SCRAPE_BROWSER_ENDPOINT='',
+               PYTHONPATH=os.pathsep.join(filter(None, [os.path.dirname(os.path.abspath(__file__)),
+                                                        os.environ.get('PYTHONPATH')])))
+    runs = []
+    for _ in range(1 if mode == 'record' else repeat):
+        with tempfile.TemporaryDirectory() as work_dir:
+            env['SCRAPE_METRICS_DIR'] = os.path.join(work_dir, 'metrics')
+            runs.append(measure_run(scraper, start_date, end_date, env, work_dir))
+
+    def median(field):
+        values = [run[field] for run in runs if run[field] is not None]
+        return round(statistics.median(values), 3) if values else None
+
+    return {
+        'scraper': scraper,
+        'mode': mode,
+        'latency_ms': latency_ms,
+        'jitter_ms': jitter_ms,
+        'runs': runs,
+        'median': {field: median(field) for field in ('wall_seconds', 'pages_per_second', 'meetings_per_second',
+                                                      'cpu_seconds', 'peak_rss_mb')}
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == '--child':
+        run_summary = run_scraper(*sys.argv[2:])
+        with open(SUMMARY_FILE, 'w') as f:
+            json.dump(run_summary, f)
+        sys.exit(0 if run_succeeded(run_summary) else 1)
+
+    parser = argparse.ArgumentParser(description='Benchmark a browser scraper offline against a recorded archive.')
+    parser.add_argument('scraper', choices=sorted(DEFAULT_DATES))
+    parser.add_argument('--fixtures', default='fixtures', help='archive directory (SCRAPE_FIXTURE_DIR)')
+    parser.add_argument('--record', action='store_true', help='do one live run that records the archive')
+    parser.add_argument('--start-date', help="in the scraper's own date format")
+    parser.add_argument('--end-date')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay added to every replayed response')
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    default_start, default_end = DEFAULT_DATES[args.scraper]
+    report = run_benchmark(args.scraper, args.start_date or default_start, args.end_date or default_end,
+                           args.fixtures, 'record' if args.record else 'replay', args.repeat, args.latency_ms,
+                           args.jitter_ms)
+    print(json.dumps(report, indent=4))
+
+    # A run that crashed or did not complete measured nothing
+    sys.exit(0 if all(run['exit_code'] == 0 for run in report['runs']) else 1)
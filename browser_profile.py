@@ -0,0 +1,103 @@
+import os
+from urllib.parse import urlparse
+
+from replay_fixtures import attach_fixtures, attach_fixtures_async
+from scrape_metrics import get_metrics
+
+HEADLESS = os.environ.get('SCRAPE_HEADLESS', '1') == '1'
+LEAN = os.environ.get('SCRAPE_LEAN', '1') == '1'  # Abort assets the scrapers never read
+
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font', 'stylesheet'}
+TRACKER_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'hotjar.com', 'segment.io', 'segment.com', 'clarity.ms', 'facebook.net', 'newrelic.com', 'nr-data.net',
+    'mixpanel.com', 'fullstory.com', 'intercom.io', 'cookielaw.org', 'onetrust.com'
+)
+
+# Aborted requests never report a size, so bytes saved are estimated from typical asset sizes
+ESTIMATED_BYTES = {'image': 25000, 'media': 250000, 'font': 40000, 'stylesheet': 20000, 'tracker': 30000}
+
+def is_tracker(url):
+    host = urlparse(url).hostname or ''
+    return any(host == tracker or host.endswith('.' + tracker) for tracker in TRACKER_HOSTS)
+
+
+def block_reason(request):
+    """Why the lean profile drops ``request``, or None to let it through.
+
+    Tracker hosts are dropped whatever the request type, since analytics beacons
+    are sent as fetch too; other XHR, fetch and document requests always pass.
+    """
+    if is_tracker(request.url):
+        return 'tracker'
+    if request.resource_type in ('xhr', 'fetch', 'document'):
+        return None
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        return request.resource_type
+    return None
+
+
+def record_blocked(reason):
+    metrics = get_metrics()
+    metrics.inc('blocked_requests_total', type=reason)
+    metrics.inc('blocked_bytes_estimate_total', ESTIMATED_BYTES.get(reason, 0))
+
+
+def lean_route(route):
+    reason = block_reason(route.request)
+    if reason is None:
+        route.fallback()  # On to the fixture route when one is attached, else to the network
+    else:
+        record_blocked(reason)
+        route.abort()
+
+
+def blocked_summary(metrics=None):
+    """Blocked request counts by type plus the estimated bytes they would have cost.
+
+    The counts live on the run's Metrics, so ``start_run`` resets them and
+    back-to-back runs in one process each report their own.
+    """
+    counts = (metrics or get_metrics()).counts_by('blocked_requests_total', 'type')
+    return {
+        'blocked': counts,
+        'blocked_total': sum(counts.values()),
+        'bytes_saved_estimate': sum(ESTIMATED_BYTES.get(reason, 0) * count for reason, count in counts.items())
+    }
+
+
+def launch_browser(playwright, headless=HEADLESS):
+    return playwright.chromium.launch(headless=headless)
+
+
+def new_page(target, lean=LEAN):
+    """Open a page on a browser or context with metrics attached and, in lean mode, asset blocking.
+
+    Routes are set on the page rather than the context because
+    ``browser.new_page()`` gives every page a context of its own.
+    """
+    page = target.new_page()
+    get_metrics().instrument_page(page)
+    attach_fixtures(page)
+    if lean:
+        page.route('**/*', lean_route)
+    return page
+
+
+async def lean_route_async(route):
+    reason = block_reason(route.request)
+    if reason is None:
+        await route.fallback()
+    else:
+        record_blocked(reason)
+        await route.abort()
+
+
+async def new_page_async(target, lean=LEAN):
+    """``new_page`` for the async Playwright API."""
+    page = await target.new_page()
+    get_metrics().instrument_page(page)
+    await attach_fixtures_async(page)
+    if lean:
+        await page.route('**/*', lean_route_async)
+    return page
@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import threading
+
+from playwright.sync_api import sync_playwright
+
+from browser_profile import HEADLESS, launch_browser
+from scrape_metrics import get_metrics
+
+# A long-lived browser to attach to instead of launching one per run: a CDP URL such as the one
+# ``python browser_session.py`` prints (http://127.0.0.1:9222), or a Playwright server's ws:// endpoint
+BROWSER_ENDPOINT = os.environ.get('SCRAPE_BROWSER_ENDPOINT', '')
+BROWSER_CDP_PORT = int(os.environ.get('SCRAPE_BROWSER_CDP_PORT', '9222'))
+
+# Saved cookies, local storage and applied filters, one file per scraper
+SESSION_DIR = os.environ.get('SCRAPE_SESSION_DIR', 'sessions')
+SESSION_MAX_AGE = float(os.environ.get('SCRAPE_SESSION_MAX_AGE', '43200'))  # Seconds; 0 never reuses a session
+
+
+def attach(browser_type):
+    if BROWSER_ENDPOINT.startswith('ws'):
+        return browser_type.connect(BROWSER_ENDPOINT)
+    return browser_type.connect_over_cdp(BROWSER_ENDPOINT)
+
+
+def connect_browser(playwright):
+    """Attach to the long-lived browser when one is configured and reachable, else launch a fresh one.
+
+    ``close()`` on an attached browser only drops this run's contexts and
+    disconnects, so the browser stays up for the next run.
+    """
+    if BROWSER_ENDPOINT:
+        try:
+            browser = attach(playwright.chromium)
+            get_metrics().inc('browser_starts_total', kind='attached')
+            return browser
+        except Exception as e:
+            print(f"Could not attach to {BROWSER_ENDPOINT} ({e}); launching a new browser.")
+    get_metrics().inc('browser_starts_total', kind='launched')
+    return launch_browser(playwright)
+
+
+async def connect_browser_async(playwright):
+    """Async counterpart of ``connect_browser``."""
+    if BROWSER_ENDPOINT:
+        try:
+            browser = await attach(playwright.chromium)
+            get_metrics().inc('browser_starts_total', kind='attached')
+            return browser
+        except Exception as e:
+            print(f"Could not attach to {BROWSER_ENDPOINT} ({e}); launching a new browser.")
+    get_metrics().inc('browser_starts_total', kind='launched')
+    return await launch_browser(playwright)
+
+
+class SavedSession:
+    """A scraper's ``storage_state`` plus the URL it reached with its filters applied.
+
+    ``load`` only returns a session saved for the same ``filters`` within
+    SESSION_MAX_AGE, so a run with other dates starts from the landing page
+    as before. The scraper still checks the restored page shows its filters
+    before skipping the setup clicks.
+    """
+
+    def __init__(self, name, filters, directory=SESSION_DIR, max_age=SESSION_MAX_AGE):
+        self.path = os.path.join(directory, f'{name}.json')
+        self.filters = filters
+        self.max_age = max_age
+        self.state = self.load()
+
+    def load(self):
+        if self.max_age <= 0 or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except ValueError:
+            return None
+        if state.get('filters') != self.filters or time.time() - state.get('saved_at', 0) > self.max_age:
+            return None
+        return state
+
+    @property
+    def url(self):
+        return self.state['url'] if self.state else None
+
+    def new_context(self, browser):
+        """A context carrying the saved cookies and local storage, or a clean one."""
+        return browser.new_context(storage_state=self.state['storage_state'] if self.state else None)
+
+    def save(self, page):
+        """Remember the page's URL and storage once its filters are applied."""
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        state = {
+            'filters': self.filters,
+            'url': page.url,
+            'storage_state': page.context.storage_state(),
+            'saved_at': time.time()
+        }
+        temporary_path = f'{self.path}.{os.getpid()}.tmp'  # Shard processes may save at once
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temporary_path, self.path)
+        self.state = state
+
+
+class StartupClock:
+    """Time from the start of a run to the first listing row, reported per warm/cold start."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.warm = False
+        self.elapsed = None
+
+    def first_row(self):
+        if self.elapsed is not None:
+            return
+        self.elapsed = time.perf_counter() - self.started
+        kind = 'warm' if self.warm else 'cold'
+        get_metrics().observe(f'startup_to_first_row_{kind}', self.elapsed)
+        print(f"Startup to first row ({kind} session): {self.elapsed:.2f}s")
+
+
+def serve_browser(port=BROWSER_CDP_PORT, headless=HEADLESS):
+    """Run a browser the scrapers can attach to over CDP until interrupted."""
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless, args=[f'--remote-debugging-port={port}'])
+        print(f"Browser ready. Run the scrapers with SCRAPE_BROWSER_ENDPOINT=http://127.0.0.1:{port}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            browser.close()
+
+
+if __name__ == "__main__":
+    port = input(f"Enter the CDP port [{BROWSER_CDP_PORT}]: ") or BROWSER_CDP_PORT
+    serve_browser(int(port))
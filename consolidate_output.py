@@ -0,0 +1,248 @@
+import os
+import re
+import glob
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:  # Only needed to build and read the consolidated dataset
+    pa = None
+
+from vote_store import (GL_BROWSER_COLUMNS, ISS_COLUMNS, PAGE_DATA_PATTERN, SOURCE_GL_API, SOURCE_GL_BROWSER,
+                        SOURCE_ISS, _iso_date, _text, classify_file, gl_browser_meeting_id, iter_grid_rows, iter_ndjson,
+                        normalize_api_meeting, normalize_ballot_rows, page_data_source)
+
+CONSOLIDATE_FORMAT = os.environ.get('CONSOLIDATE_FORMAT', 'parquet')  # 'parquet' or 'arrow'
+CONSOLIDATE_WORKERS = int(os.environ.get('CONSOLIDATE_WORKERS', str(os.cpu_count() or 1)))
+CONSOLIDATE_BATCH_SIZE = int(os.environ.get('CONSOLIDATE_BATCH_SIZE', '200'))  # Files parsed per worker task
+
+# Backend file names: MeetData_{internalcode}_{month}_PG{n}_R{n}_{source} and PageData_{internalcode}_{month}_PG{n}_{source}
+BACKEND_NAME_PATTERN = re.compile(r'(?:MeetData|PageData)_(.+?)_([^_]+)_PG\d+(?:_R\d+)?_(.+?)\.json$')
+UNKNOWN_MONTH = 'unknown'
+
+MEETING_COLUMNS = ['source', 'month', 'internalcode', 'run_source', 'meeting_id', 'company', 'ticker', 'country',
+                   'meeting_date', 'meeting_type', 'source_file']
+VOTE_COLUMNS = ['source', 'month', 'internalcode', 'run_source', 'meeting_id', 'meeting_date', 'item', 'description',
+                'proponent', 'mgmt_rec', 'fund_id', 'fund_name', 'vote', 'for_against_mgmt', 'shares', 'source_file']
+LISTING_COLUMNS = ['source', 'month', 'source_file', 'row', 'column', 'text', 'title']
+PARTITION_COLUMNS = ['source', 'month']
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Consolidating output needs the 'pyarrow' package")
+
+
+def backend_naming(filename):
+    """``(internalcode, month, source)`` from a backend output name, or Nones for the browser scrapers."""
+    match = BACKEND_NAME_PATTERN.match(os.path.basename(filename))
+    return match.groups() if match else (None, None, None)
+
+
+class Columns:
+    """Column-oriented buffers for the three tables a batch of files flattens into."""
+
+    def __init__(self):
+        self.tables = {
+            'meetings': {column: [] for column in MEETING_COLUMNS},
+            'votes': {column: [] for column in VOTE_COLUMNS},
+            'listings': {column: [] for column in LISTING_COLUMNS}
+        }
+
+    def add(self, table, **row):
+        for column, values in self.tables[table].items():
+            values.append(row.get(column))
+
+    def add_record(self, filename, data, default_month):
+        """Flatten one output record (a file, or one entry of an NDJSON file)."""
+        source, kind = classify_file(filename)
+        stem = os.path.splitext(os.path.basename(filename))[0]
+        internalcode, month, run_source = backend_naming(filename)
+        base = {'internalcode': internalcode, 'run_source': run_source, 'source_file': filename}
+
+        if source is None and PAGE_DATA_PATTERN.match(os.path.basename(filename)):
+            self.add_page_data(filename, data, month or default_month)
+            return
+
+        if source == SOURCE_GL_API and kind == 'listing':
+            for listed in data:
+                meeting, _, _ = normalize_api_meeting(listed)
+                if meeting['meeting_id']:
+                    self.add('meetings', source=source, month=month or self.month_of(meeting, default_month),
+                             **meeting, **base)
+            return
+
+        if source == SOURCE_GL_API:
+            meeting, proposals, votes = normalize_api_meeting(data)
+            meeting['meeting_id'] = meeting['meeting_id'] or stem
+        elif source == SOURCE_ISS:
+            proposals, votes = normalize_ballot_rows(data.get('Details', []), ISS_COLUMNS)
+            meeting = {'meeting_id': _text(data.get('Meeting ID')) or stem}
+        elif source == SOURCE_GL_BROWSER:
+            proposals, votes = normalize_ballot_rows(data, GL_BROWSER_COLUMNS)
+            meeting = {'meeting_id': gl_browser_meeting_id(data, filename)}
+        else:
+            return
+
+        month = month or self.month_of(meeting, default_month)
+        self.add('meetings', source=source, month=month, **meeting, **base)
+        proposals = {proposal['item']: proposal for proposal in proposals}
+        for vote in votes:
+            record = dict(proposals.get(vote['item'], {}), **vote)
+            self.add('votes', source=source, month=month, meeting_id=meeting['meeting_id'],
+                     meeting_date=meeting.get('meeting_date'), **record, **base)
+
+    def add_page_data(self, filename, data, month):
+        source = page_data_source(data)
+        if source == SOURCE_ISS:
+            # One entry per cell, grouped back into grid rows
+            for row, row_data in enumerate(iter_grid_rows(data)):
+                for column, cell in row_data.items():
+                    self.add('listings', source=source, month=month, source_file=filename, row=row, column=column,
+                             text=cell.get('text'), title=cell.get('title'))
+            return
+
+        for row, row_data in enumerate(data):
+            for column, cell in row_data.items():
+                self.add('listings', source=source, month=month, source_file=filename, row=row, column=column,
+                         text=cell.get('text'), title=cell.get('title'))
+
+    @staticmethod
+    def month_of(meeting, default_month):
+        meeting_date = _iso_date(meeting.get('meeting_date'))
+        if meeting_date and re.match(r'\d{4}-\d{2}', meeting_date):
+            return meeting_date[:7]
+        return default_month
+
+    def to_tables(self):
+        # Every column is text until type_columns runs, so a batch that never saw a field still concatenates
+        return {name: pa.table(columns, schema=pa.schema([(column, pa.int64() if column == 'row' else pa.string())
+                                                          for column in columns]))
+                for name, columns in self.tables.items()}
+
+
+def parse_batch(paths, default_month=UNKNOWN_MONTH):
+    """Process-pool task: flatten a batch of JSON/NDJSON output files into Arrow tables."""
+    columns = Columns()
+    for path in paths:
+        if '.ndjson' in os.path.basename(path):
+            for filename, data in iter_ndjson(path):
+                columns.add_record(filename, data, default_month)
+        else:
+            with open(path, 'r', encoding='utf-8') as json_file:
+                columns.add_record(path, json.load(json_file), default_month)
+    return columns.to_tables()
+
+
+def discover_output_files(directory):
+    """Every scraper output file under ``directory``: meeting, listing and page files plus NDJSON sinks."""
+    paths = []
+    for path in sorted(glob.glob(os.path.join(directory, '**', '*.json'), recursive=True)):
+        if classify_file(path)[0] is not None or PAGE_DATA_PATTERN.match(os.path.basename(path)):
+            paths.append(path)
+    paths.extend(sorted(glob.glob(os.path.join(directory, '**', '*.ndjson*'), recursive=True)))
+    return paths
+
+
+def type_columns(table):
+    """Cast the text columns that have a real type: shares to integers, meeting dates to dates."""
+    if 'shares' in table.column_names:
+        digits = pc.replace_substring_regex(table['shares'].cast(pa.string()), r'[^0-9]', '')
+        shares = pc.if_else(pc.equal(digits, ''), None, digits).cast(pa.int64())
+        table = table.set_column(table.column_names.index('shares'), 'shares', shares)
+    if 'meeting_date' in table.column_names:
+        parsed = pc.strptime(table['meeting_date'].cast(pa.string()), format='%Y-%m-%d', unit='s', error_is_null=True)
+        table = table.set_column(table.column_names.index('meeting_date'), 'meeting_date', parsed.cast(pa.date32()))
+    return table
+
+
+def dedupe_meetings(meetings):
+    """One row per ``(source, meeting_id)``, as vote_store's upsert leaves it.
+
+    A backend meeting is listed on a PageData page and saved again from its
+    MeetData file; the detail row wins, and among rows of the same kind the
+    one read last does. glnew meetings are keyed on the Meeting ID their rows
+    carry, so the meeting_data_1 files of two runs stay two meetings.
+    """
+    listed = pc.match_substring_regex(meetings['source_file'], r'(^|[\\/])PageData_')
+    order = pc.sort_indices(pa.table({'listed': pc.fill_null(listed, False),
+                                      'position': pa.array(range(meetings.num_rows), pa.int64())}),
+                            sort_keys=[('listed', 'ascending'), ('position', 'descending')])
+    ordered = meetings.take(order)
+    ordered = ordered.append_column('__position', pa.array(range(ordered.num_rows), pa.int64()))
+    first = ordered.group_by(['source', 'meeting_id']).aggregate([('__position', 'min')])
+    keep = pc.sort_indices(first['__position_min'])
+    return ordered.take(pc.take(first['__position_min'], keep)).drop_columns(['__position'])
+
+
+def dataset_format(output_format):
+    return 'ipc' if output_format == 'arrow' else output_format
+
+
+def consolidate(directory, output_dir, default_month=UNKNOWN_MONTH, output_format=CONSOLIDATE_FORMAT,
+                workers=CONSOLIDATE_WORKERS, batch_size=CONSOLIDATE_BATCH_SIZE):
+    """Parse every output file under ``directory`` in parallel and write one dataset per table.
+
+    Each table lands in ``output_dir/<table>`` partitioned as ``source=<source>/month=<month>``.
+    Backend files keep the month from their name; browser files take their
+    meeting's month, or ``default_month`` when the file does not say.
+    """
+    require_pyarrow()
+    paths = discover_output_files(directory)
+    batches = [paths[index:index + batch_size] for index in range(0, len(paths), batch_size)]
+    print(f"Consolidating {len(paths)} files in {len(batches)} batches across {workers} processes.")
+
+    parts = {'meetings': [], 'votes': [], 'listings': []}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for tables in pool.map(parse_batch, batches, [default_month] * len(batches)):
+            for name, table in tables.items():
+                if table.num_rows:
+                    parts[name].append(table)
+
+    summary = {'files': len(paths)}
+    for name, tables in parts.items():
+        summary[name] = 0
+        if not tables:
+            continue
+        table = pa.concat_tables(tables).combine_chunks()
+        if name == 'meetings':
+            table = dedupe_meetings(table)
+        table = type_columns(table)
+        ds.write_dataset(table, os.path.join(output_dir, name), format=dataset_format(output_format),
+                         partitioning=PARTITION_COLUMNS, partitioning_flavor='hive',
+                         existing_data_behavior='delete_matching')
+        summary[name] = table.num_rows
+    return summary
+
+
+def load_table(output_dir, name='votes', month=None, source=None, output_format=CONSOLIDATE_FORMAT):
+    """Read one consolidated table, pruned to a month and/or source through the partition directories."""
+    require_pyarrow()
+    dataset = ds.dataset(os.path.join(output_dir, name), format=dataset_format(output_format), partitioning='hive')
+    condition = None
+    for column, value in (('month', month), ('source', source)):
+        if value is not None:
+            clause = ds.field(column) == value
+            condition = clause if condition is None else condition & clause
+    return dataset.to_table(filter=condition)
+
+
+def vote_summary(votes):
+    """Vote counts and shares per source, month and decision, aggregated in Arrow rather than Python."""
+    return votes.group_by(['source', 'month', 'vote']).aggregate([
+        ('meeting_id', 'count_distinct'),
+        ('fund_id', 'count'),
+        ('shares', 'sum')
+    ]).sort_by([('source', 'ascending'), ('month', 'ascending'), ('fund_id_count', 'descending')])
+
+
+if __name__ == "__main__":
+    directory = input("Enter the directory of scraped files: ")
+    output_dir = input("Enter the directory to write the dataset to: ")
+    default_month = input(f"Enter the month for files without a meeting date [{UNKNOWN_MONTH}]: ") or UNKNOWN_MONTH
+
+    print(f"Consolidation summary: {json.dumps(consolidate(directory, output_dir, default_month))}")
+    print(vote_summary(load_table(output_dir)))
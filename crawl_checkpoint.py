@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import hashlib
+from datetime import date, timedelta
+
+SYNC_STATE_PATH = os.environ.get('GL_SYNC_STATE_PATH', 'gl_sync_state.json')
+
+
+class CheckpointJournal:
+    """Append-only JSON-lines journal of completed pages and meetings for one crawl.
+
+    Every line carries a run ID derived from the query parameters, so a journal
+    left behind by a different date window or page size is ignored rather than
+    skipping work that was never done for this query.
+    """
+
+    def __init__(self, path, run_params):
+        self.path = path
+        self.run_id = hashlib.sha1(json.dumps(run_params, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        self.page_counts = {}  # page_number -> number of meetings on the finished page
+        self.completed_meetings = set()
+        self.run_complete = False
+
+        if os.path.exists(path):
+            self._load()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.journal_file = open(path, 'a', encoding='utf-8')
+
+        # Terminate a torn last line so the first new entry is not glued onto it
+        if self.journal_file.tell() > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self.journal_file.write('\n')
+        self._append({'event': 'start', 'params': run_params})
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # A torn last line from a crash; everything before it is still valid
+                if entry.get('run') != self.run_id:
+                    continue
+                if entry['event'] == 'meeting':
+                    self.completed_meetings.add(str(entry['meeting_id']))
+                elif entry['event'] == 'page':
+                    self.page_counts[entry['page']] = entry['count']
+                elif entry['event'] == 'complete':
+                    self.run_complete = True
+
+        if self.page_counts or self.completed_meetings:
+            print(f"Resuming from {self.path}: {len(self.page_counts)} pages and "
+                  f"{len(self.completed_meetings)} meetings already done.")
+
+    def _append(self, entry):
+        entry['run'] = self.run_id
+        entry['ts'] = time.time()
+        self.journal_file.write(json.dumps(entry) + '\n')
+        self.journal_file.flush()
+
+    def page_count(self, page_number):
+        """Number of meetings on a finished page, or None if the page still has work left."""
+        return self.page_counts.get(page_number)
+
+    def is_meeting_done(self, meeting_id):
+        return str(meeting_id) in self.completed_meetings
+
+    def record_meeting(self, page_number, record_number, meeting_id):
+        self.completed_meetings.add(str(meeting_id))
+        self._append({'event': 'meeting', 'page': page_number, 'record': record_number, 'meeting_id': meeting_id})
+
+    def record_page(self, page_number, count):
+        self.page_counts[page_number] = count
+        self._append({'event': 'page', 'page': page_number, 'count': count})
+
+    def record_complete(self):
+        self.run_complete = True
+        self._append({'event': 'complete'})
+
+    def close(self):
+        self.journal_file.close()
+
+
+def load_last_date_end(key, path=SYNC_STATE_PATH):
+    """Return the last completed dateEnd (YYYY-MM-DD) recorded for an incremental sync key."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get(key)
+
+
+def save_last_date_end(key, date_end, path=SYNC_STATE_PATH):
+    """Remember the dateEnd of a completed run so the next incremental run starts after it."""
+    state = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    state[key] = date_end
+
+    # Write to a temporary file first so a crash never leaves a half-written state file
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def incremental_start_date(start_date, last_date_end):
+    """Move the start of the window to the day after the last completed dateEnd."""
+    if not last_date_end:
+        return start_date
+    next_day = (date.fromisoformat(last_date_end) + timedelta(days=1)).isoformat()
+    return max(start_date, next_day)
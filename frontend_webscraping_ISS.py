@@ -1,206 +1,416 @@
 from playwright.sync_api import sync_playwright
+import os
 import json
-from bs4 import BeautifulSoup
 import logging
-import time
+from functools import partial
+from urllib.parse import unquote
+
+from browser_profile import LEAN, blocked_summary, new_page
+from browser_session import SavedSession, StartupClock, connect_browser
+from scrape_metrics import METRICS_DIR, get_metrics, start_run
+from wait_strategy import WaitTimeout, row_set, wait_for_change, wait_for_selector
+from iss_detail_pool import DetailPagePool
+from iss_extract import get_extractor
+from iss_network_capture import capture_for, iter_grid_cells, meeting_details, record_source
+from output_sink import open_sink
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def visit_meeting_detail(page, meeting_id, cache, visit_count):
+SITE_BASE = 'https://vds.issgovernance.com/vds/#/'
+DEFAULT_SITE_PATH = 'MTcy'
+DEFAULT_START_DATE = '01-Jan-2023'  # The datepicker's DD-Mon-YYYY format
+DEFAULT_END_DATE = '30-Jan-2024'
+
+# Detail views are opened on this many pages of their own while the grid stays put; 0 keeps click-then-Back.
+# The sync API is bound to one thread, so each worker starts its own Playwright and browser process (about one
+# more browser's memory and start-up per worker) unless SCRAPE_BROWSER_ENDPOINT lets them attach to a shared one.
+DETAIL_WORKERS = int(os.environ.get('ISS_DETAIL_WORKERS', '4'))
+
+# Optional direct route to a meeting, e.g. 'https://.../#/{site_path}/meeting/{meeting_id}'. When empty, a
+# worker loads the site and runs the grid link's own javascript: handler for the meeting instead.
+DETAIL_ROUTE = os.environ.get('ISS_DETAIL_ROUTE', '')
+
+DETAIL_ROW_SELECTOR = 'td[aria-describedby^="listDetail_"]'
+GRID_ROW_SELECTOR = 'td[aria-describedby="list_Ticker"]'
+GRID_MEETING_ID = 'list_MeetingId'  # Not a grid column: written after the cell holding the row's meeting link
+
+# Read grid and ballot rows from the jqGrid JSON the page fetches, parsing HTML only when none was seen
+CAPTURE_XHR = os.environ.get('ISS_CAPTURE_XHR', '1') == '1'
+
+# 'json' keeps one file per page and meeting; 'ndjson' appends every record to one (optionally compressed) file
+OUTPUT_FORMAT = os.environ.get('ISS_OUTPUT_FORMAT', 'json')
+OUTPUT_COMPRESSION = os.environ.get('ISS_OUTPUT_COMPRESSION', '')
+
+
+def site_url(site_path):
+    return f'{SITE_BASE}{site_path}/'
+
+
+def meeting_id_from_href(href):
+    """Grid links look like javascript:handler('<site>','<meeting id>',...)."""
+    return href.split(",")[1].strip("'")
+
+
+def meeting_id_grid_cell(meeting_id):
+    """A page_data cell for the meeting a grid row links to, in the layout of the grid's own cells."""
+    return {'aria_describedby': GRID_MEETING_ID, 'text': meeting_id, 'title': meeting_id}
+
+
+def capture_mark(page):
+    return capture_for(page).mark() if CAPTURE_XHR else 0
+
+
+def iter_grid_page(page, since):
+    """Yield the current grid page as ``(cell, href)`` pairs, one page_data cell at a time.
+
+    The href is None for a cell without a link. On the XHR path, where links
+    are read from the DOM separately, each row's Ticker link comes with the
+    row's first cell, or without a cell for a link past the captured rows.
+    """
+    rows = capture_for(page).grid_rows(since) if CAPTURE_XHR else None
+    if rows is not None:
+        record_source('grid', 'xhr')
+        hrefs = page.eval_on_selector_all(
+            GRID_ROW_SELECTOR,
+            'cells => cells.map(cell => cell.querySelector("a")).map(link => link ? link.getAttribute("href") : null)'
+        )
+        for index, row in enumerate(rows):
+            href = hrefs[index] if index < len(hrefs) else None
+            for cell in iter_grid_cells([row]):
+                yield cell, href
+                href = None
+        for href in hrefs[len(rows):]:
+            yield None, href
+        return
+
+    record_source('grid', 'dom')
+    yield from get_extractor().iter_grid_cells(page.content())
+
+
+def read_meeting_details(page, meeting_id, since):
+    """Ballot rows from the captured detail payload when there is one, else from the page HTML."""
+    rows = capture_for(page).detail_rows(since) if CAPTURE_XHR else None
+    if rows is not None:
+        record_source('detail', 'xhr')
+        return meeting_details(rows, meeting_id)
+
+    record_source('detail', 'dom')
+    return extract_meeting_details(page.content(), meeting_id)
+
+
+def save_meeting_details(sink, filtered_data, meeting_id, visit_number):
+    """Queue one meeting on the sink; the sink's writer thread does the disk I/O."""
+    meeting_data_file = f'meeting_data_{meeting_id}_{visit_number}.json'
+    sink.write(meeting_data_file, filtered_data)
+    logging.info("Meeting data queued as %s (%d ballot rows)", meeting_data_file, len(filtered_data['Details']))
+    logging.debug("Extracted meeting details: %s", filtered_data)
+    return meeting_data_file
+
+
+def on_site(page):
+    """True when ``page`` already has the VDS app loaded, whichever of its views it shows."""
+    return page.url.split('#')[0] == SITE_BASE.split('#')[0]
+
+
+def open_meeting_detail(page, meeting_id, href, site_path=DEFAULT_SITE_PATH):
+    """Bring ``page`` to the detail view of one meeting without going through the grid.
+
+    Without a direct route the worker's page keeps the app loaded between
+    meetings: the site is only loaded when the page is not on it yet, and each
+    meeting's handler then runs in place until its ballot rows replace the
+    previous meeting's. Raises WaitTimeout when the rows never arrive, so a
+    page still showing another meeting is never saved under this one's ID.
+    """
+    if DETAIL_ROUTE:
+        page.goto(DETAIL_ROUTE.format(meeting_id=meeting_id, site_path=site_path))
+        page.wait_for_load_state('networkidle')
+        if not wait_for_selector(page, 'iss_detail_rows', DETAIL_ROW_SELECTOR, state='attached'):
+            raise WaitTimeout(f"No ballot rows for meeting {meeting_id}")
+        return
+
+    script = unquote(href)
+    if script.startswith('javascript:'):
+        script = script[len('javascript:'):]
+    if not on_site(page):
+        page.goto(site_url(site_path))
+        page.wait_for_load_state('networkidle')
+    with wait_for_change(page, 'iss_detail_rows', row_set(DETAIL_ROW_SELECTOR), required=True):
+        page.evaluate(f"() => {{ {script} }}")
+
+
+def scrape_meeting_detail(page, meeting_id, href, visit_number, sink, site_path=DEFAULT_SITE_PATH):
+    """Pool job: open one meeting's detail view directly, extract it and save it."""
+    metrics = get_metrics()
+    with metrics.profile('visit_meeting_detail'):
+        since = capture_mark(page)
+        with metrics.stage('detail_navigation'):
+            open_meeting_detail(page, meeting_id, href, site_path)
+
+        with metrics.stage('html_parse'):
+            filtered_data = read_meeting_details(page, meeting_id, since)
+
+        save_meeting_details(sink, filtered_data, meeting_id, visit_number)
+        metrics.inc('meetings_saved_total')
+
+
+def visit_meeting_detail(page, meeting_id, cache, visit_count, sink):
     if meeting_id in cache:
-        logging.info(f"Already visited: {meeting_id}")
+        logging.info("Already visited: %s", meeting_id)
         return  # Skip if already visited
 
-    logging.info(f"Visiting meeting detail for ID: {meeting_id}")
+    logging.info("Visiting meeting detail for ID: %s", meeting_id)
+    metrics = get_metrics()
 
     try:
         # Locate the <td> element that corresponds to the meeting ID
         meeting_cell = page.locator(f'td[aria-describedby*="list_Ticker"] a[href*="{meeting_id}"]')
 
         if meeting_cell.count() > 0:
-            # Click the link within the <td>
-            meeting_cell.click()
-            page.wait_for_load_state('networkidle')  # Wait for the detail page to load fully
-
-            # Adding additional wait time to ensure all content is available
-            time.sleep(5)  # Adjust time as necessary
-
-            # Extract data from the detail page
-            detail_content = page.content()
-            detail_soup = BeautifulSoup(detail_content, 'html.parser')
-
-            # Find all rows with meeting details
-            meeting_rows = detail_soup.find_all('tr')
-
-            # Initialize the filtered data structure
-            filtered_data = {
-                'Meeting ID': meeting_id,
-                'Details': []
-            }
-
-            # Define the keys we want to extract
-            required_keys = {
-                'listDetail_BallotItemNumber',
-                'listDetail_Proposal',
-                'listDetail_ShareholderProposal',
-                'listDetail_MgtRecVote',
-                'listDetail_ClientVoteList'
-            }
-
-            # Iterate through each row in the meeting details
-            for meeting_row in meeting_rows:
-                detail_data = {}  # Initialize a dictionary for each detail entry
-
-                # Extract data from the <td> elements within the <tr>
-                for cell in meeting_row.find_all('td'):
-                    aria_describedby = cell.get('aria-describedby', '')
-                    text_content = cell.get_text(strip=True)
-
-                    # Skip hidden cells or those without meaningful data
-                    if aria_describedby in required_keys and text_content and cell.get('style', '').find('display:none') == -1:
-                        detail_data[aria_describedby] = {
-                            'text': text_content,
-                            'title': cell.get('title', '')
-                        }
-
-                # Append the detail entry to the list if it contains data
-                if detail_data:
-                    filtered_data['Details'].append(detail_data)
-
-            # Log extracted meeting data
-            logging.info(f"Extracted meeting details: {filtered_data}")
-
-            # Save meeting data to a JSON file immediately after fetching
-            visit_number = visit_count.get(meeting_id, 1)  # Get the visit number, default to 1 if not found
-            meeting_data_file = f'meeting_data_{meeting_id}_{visit_number}.json'
-            with open(meeting_data_file, 'w', encoding='utf-8') as f:
-                json.dump(filtered_data, f, ensure_ascii=False, indent=2)
-            logging.info(f"Meeting data saved to {meeting_data_file}")
-
-            # Add the meeting ID to the cache and increment the visit count
-            cache.add(meeting_id)
-            visit_count[meeting_id] = visit_count.get(meeting_id, 1) + 1  # Increment visit count for this meeting ID
-
-            # Click the "Back" button to return to the main page
-            back_buttons = page.locator('.backClass')
-            if back_buttons.count() > 0:
-                back_buttons.nth(0).click()  # Click the first back button if multiple are found
-                page.wait_for_load_state('networkidle')  # Wait for the main table to load
-            else:
-                logging.warning("Back button not found!")
+            with metrics.profile('visit_meeting_detail'):
+                # Click the link within the <td>
+                since = capture_mark(page)
+                with metrics.stage('detail_navigation'):
+                    meeting_cell.click()
+                    page.wait_for_load_state('networkidle')  # Wait for the detail page to load fully
+
+                    # Wait until the ballot rows are rendered instead of a fixed delay
+                    wait_for_selector(page, 'iss_detail_rows', DETAIL_ROW_SELECTOR, state='attached')
+
+                # Extract data from the detail page
+                with metrics.stage('html_parse'):
+                    filtered_data = read_meeting_details(page, meeting_id, since)
+
+                # Save meeting data immediately after fetching
+                visit_number = visit_count.get(meeting_id, 1)  # Get the visit number, default to 1 if not found
+                save_meeting_details(sink, filtered_data, meeting_id, visit_number)
+                metrics.inc('meetings_saved_total')
+
+                # Add the meeting ID to the cache and increment the visit count
+                cache.add(meeting_id)
+                visit_count[meeting_id] = visit_count.get(meeting_id, 1) + 1  # Increment visit count for this meeting ID
+
+                # Click the "Back" button to return to the main page
+                back_buttons = page.locator('.backClass')
+                if back_buttons.count() > 0:
+                    with metrics.stage('detail_navigation'):
+                        back_buttons.nth(0).click()  # Click the first back button if multiple are found
+                        page.wait_for_load_state('networkidle')  # Wait for the main table to load
+                else:
+                    logging.warning("Back button not found!")
 
         else:
-            logging.warning(f"No meeting cell found for meeting ID: {meeting_id}")
+            logging.warning("No meeting cell found for meeting ID: %s", meeting_id)
 
     except Exception as e:
-        logging.error(f"Error while visiting meeting detail: {e}")
+        metrics.inc('meetings_failed_total')
+        logging.error("Error while visiting meeting detail: %s", e)
 
 
+def extract_meeting_details(detail_content, meeting_id):
+    """Pull the ballot rows we keep out of a meeting detail page's HTML."""
+    return get_extractor().meeting_details(detail_content, meeting_id)
 
 
+def filters_applied(page, start_date, end_date):
+    """True when a page restored from a saved session already shows the expanded grid for our dates."""
+    try:
+        page.wait_for_selector('#PageDropdown option', state='attached', timeout=10000)
+    except Exception:
+        return False
+    return page.evaluate("""
+        ([startDate, endDate]) => {
+            const value = (selector) => (document.querySelector(selector) || {}).value;
+            return value('#fromDatepicker') === startDate && value('#toDatepicker') === endDate
+                && document.querySelectorAll('#PageDropdown option').length > 0;
+        }
+    """, [start_date, end_date])
+
+
+def apply_filters(page, start_date, end_date):
+    """Set the date range, click Update and expand the grid."""
+    # Set date values and make form "dirty"
+    page.evaluate("""
+        ([startDate, endDate]) => {
+            document.querySelector('#fromDatepicker').value = startDate;
+            document.querySelector('#toDatepicker').value = endDate;
+            document.querySelector('#fromDatepicker').dispatchEvent(new Event('change', { bubbles: true }));
+            document.querySelector('#toDatepicker').dispatchEvent(new Event('change', { bubbles: true }));
+            document.querySelector('#fromDatepicker').dispatchEvent(new Event('input', { bubbles: true }));
+            document.querySelector('#toDatepicker').dispatchEvent(new Event('input', { bubbles: true }));
+        }
+    """, [start_date, end_date])
+
+    # Wait for the "Update" button to become clickable and then click it
+    page.wait_for_selector('#searchImgTop', timeout=10000)
+    page.click('#searchImgTop')
+    logging.info("Update button clicked.")
+
+    # Wait for the expand button and click it to load the table
+    page.wait_for_selector('#expandCollapseStatistics_list', timeout=30000)
+    page.click('#expandCollapseStatistics_list')
+    logging.info("Expand button clicked.")
+
+
+def run_scraping_process(start_date=DEFAULT_START_DATE, end_date=DEFAULT_END_DATE, site_path=DEFAULT_SITE_PATH,
+                         page_shard=None, output_dir='.', metrics_dir=METRICS_DIR):
+    """Scrape one date range of an ISS vote-disclosure site and return a summary of the run.
+
+    ``site_path`` is the site's route segment (``MTcy`` for the default site).
+    ``page_shard=(index, count)`` limits the run to grid pages ``index``,
+    ``index + count``, ... so ``count`` processes can split one date range.
+    All files are written to ``output_dir``, through a sink that writes on
+    its own thread, so each grid page is streamed out cell by cell.
+    """
+    metrics = start_run('iss')
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    sink = open_sink(output_dir, f'Records_ISS_{site_path}', OUTPUT_FORMAT, OUTPUT_COMPRESSION, indent=2,
+                     ensure_ascii=False)
+
+    summary = {'start_date': start_date, 'end_date': end_date, 'pages': 0, 'meetings': 0, 'failed': 0,
+               'complete': False}
 
-def run_scraping_process():
     with sync_playwright() as p:
-        # Launch the browser
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
+        # Attach to the long-lived browser if there is one, with the cookies and filters of the last run
+        clock = StartupClock()
+        session = SavedSession(f'iss_{site_path}', {'start_date': start_date, 'end_date': end_date})
+        browser = connect_browser(p)
+        page = new_page(session.new_context(browser))
+        grid_since = capture_mark(page)
 
         # Navigate to the page
-        page.goto('https://vds.issgovernance.com/vds/#/MTcy/')
+        page.goto(session.url or site_url(site_path))
         logging.info("Waiting for the page to be ready...")
+        pool = None
 
         try:
             # Wait for the page to be ready
             page.wait_for_selector('#expandCollapseStatistics_list', timeout=30000)
             logging.info("Page is ready!")
 
-            # Set date values and make form "dirty"
-            page.evaluate(f"""
-                () => {{
-                    document.querySelector('#fromDatepicker').value = '01-Jan-2023';
-                    document.querySelector('#toDatepicker').value = '30-Jan-2024';
-                    document.querySelector('#fromDatepicker').dispatchEvent(new Event('change', {{ bubbles: true }}));
-                    document.querySelector('#toDatepicker').dispatchEvent(new Event('change', {{ bubbles: true }}));
-                    document.querySelector('#fromDatepicker').dispatchEvent(new Event('input', {{ bubbles: true }}));
-                    document.querySelector('#toDatepicker').dispatchEvent(new Event('input', {{ bubbles: true }}));
-                }}
-            """)
-
-            # Wait for the "Update" button to become clickable and then click it
-            page.wait_for_selector('#searchImgTop', timeout=10000)
-            page.click('#searchImgTop')
-            logging.info("Update button clicked.")
-
-            # Wait for the expand button and click it to load the table
-            page.wait_for_selector('#expandCollapseStatistics_list', timeout=30000)
-            page.click('#expandCollapseStatistics_list')
-            logging.info("Expand button clicked.")
+            clock.warm = session.url is not None and filters_applied(page, start_date, end_date)
+            if clock.warm:
+                logging.info("Reusing the saved session's filters.")
+            else:
+                grid_since = capture_mark(page)
+                apply_filters(page, start_date, end_date)
 
             # Fetch the total number of pages
             page.wait_for_selector('#PageDropdown', timeout=10000)
             total_pages = page.locator('#PageDropdown option').count()
-            logging.info(f"Total pages: {total_pages}")
+            logging.info("Total pages: %d", total_pages)
+            session.save(page)
+
+            if page_shard is None:
+                page_numbers = list(range(total_pages))
+            else:
+                page_numbers = list(range(page_shard[0], total_pages, page_shard[1]))
+                logging.info("Page shard %d of %d: %d pages", page_shard[0] + 1, page_shard[1], len(page_numbers))
 
             cache = set()  # Initialize a cache for visited meeting IDs
             visit_count = {}  # Initialize a dictionary to track visit counts
 
-            # Initialize a flag to ensure page data is stored only once
-            page_data_saved = False
-
-            for page_number in range(total_pages):
-                logging.info(f"Scraping page {page_number + 1}...")
-                page.wait_for_function(""" () => document.querySelectorAll('td[aria-describedby]').length > 0 """, timeout=30000)
-
-                # Immediately after expanding, extract the page's HTML
-                page_content = page.content()
-                soup = BeautifulSoup(page_content, 'html.parser')
-                cells = soup.select('td[aria-describedby]')
-
-                # Store unique meeting IDs for visiting
-                meeting_hrefs = []  
-
-                # Extract data from the table
-                for cell in cells:
-                    link = cell.find('a')
-                    if link:
-                        href = link['href']
-                        meeting_id = href.split(",")[1].strip("'")  # Extract meeting ID from href
-                        if meeting_id not in cache:  # Ensure uniqueness
-                            meeting_hrefs.append(meeting_id)  # Store meeting ID for visiting
-
-                # Save page data only once
-                if not page_data_saved:
-                    page_data_file = f'page_data_{page_number + 1}.json'
-                    with open(page_data_file, 'w', encoding='utf-8') as f:
-                        json.dump([{'aria_describedby': cell.get('aria-describedby', ''),
-                                     'text': cell.get_text(strip=True),
-                                     'title': cell.get('title', '')} for cell in cells], f, ensure_ascii=False, indent=2)
-                    logging.info(f"Page data saved to {page_data_file}")
-                    page_data_saved = True  # Set flag to true after saving
+            # The pool's contexts start from this page's cookies and local storage
+            if DETAIL_WORKERS > 0:
+                visit = partial(scrape_meeting_detail, sink=sink, site_path=site_path)
+                pool = DetailPagePool(visit, DETAIL_WORKERS, page.context.storage_state())
+                logging.info("Visiting meeting details on %d parallel pages.", DETAIL_WORKERS)
+
+            current_page = 0
+
+            for page_number in page_numbers:
+                # Jump to the page through the dropdown unless the grid is already on it
+                if page_number != current_page:
+                    grid_since = capture_mark(page)
+                    with metrics.stage('listing_fetch'):
+                        # Wait for the new page's rows to replace the old ones
+                        with wait_for_change(page, 'iss_grid_page', row_set(GRID_ROW_SELECTOR)):
+                            page_option = page.locator('#PageDropdown option').nth(page_number)
+                            page_option.click()
+                    current_page = page_number
+
+                logging.info("Scraping page %d...", page_number + 1)
+                with metrics.stage('listing_fetch'):
+                    page.wait_for_function(""" () => document.querySelectorAll('td[aria-describedby]').length > 0 """, timeout=30000)
+
+                # Stream every page's cells to its page_data file as they are read, keeping only the new meeting links
+                page_data_file = f'page_data_{page_number + 1}.json'
+                meeting_hrefs = []
+                queued = set()
+                row_meeting_id = None  # A row may link its meeting from more than one cell
+                with metrics.stage('html_parse'):
+                    for cell, href in iter_grid_page(page, grid_since):
+                        if cell is not None:
+                            clock.first_row()
+                            sink.write_item(page_data_file, cell)
+                        if href:
+                            meeting_id = meeting_id_from_href(href)  # Extract meeting ID from href
+                            if cell is not None and meeting_id != row_meeting_id:
+                                # Lets the row's company and date be matched to the meeting's own file
+                                sink.write_item(page_data_file, meeting_id_grid_cell(meeting_id))
+                                row_meeting_id = meeting_id
+                            if meeting_id not in cache and meeting_id not in queued:  # Ensure uniqueness
+                                queued.add(meeting_id)
+                                meeting_hrefs.append((meeting_id, href))  # Store meeting ID for visiting
+                sink.end_stream(page_data_file)
+                logging.info("Page data queued as %s", page_data_file)
 
                 # Visit each unique meeting detail based on the stored hrefs
-                for meeting_id in meeting_hrefs:
-                    visit_meeting_detail(page, meeting_id, cache, visit_count)
-
-                # Move to the next page
-                if page_number < total_pages - 1:  # Check if not on the last page
-                    # Find and click the next page button
-                    next_page_option = page.locator('#PageDropdown option').nth(page_number + 1)
-                    next_page_option.click()
-                    time.sleep(2)  # Wait for the new page to load
+                for meeting_id, href in meeting_hrefs:
+                    if DETAIL_WORKERS > 0:
+                        if meeting_id in cache:
+                            continue
+                        # Claim the ID now so the same meeting linked from several cells is queued once
+                        cache.add(meeting_id)
+                        visit_number = visit_count.get(meeting_id, 1)
+                        visit_count[meeting_id] = visit_number + 1
+                        pool.submit(meeting_id, href, visit_number)
+                    else:
+                        visit_meeting_detail(page, meeting_id, cache, visit_count, sink)
+                summary['pages'] += 1
+
+            # Let the pool finish, and keep failed meetings out of the visited list
+            if pool is not None:
+                logging.info("Detail pool summary: %s", pool.close())
+                for meeting_id, _, _ in pool.failed:
+                    cache.discard(meeting_id)
+                summary['failed'] = len(pool.failed)
+                pool = None
 
             # Save the cache to a JSON file (optional)
-            with open('visitedMeetings.json', 'w', encoding='utf-8') as f:
+            visited_file = os.path.join(output_dir, 'visitedMeetings.json')
+            with open(visited_file, 'w', encoding='utf-8') as f:
                 json.dump(list(cache), f, ensure_ascii=False, indent=2)
-            logging.info('Visited meeting IDs have been saved to visitedMeetings.json')
+            logging.info("Visited meeting IDs have been saved to %s", visited_file)
+            summary['meetings'] = len(cache)
+
+            # Only a run whose records all reached the disk is complete
+            sink.flush()
+            summary['complete'] = True
 
         except Exception as e:
-            logging.error(f"Error during scraping process: {e}")
+            logging.error("Error during scraping process: %s", e)
 
         finally:
+            if pool is not None:
+                pool.close()
             browser.close()
+            try:
+                sink.close()
+                logging.info("Output summary: %s", sink.stats())
+            except Exception as e:
+                summary['complete'] = False
+                logging.error("Error writing output: %s", e)
+            if LEAN:
+                logging.info("Lean profile summary: %s", blocked_summary(metrics))
+            logging.info("Metrics saved to %s", metrics.write(metrics_dir))
+
+    return summary
 
 # Run the scraping process
 if __name__ == "__main__":
-    run_scraping_process()
+    start_date = input(f"Enter start date (DD-Mon-YYYY) [{DEFAULT_START_DATE}]: ") or DEFAULT_START_DATE
+    end_date = input(f"Enter end date (DD-Mon-YYYY) [{DEFAULT_END_DATE}]: ") or DEFAULT_END_DATE
+    site_path = input(f"Enter site path [{DEFAULT_SITE_PATH}]: ") or DEFAULT_SITE_PATH
+    run_scraping_process(start_date, end_date, site_path)
@@ -1,40 +1,152 @@
 from playwright.sync_api import sync_playwright
 import json
 import re
+import os
+import asyncio
+
+from browser_profile import LEAN, blocked_summary, new_page
+from browser_session import SavedSession, StartupClock, connect_browser
+from glnew_hybrid import HybridDetailFetcher, ListingCapture, meeting_id_from_link
+from glnew_tab_pool import DETAIL_TABS, AsyncTabPool
+from scrape_metrics import get_metrics, start_run
+from wait_strategy import row_set, wait_for_change, wait_for_enabled, wait_for_xhr
+
+# The listing request the site's table is filled from
+MEETINGS_XHR = '/api/v1/Meetings'
+
+# 'browser' renders every meeting page; 'hybrid' only drives the listing and fetches meetings from the JSON API
+MODE = os.environ.get('GLNEW_MODE', 'browser')
+
+# The filter form
+LANDING_URL = "https://votedisclosure.glasslewis.com/Russell%20Australia"
+START_DATE_INPUT = 'tui-input-date[formcontrolname="start"] input[automation-id="tui-primitive-textfield__native-input"]'
+END_DATE_INPUT = 'tui-input-date[formcontrolname="end"] input[automation-id="tui-primitive-textfield__native-input"]'
+CHECKBOX_SELECTOR = 'input[automation-id="tui-checkbox__native"]'
+APPLY_BUTTON = 'button[data-testid="main-page-submit-button"]'
+
+# A restored page counts as filtered only if it shows our dates, every fund ticked and a loaded table
+FILTERS_APPLIED_JS = """
+([startSelector, endSelector, checkboxSelector, startDate, endDate]) => {
+    const value = (selector) => (document.querySelector(selector) || {}).value;
+    const checkboxes = Array.from(document.querySelectorAll(checkboxSelector));
+    return value(startSelector) === startDate && value(endSelector) === endDate
+        && checkboxes.length > 0 && checkboxes.every(checkbox => checkbox.checked)
+        && document.querySelectorAll('table tbody tr').length > 0;
+}
+"""
+
+# Everything the scraper reads from a results table, gathered in one round trip: the header texts, and for
+# each row with cells, every cell's text, title and visibility plus the href of the first cell's link
+TABLE_SNAPSHOT_JS = """
+() => {
+    // Playwright's is_visible(): a non-empty box and no visibility:hidden
+    const isVisible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    const headers = Array.from(document.querySelectorAll('table th')).map(th => th.innerText);
+    const rows = [];
+    for (const tr of document.querySelectorAll('table tr')) {
+        const cells = Array.from(tr.querySelectorAll('td'));
+        if (!cells.length) continue;
+        const link = cells[0].querySelector('a');
+        rows.push({
+            cells: cells.map(td => ({text: td.innerText, title: td.getAttribute('title') || '', visible: isVisible(td)})),
+            link: link ? (link.getAttribute('href') || '') : null
+        });
+    }
+    return {headers, rows};
+}
+"""
+
+
+def clean_snapshot(snapshot):
+    snapshot['headers'] = [header.strip() for header in snapshot['headers']]
+    return snapshot
+
+
+def snapshot_table(page):
+    """Read the results table with a single evaluate instead of several calls per cell."""
+    return clean_snapshot(page.evaluate(TABLE_SNAPSHOT_JS))
+
+
+def meeting_id_cell(meeting_link):
+    """The Meeting ID entry both file types carry, so a meeting file can be matched to its listing row."""
+    meeting_id = meeting_id_from_link(meeting_link)
+    return {'text': meeting_id, 'title': ''} if meeting_id is not None else None
+
+
+def page_rows(snapshot):
+    """Listing rows keyed by header, as saved in page_data files, with the Meeting ID of each row's link."""
+    header_list = snapshot['headers']
+    extracted_data = []
+    for row in snapshot['rows']:
+        row_data = {}
+        for index, cell in enumerate(row['cells']):
+            # Use the header as the key
+            if index < len(header_list):
+                row_data[header_list[index]] = {
+                    'text': cell['text'].strip(),
+                    'title': cell['title']
+                }
+        meeting_id = meeting_id_cell(row['link'])
+        if meeting_id is not None:
+            row_data['Meeting ID'] = meeting_id
+        extracted_data.append(row_data)
+    return extracted_data
+
+
+def meeting_rows(snapshot):
+    """Vote rows of a meeting page: visible, non-empty cells only, columns fixed up, one row per Item."""
+    header_list = snapshot['headers']
+    extracted_meeting_data = []
+    seen_items = set()
+    for row in snapshot['rows']:
+        row_data = {}
+        for index, cell in enumerate(row['cells']):
+            cell_text = cell['text'].strip()
+
+            # Only proceed if the cell is visible, cell_text is not empty and we have a corresponding header
+            if cell['visible'] and cell_text and index < len(header_list):
+                row_data[header_list[index]] = {
+                    'text': cell_text,
+                    'title': cell['title']
+                }
+
+        # Swap the data between "Shares Voted" and "For/Against Management"
+        if 'Shares Voted' in row_data and 'For/Against Management' in row_data:
+            row_data['Shares Voted']['text'], row_data['For/Against Management']['text'] = (
+                row_data['For/Against Management']['text'],
+                row_data['Shares Voted']['text']
+            )
+
+        # Avoid adding incomplete or empty rows
+        if row_data and all(key in row_data for key in ['Item', 'Proposal Description', 'Vote Decision']):
+            item_text = row_data['Item']['text']
+            if item_text not in seen_items:
+                seen_items.add(item_text)
+                extracted_meeting_data.append(row_data)
+    return extracted_meeting_data
+
 
 def fetch_page_data(page, page_number):
     """Fetch data from the current page and save it to a JSON file."""
-    page.wait_for_selector('table', timeout=10000)
-
-    # Extract table headers
-    headers = page.query_selector_all('table th')
-    header_list = [header.inner_text().strip() for header in headers]
-
-    # Extract table data
-    rows = page.query_selector_all('table tr')
-    extracted_data = []
+    metrics = get_metrics()
+    with metrics.stage('listing_fetch'):
+        page.wait_for_selector('table', timeout=10000)
 
-    for row in rows:
-        cells = row.query_selector_all('td')
-        if cells:
-            row_data = {}
-            for index, cell in enumerate(cells):
-                cell_text = cell.inner_text().strip()
-                # Use the header as the key
-                if index < len(header_list):
-                    row_data[header_list[index]] = {
-                        'text': cell_text,
-                        'title': cell.get_attribute('title') or ''  # Fetch title attribute if it exists
-                    }
-            extracted_data.append(row_data)
+    with metrics.stage('table_extract'):
+        snapshot = snapshot_table(page)
+        extracted_data = page_rows(snapshot)
 
     # Save the extracted data to a JSON file for the current page
     filename = f'page_data_{page_number}.json'
-    with open(filename, 'w', encoding='utf-8') as json_file:
-        json.dump(extracted_data, json_file, ensure_ascii=False, indent=2)
-        print(f"Data saved to {filename}")
+    with metrics.stage('disk_write'):
+        with open(filename, 'w', encoding='utf-8') as json_file:
+            json.dump(extracted_data, json_file, ensure_ascii=False, indent=2)
+    print(f"Data saved to {filename}")
 
-    return header_list  # Return header list for further processing
+    return snapshot  # Return the table snapshot so its links can be followed without another query
 
 
 
@@ -42,66 +154,124 @@ def fetch_page_data(page, page_number):
 def fetch_meeting_data(browser, meeting_link, visit_number):
     """Fetch detailed meeting data from the specified link in a new tab and save it to a JSON file."""
     print(f"Visiting meeting link: {meeting_link}")
+    metrics = get_metrics()
 
-    # Open a new tab
-    new_page = browser.new_page()
-    new_page.goto(meeting_link)
-    new_page.wait_for_load_state("domcontentloaded")
+    with metrics.profile('fetch_meeting_data'):
+        # Open a new tab
+        with metrics.stage('detail_navigation'):
+            detail_page = new_page(browser)
+            detail_page.goto(meeting_link)
+            detail_page.wait_for_load_state("domcontentloaded")
 
-    # Wait for the table with meeting details to load
-    new_page.wait_for_selector('table', timeout=10000)
+            # Wait for the table with meeting details to load
+            detail_page.wait_for_selector('table', timeout=10000)
 
-    # Extract table headers (th)
-    headers = new_page.query_selector_all('table th')
-    header_list = [header.inner_text().strip() for header in headers]
+        with metrics.stage('table_extract'):
+            extracted_meeting_data = meeting_rows(snapshot_table(detail_page))
 
-    # Extract table data (tr)
-    rows = new_page.query_selector_all('table tr')
-    extracted_meeting_data = []
+        # Save the extracted meeting data to a JSON file
+        save_meeting_data(extracted_meeting_data, visit_number, meeting_link)
+        metrics.inc('meetings_saved_total')
+
+        # Close the new tab
+        detail_page.close()
+
+
+async def fetch_meeting_data_async(page, meeting_link, visit_number):
+    """Tab-pool job: load one meeting in a reused tab, extract its vote rows and save them."""
+    print(f"Visiting meeting link: {meeting_link}")
+    metrics = get_metrics()
+
+    with metrics.stage('detail_navigation'):
+        await page.goto(meeting_link)
+        await page.wait_for_load_state("domcontentloaded")
+
+        # Wait for the table with meeting details to load
+        await page.wait_for_selector('table', timeout=10000)
+
+    with metrics.stage('table_extract'):
+        extracted_meeting_data = meeting_rows(clean_snapshot(await page.evaluate(TABLE_SNAPSHOT_JS)))
+
+    # Write off the event loop so the other tabs keep going
+    await asyncio.to_thread(save_meeting_data, extracted_meeting_data, visit_number, meeting_link)
+    metrics.inc('meetings_saved_total')
 
-    for row in rows:
-        # Fetch all td elements
-        cells = row.query_selector_all('td')
-        if cells:  # Ensure there are cells to process
-            row_data = {}
-            for index, cell in enumerate(cells):
-                # Check if the cell is visible
-                if cell.is_visible():
-                    # Fetch the main text content of the cell
-                    cell_text = cell.inner_text().strip()
-
-                    # Only proceed if cell_text is not empty and we have a corresponding header
-                    if cell_text and index < len(header_list):
-                        header = header_list[index]
-                        row_data[header] = {
-                            'text': cell_text,
-                            'title': cell.get_attribute('title') or ''
-                        }
-
-            # Swap the data between "Shares Voted" and "For/Against Management"
-            if 'Shares Voted' in row_data and 'For/Against Management' in row_data:
-                row_data['Shares Voted']['text'], row_data['For/Against Management']['text'] = (
-                    row_data['For/Against Management']['text'],
-                    row_data['Shares Voted']['text']
-                )
-
-            # Avoid adding incomplete or empty rows
-            if row_data and all(key in row_data for key in ['Item', 'Proposal Description', 'Vote Decision']):
-                item_text = row_data['Item']['text']
-                if item_text not in [entry['Item']['text'] for entry in extracted_meeting_data]:
-                    extracted_meeting_data.append(row_data)
-
-    # Save the extracted meeting data to a JSON file
+
+def save_meeting_data(extracted_meeting_data, visit_number, meeting_link=None):
+    """Write one meeting's rows; the visit number only names the file, its Meeting ID identifies it."""
+    meeting_id = meeting_id_cell(meeting_link)
+    if meeting_id is not None:
+        for row_data in extracted_meeting_data:
+            row_data['Meeting ID'] = dict(meeting_id)
     filename = f'meeting_data_{visit_number}.json'
-    with open(filename, 'w', encoding='utf-8') as json_file:
-        json.dump(extracted_meeting_data, json_file, ensure_ascii=False, indent=2)
-        print(f"Meeting data saved to {filename}")
+    with get_metrics().stage('disk_write'):
+        with open(filename, 'w', encoding='utf-8') as json_file:
+            json.dump(extracted_meeting_data, json_file, ensure_ascii=False, indent=2)
+    print(f"Meeting data saved to {filename}")
+
+
+
+
 
-    # Close the new tab
-    new_page.close()
+def filters_applied(page, start_date, end_date):
+    """True when a page restored from a saved session already shows the requested listing."""
+    try:
+        page.wait_for_selector('table tbody tr', timeout=10000)
+    except Exception:
+        return False
+    return page.evaluate(FILTERS_APPLIED_JS, [START_DATE_INPUT, END_DATE_INPUT, CHECKBOX_SELECTOR, start_date, end_date])
 
 
+def apply_filters(page, start_date, end_date):
+    """Fill the date range, tick every fund and apply the filter."""
+    # Fill in start and end dates
+    page.wait_for_selector(START_DATE_INPUT, timeout=5000)
+    start_input_element = page.query_selector(START_DATE_INPUT)
+    start_input_element.fill(start_date)
 
+    page.wait_for_selector(END_DATE_INPUT, timeout=5000)
+    end_input_element = page.query_selector(END_DATE_INPUT)
+    end_input_element.fill(end_date)
+
+    # Click all checkboxes
+    checkboxes = page.query_selector_all(CHECKBOX_SELECTOR)
+    for checkbox in checkboxes:
+        checkbox.check()
+
+    # Click the Apply button once the form has accepted the dates
+    wait_for_enabled(page, 'glnew_apply_enabled', APPLY_BUTTON)
+    apply_button = page.query_selector(APPLY_BUTTON)
+    if apply_button and not apply_button.is_disabled():
+        # The meetings-per-page dropdown appears once the filtered listing has loaded
+        with wait_for_xhr(page, 'glnew_listing', MEETINGS_XHR):
+            apply_button.click()
+        print("Apply button clicked.")
+    else:
+        print("Apply button is disabled or not found.")
+
+
+def set_page_size(page):
+    """Switch the listing to 100 meetings per page."""
+    # Open the dropdown for meetings per page
+    meetings_per_page_button = page.query_selector('button:has-text("1–10")')
+    if meetings_per_page_button:
+        meetings_per_page_button.click()  # Click to open the dropdown
+        print("Opened the dropdown for meetings per page.")
+
+        # Wait for the button for "100" meetings per page to be visible
+        page.wait_for_selector('button.t-item:has-text("100")', timeout=10000)
+        
+        # Click the "100" button to select it
+        option_button = page.query_selector('button.t-item:has-text("100")')
+        if option_button:
+            # The table reloads with 100 rows
+            with wait_for_xhr(page, 'glnew_listing', MEETINGS_XHR):
+                option_button.click()
+            print("Set meetings per page to 100.")
+        else:
+            print("100 meetings per page option not found.")
+    else:
+        print("Meetings per page dropdown button not found.")
 
 
 def handle_pagination(page, current_page, total_pages):
@@ -112,17 +282,10 @@ def handle_pagination(page, current_page, total_pages):
             page.wait_for_selector(next_button_selector, timeout=10000)
             next_button = page.query_selector(next_button_selector)
             if next_button and not next_button.is_disabled() and next_button.is_visible():
-                next_button.click()
+                # Wait until the next page's rows have replaced the current ones
+                with wait_for_change(page, 'glnew_page', row_set('table tbody tr')):
+                    next_button.click()
                 print("Navigated to the next page.")
-                
-                # Wait for the page to load
-                page.wait_for_load_state("domcontentloaded")  # Wait for the page to load completely
-                
-                # Ensure the table is visible after navigation
-                page.wait_for_selector('table', timeout=10000)
-
-                # Optionally wait a moment for data to settle
-                page.wait_for_timeout(2000)  # Adjust this timeout as needed
 
             else:
                 print("Next button is disabled, not visible, or not found.")
@@ -133,76 +296,38 @@ def handle_pagination(page, current_page, total_pages):
 
 
 def scrape_votedisclosure(start_date, end_date):
-    """Main function to scrape data from the Vote Disclosure website."""
+    """Main function to scrape data from the Vote Disclosure website; returns a summary of the run."""
+    summary = {'start_date': start_date, 'end_date': end_date, 'pages': 0, 'meetings': 0, 'failed': 0,
+               'complete': False}
     visited_links = set()  # Cache to keep track of visited links
     visit_number = 1  # For naming meeting files
+    metrics = start_run('glnew')
+    clock = StartupClock()
+    session = SavedSession('glnew', {'url': LANDING_URL, 'start_date': start_date, 'end_date': end_date})
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
+        browser = connect_browser(p)
+        page = new_page(session.new_context(browser))
+        # In hybrid mode the listing responses tell us each meeting's funds and the site ID
+        capture = ListingCapture(page, MEETINGS_XHR) if MODE == 'hybrid' else None
 
-        # Navigate to the target page
-        page.goto("https://votedisclosure.glasslewis.com/Russell%20Australia", timeout=100000)
+        # Navigate to the target page, or to where the saved session left the filtered listing
+        page.goto(session.url or LANDING_URL, timeout=100000)
         page.wait_for_load_state("domcontentloaded")
         print("Page loaded successfully.")
 
         # Wait for the form to be present and visible
         page.wait_for_selector('form[novalidate]', timeout=10000)
 
-        # Input selectors for date inputs
-        start_date_input_selector = 'tui-input-date[formcontrolname="start"] input[automation-id="tui-primitive-textfield__native-input"]'
-        end_date_input_selector = 'tui-input-date[formcontrolname="end"] input[automation-id="tui-primitive-textfield__native-input"]'
-
-        # Fill in start and end dates
-        page.wait_for_selector(start_date_input_selector, timeout=5000)
-        start_input_element = page.query_selector(start_date_input_selector)
-        start_input_element.fill(start_date)
-
-        page.wait_for_timeout(1000)
-
-        page.wait_for_selector(end_date_input_selector, timeout=5000)
-        end_input_element = page.query_selector(end_date_input_selector)
-        end_input_element.fill(end_date)
-
-        # Wait a moment after filling the dates
-        page.wait_for_timeout(1000)
-
-        # Click all checkboxes
-        checkboxes = page.query_selector_all('input[automation-id="tui-checkbox__native"]')
-        for checkbox in checkboxes:
-            checkbox.check()
-
-        # Click the Apply button
-        apply_button_selector = 'button[data-testid="main-page-submit-button"]'
-        page.wait_for_selector(apply_button_selector, timeout=5000)
-        apply_button = page.query_selector(apply_button_selector)
-        if apply_button and not apply_button.is_disabled():
-            apply_button.click()
-            print("Apply button clicked.")
+        clock.warm = session.url is not None and filters_applied(page, start_date, end_date)
+        if clock.warm:
+            print("Reusing the saved session's filters.")
+            if len(snapshot_table(page)['rows']) <= 10:
+                set_page_size(page)
         else:
-            print("Apply button is disabled or not found.")
-
-        # Wait for the dropdown to become visible after clicking the Apply button
-        page.wait_for_timeout(2000)  # Wait a moment for the UI to settle
-
-        # Open the dropdown for meetings per page
-        meetings_per_page_button = page.query_selector('button:has-text("1–10")')
-        if meetings_per_page_button:
-            meetings_per_page_button.click()  # Click to open the dropdown
-            print("Opened the dropdown for meetings per page.")
-
-            # Wait for the button for "100" meetings per page to be visible
-            page.wait_for_selector('button.t-item:has-text("100")', timeout=10000)
-            
-            # Click the "100" button to select it
-            option_button = page.query_selector('button.t-item:has-text("100")')
-            if option_button:
-                option_button.click()
-                print("Set meetings per page to 100.")
-            else:
-                print("100 meetings per page option not found.")
-        else:
-            print("Meetings per page dropdown button not found.")
+            apply_filters(page, start_date, end_date)
+            set_page_size(page)
+        session.save(page)
 
         # Wait for the total number of pages to be visible
         page.wait_for_selector('.t-pages', timeout=10000)
@@ -212,34 +337,57 @@ def scrape_votedisclosure(start_date, end_date):
         total_pages = int(re.search(r'\d+', total_pages_text).group())
         print(f"Total pages to scrape: {total_pages}")
 
-        # Iterate through each page
-        for page_number in range(1, total_pages + 1):
-            print(f"Scraping page {page_number}...")
-            fetch_page_data(page, page_number)
-
-            # Iterate through rows to find hrefs only in the "Company Name" column
-            rows = page.query_selector_all('table tr')
-            for row in rows:
-                cells = row.query_selector_all('td')
-                if cells:
-                    # Check if the first cell corresponds to "Company Name"
-                    company_name_cell = cells[0]  # Adjust index based on your table structure
-                    link = company_name_cell.query_selector('a')
-                    if link:
-                        href = link.get_attribute('href')
+        # Meeting pages are fetched by a pool of reused tabs (or over the API) while the listing keeps paginating
+        if capture is not None:
+            pool = HybridDetailFetcher(capture, save_meeting_data)
+        else:
+            pool = AsyncTabPool(fetch_meeting_data_async) if DETAIL_TABS > 0 else None
+
+        try:
+            # Iterate through each page
+            for page_number in range(1, total_pages + 1):
+                print(f"Scraping page {page_number}...")
+                snapshot = fetch_page_data(page, page_number)
+                clock.first_row()
+
+                # Follow the hrefs in the "Company Name" column (the first cell of each row)
+                for row in snapshot['rows']:
+                    href = row['link']
+                    if href is not None:
                         if href and href not in visited_links:
                             visited_links.add(href)  # Mark this link as visited
                             meeting_link = f"https://votedisclosure.glasslewis.com{href}"  # Complete the href
-                            fetch_meeting_data(browser, meeting_link, visit_number)  # Fetch data in a new tab
+                            # The visit number is fixed here, in listing order, whichever tab gets the job
+                            if pool is not None:
+                                pool.submit(meeting_link, visit_number)
+                            else:
+                                fetch_meeting_data(browser, meeting_link, visit_number)  # Fetch data in a new tab
                             visit_number += 1
                     else:
                         print("No link found in the Company Name cell.")
 
-            # Handle pagination
-            handle_pagination(page, page_number, total_pages)
+                # Handle pagination
+                handle_pagination(page, page_number, total_pages)
+                summary['pages'] += 1
+        finally:
+            if pool is not None:
+                print(f"Detail pool summary: {pool.close()}")
+
+        # Meetings the API could not serve are rendered in the browser instead
+        if capture is not None:
+            for meeting_link, meeting_visit_number in pool.failed:
+                fetch_meeting_data(browser, meeting_link, meeting_visit_number)
+        elif pool is not None:
+            summary['failed'] = len(pool.failed)
+        summary['meetings'] = visit_number - 1
+        summary['complete'] = True
 
         # Close the browser
         browser.close()
+    if LEAN:
+        print(f"Lean profile summary: {blocked_summary(metrics)}")
+    print(f"Metrics saved to {metrics.write()}")
+    return summary
 
 
 if __name__ == "__main__":
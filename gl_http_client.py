@@ -0,0 +1,252 @@
+import os
+import time
+import random
+import asyncio
+import contextlib
+import threading
+import requests
+import aiohttp
+from requests.adapters import HTTPAdapter
+from scrape_metrics import get_metrics
+
+# Status codes that are worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+MAX_RETRIES = int(os.environ.get('GL_MAX_RETRIES', '5'))
+BACKOFF_BASE = float(os.environ.get('GL_BACKOFF_BASE', '0.5'))  # Seconds
+BACKOFF_MAX = float(os.environ.get('GL_BACKOFF_MAX', '30'))  # Seconds
+# Client-side request rate cap. Off (0) by default: GL_MAX_CONCURRENCY already bounds the load, and 429s
+# are retried with backoff. Set it when the API enforces a known quota; sharded crawls split it across processes.
+REQUESTS_PER_SECOND = float(os.environ.get('GL_REQUESTS_PER_SECOND', '0'))
+POOL_SIZE = int(os.environ.get('GL_POOL_SIZE', '20'))
+REQUEST_TIMEOUT = float(os.environ.get('GL_REQUEST_TIMEOUT', '60'))  # Seconds
+
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by sync and async callers."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _reserve(self):
+        """Take one token and return how long the caller must wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Tokens may go negative: that queues callers fairly behind each other
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class RequestStats:
+    """Counters for requests, retries and failures over one run, plus per-request latencies."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.status_counts = {}
+        self.latencies = []
+        self.lock = threading.Lock()
+
+    def record(self, status=None, retried=False, failed=False, latency=None):
+        metrics = get_metrics()
+        metrics.inc('http_requests_total')
+        if status is not None:
+            metrics.inc('http_responses_total', status=status)
+        if retried:
+            metrics.inc('http_retries_total')
+        if failed:
+            metrics.inc('http_failures_total')
+        with self.lock:
+            self.requests += 1
+            if latency is not None:
+                self.latencies.append(latency)
+            if status is not None:
+                self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            if retried:
+                self.retries += 1
+            if failed:
+                self.failures += 1
+
+    def percentile(self, fraction):
+        """Latency percentile in seconds (nearest-rank), or None before any request finished."""
+        with self.lock:
+            ordered = sorted(self.latencies)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def summary(self):
+        p50 = self.percentile(0.50)
+        p99 = self.percentile(0.99)
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'retries': self.retries,
+                'failures': self.failures,
+                'status_counts': dict(self.status_counts),
+                'latency_p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+                'latency_p99_ms': round(p99 * 1000, 1) if p99 is not None else None
+            }
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter, never shorter than a server Retry-After."""
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass  # HTTP-date form of Retry-After; fall back to our own backoff
+    return delay
+
+
+class GlassLewisClient:
+    """Pooled HTTP client with retry/backoff and rate limiting for the vote-disclosure API.
+
+    The same client serves blocking calls through a keep-alive ``requests.Session``
+    and asyncio calls through an ``aiohttp.ClientSession`` opened with ``start_async``.
+    """
+
+    def __init__(self, requests_per_second=REQUESTS_PER_SECOND, max_retries=MAX_RETRIES, pool_size=POOL_SIZE):
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.rate_limiter = TokenBucket(requests_per_second) if requests_per_second > 0 else None
+        self.stats = RequestStats()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.async_session = None
+
+    def request(self, method, url, **kwargs):
+        """Send a request, retrying throttled, failed and 5xx responses. Returns the last response."""
+        kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+
+            last_attempt = attempt == self.max_retries
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                self.stats.record(retried=not last_attempt, failed=last_attempt)
+                if last_attempt:
+                    raise
+                print(f"Request error ({e}); retrying {url}")
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            latency = time.monotonic() - started
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                self.stats.record(response.status_code, retried=True, latency=latency)
+                time.sleep(backoff_delay(attempt, response.headers.get('Retry-After')))
+                continue
+
+            self.stats.record(response.status_code, failed=not response.ok, latency=latency)
+            get_metrics().inc('bytes_received_total', len(response.content))
+            return response
+
+    async def start_async(self, limit=None):
+        """Open the aiohttp session; must be called from inside the running event loop."""
+        connector = aiohttp.TCPConnector(limit=limit or self.pool_size)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        self.async_session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def close_async(self):
+        if self.async_session is not None:
+            await self.async_session.close()
+            self.async_session = None
+
+    async def request_async(self, method, url, **kwargs):
+        """Async counterpart of ``request``. Returns ``(response, body)`` with the body already read."""
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async()
+
+            last_attempt = attempt == self.max_retries
+            started = time.monotonic()
+            try:
+                async with self.async_session.request(method, url, **kwargs) as response:
+                    body = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.stats.record(retried=not last_attempt, failed=last_attempt)
+                if last_attempt:
+                    raise
+                print(f"Request error ({e!r}); retrying {url}")
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+
+            latency = time.monotonic() - started
+            if response.status in RETRY_STATUSES and not last_attempt:
+                self.stats.record(response.status, retried=True, latency=latency)
+                await asyncio.sleep(backoff_delay(attempt, response.headers.get('Retry-After')))
+                continue
+
+            self.stats.record(response.status, failed=not response.ok, latency=latency)
+            get_metrics().inc('bytes_received_total', len(body))
+            return response, body
+
+    @contextlib.asynccontextmanager
+    async def stream_async(self, method, url, **kwargs):
+        """Like ``request_async`` but yields the open response so the body can be read incrementally.
+
+        Retries only happen before the body is handed over; once streaming starts,
+        errors propagate to the caller.
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async()
+
+            last_attempt = attempt == self.max_retries
+            started = time.monotonic()
+            try:
+                response = await self.async_session.request(method, url, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.stats.record(retried=not last_attempt, failed=last_attempt)
+                if last_attempt:
+                    raise
+                print(f"Request error ({e!r}); retrying {url}")
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+
+            # Time to response headers; the body is consumed by the caller
+            latency = time.monotonic() - started
+            if response.status in RETRY_STATUSES and not last_attempt:
+                self.stats.record(response.status, retried=True, latency=latency)
+                response.release()
+                await asyncio.sleep(backoff_delay(attempt, response.headers.get('Retry-After')))
+                continue
+
+            self.stats.record(response.status, failed=not response.ok, latency=latency)
+            if response.content_length:
+                get_metrics().inc('bytes_received_total', response.content_length)
+            try:
+                yield response
+            finally:
+                response.release()
+            return
+
+    def close(self):
+        self.session.close()
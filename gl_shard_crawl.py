@@ -0,0 +1,228 @@
+import os
+import json
+import asyncio
+from datetime import date, timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+from Backend_webscraping_gl import (
+    FUND_IDS, MAX_CONCURRENT_REQUESTS, ListingError, iter_page_meetings, meeting_fund_ids,
+    fetch_meeting_data_async, save_meeting_record
+)
+from gl_http_client import REQUESTS_PER_SECOND, GlassLewisClient
+from response_cache import open_default_cache
+from output_sink import open_sink
+
+SHARD_WINDOW_DAYS = int(os.environ.get('GL_SHARD_WINDOW_DAYS', '30'))
+SHARD_FUND_GROUP_SIZE = int(os.environ.get('GL_SHARD_FUND_GROUP_SIZE', '0'))  # 0 keeps all funds in one group
+SHARD_WORKERS = int(os.environ.get('GL_SHARD_WORKERS', str(os.cpu_count() or 1)))
+
+
+def process_rate(processes, requests_per_second=REQUESTS_PER_SECOND):
+    """Each process's share of GL_REQUESTS_PER_SECOND, so the pool as a whole stays within it (0 stays off)."""
+    return requests_per_second / max(1, processes)
+
+
+def plan_shards(start_date, end_date, window_days=SHARD_WINDOW_DAYS, fund_group_size=SHARD_FUND_GROUP_SIZE,
+                funds=FUND_IDS):
+    """Split the date range into windows and, optionally, the fund list into groups.
+
+    Every window is paired with every fund group, so each shard is an independent
+    Meetings query: ``{'shard', 'start_date', 'end_date', 'funds'}``.
+    """
+    windows = []
+    window_start = date.fromisoformat(start_date)
+    last_day = date.fromisoformat(end_date)
+    while window_start <= last_day:
+        window_end = min(last_day, window_start + timedelta(days=window_days - 1))
+        windows.append((window_start.isoformat(), window_end.isoformat()))
+        window_start = window_end + timedelta(days=1)
+
+    if fund_group_size > 0:
+        fund_groups = [funds[i:i + fund_group_size] for i in range(0, len(funds), fund_group_size)]
+    else:
+        fund_groups = [list(funds)]
+
+    shards = []
+    for window_start, window_end in windows:
+        for fund_group in fund_groups:
+            shards.append({
+                'shard': len(shards) + 1,
+                'start_date': window_start,
+                'end_date': window_end,
+                'funds': fund_group
+            })
+    return shards
+
+
+async def list_shard_async(shard, page_size, requests_per_second=REQUESTS_PER_SECOND):
+    """Walk the Meetings listing for one shard and return every meeting on it."""
+    client = GlassLewisClient(requests_per_second)
+    meetings = []
+    await client.start_async()
+    try:
+        page_number = 1
+        while True:
+            page_count = 0
+            async for meeting in iter_page_meetings(client, shard['start_date'], shard['end_date'],
+                                                    page_size, page_number, shard['funds']):
+                page_count += 1
+                meetings.append(meeting)
+            if page_count < page_size:
+                break
+            page_number += 1
+    finally:
+        await client.close_async()
+        client.close()
+
+    print(f"Shard {shard['shard']} ({shard['start_date']} to {shard['end_date']}, "
+          f"{len(shard['funds'])} funds): {len(meetings)} meetings, {client.stats.summary()['retries']} retries")
+    return meetings
+
+
+def list_shard(shard, page_size, requests_per_second=REQUESTS_PER_SECOND):
+    """Process-pool entry point: each shard runs its own event loop and client."""
+    try:
+        return shard['shard'], asyncio.run(list_shard_async(shard, page_size, requests_per_second)), None
+    except ListingError as e:
+        return shard['shard'], [], str(e)
+
+
+def merge_shard_listings(listings):
+    """Merge per-shard meeting lists, de-duplicating on meetingId and uniting their funds.
+
+    The merged list is sorted like the API sorts a single query (company name,
+    then meeting ID), so record numbering stays deterministic across runs.
+    """
+    merged = {}
+    duplicates = 0
+    for meetings in listings:
+        for meeting in meetings:
+            meeting_id = meeting.get("meetingId")
+            if not meeting_id:
+                continue
+            existing = merged.get(meeting_id)
+            if existing is None:
+                merged[meeting_id] = dict(meeting, funds=list(meeting.get("funds", [])))
+                continue
+
+            # Same meeting seen through another window or fund group: keep every fund once
+            duplicates += 1
+            known_funds = set(meeting_fund_ids(existing))
+            for fund in meeting.get("funds", []):
+                if fund.get("fundId") and fund.get("fundId") not in known_funds:
+                    existing["funds"].append(fund)
+                    known_funds.add(fund.get("fundId"))
+
+    ordered = sorted(merged.values(), key=lambda m: (str(m.get("companyName", "")).lower(), str(m["meetingId"])))
+    return ordered, duplicates
+
+
+async def fetch_detail_chunk_async(items, internalcode, month, source, base_path, sink_prefix, max_concurrency,
+                                   requests_per_second=REQUESTS_PER_SECOND):
+    """Fetch one chunk of ``(page_number, record_number, meeting_id, fund_ids)`` items."""
+    client = GlassLewisClient(requests_per_second)
+    cache = open_default_cache()
+    sink = open_sink(base_path, sink_prefix)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    failed = 0
+
+    async def fetch_one(page_number, record_number, meeting_id, fund_ids):
+        nonlocal failed
+        async with semaphore:
+            meeting_data = await fetch_meeting_data_async(client, meeting_id, fund_ids, cache)
+        if meeting_data:
+            save_meeting_record(sink, meeting_data, fund_ids, page_number, record_number, internalcode, month, source)
+        else:
+            failed += 1
+
+    await client.start_async(limit=max_concurrency)
+    try:
+        await asyncio.gather(*(fetch_one(*item) for item in items))
+    finally:
+        await client.close_async()
+        client.close()
+        sink.close()
+        if cache is not None:
+            cache.close()
+
+    return {'meetings': len(items), 'failed': failed, 'requests': client.stats.summary()}
+
+
+def fetch_detail_chunk(items, internalcode, month, source, base_path, sink_prefix, max_concurrency,
+                       requests_per_second=REQUESTS_PER_SECOND):
+    """Process-pool entry point for a chunk of meeting-detail fetches."""
+    return asyncio.run(fetch_detail_chunk_async(items, internalcode, month, source, base_path, sink_prefix,
+                                                max_concurrency, requests_per_second))
+
+
+def run_sharded_crawl(start_date, end_date, page_size, internalcode, month, source, base_path,
+                      window_days=SHARD_WINDOW_DAYS, fund_group_size=SHARD_FUND_GROUP_SIZE, workers=SHARD_WORKERS,
+                      max_concurrency=MAX_CONCURRENT_REQUESTS):
+    """Crawl a date range as parallel shards and write the usual PageData/MeetData output.
+
+    Phase one lists every shard in a process pool and merges the results, so a
+    meeting that appears in several shards is fetched only once. Phase two
+    re-pages the merged list into ``page_size`` pages and spreads the detail
+    fetches over the same pool, each process with its own client. The
+    processes running at once split GL_REQUESTS_PER_SECOND between them, so
+    sharding never raises the request rate the host sees.
+    """
+    shards = plan_shards(start_date, end_date, window_days, fund_group_size)
+    print(f"Planned {len(shards)} shards across {workers} processes.")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        listings = []
+        listing_rate = process_rate(min(workers, len(shards)))
+        for shard_id, meetings, error in pool.map(list_shard, shards, [page_size] * len(shards),
+                                                  [listing_rate] * len(shards)):
+            if error:
+                # A partial listing would silently drop meetings, so stop before fetching details
+                raise ListingError(f"shard {shard_id} failed: {error}")
+            listings.append(meetings)
+
+        meetings, duplicates = merge_shard_listings(listings)
+        print(f"Merged {len(meetings)} unique meetings ({duplicates} duplicates across shards).")
+
+        # Re-page the merged listing so file names follow the single-query layout
+        items = []
+        sink = open_sink(base_path, f'Records_{internalcode}_{month}_{source}')
+        for offset in range(0, len(meetings), page_size):
+            page_number = offset // page_size + 1
+            page_data = meetings[offset:offset + page_size]
+            sink.write(f'PageData_{internalcode}_{month}_PG{page_number}_{source}.json', page_data)
+            for record_number, meeting in enumerate(page_data, start=1):
+                items.append((page_number, record_number, meeting["meetingId"], meeting_fund_ids(meeting)))
+        sink.close()
+
+        # Round-robin keeps the chunks balanced; each process writes its own NDJSON file if that sink is used
+        chunks = [items[i::workers] for i in range(workers) if items[i::workers]]
+        detail_rate = process_rate(len(chunks))
+        futures = [
+            pool.submit(fetch_detail_chunk, chunk, internalcode, month, source, base_path,
+                        f'Records_{internalcode}_{month}_{source}_W{index}', max_concurrency, detail_rate)
+            for index, chunk in enumerate(chunks, start=1)
+        ]
+        results = [future.result() for future in futures]
+
+    summary = {
+        'shards': len(shards),
+        'meetings': len(meetings),
+        'duplicates': duplicates,
+        'failed': sum(result['failed'] for result in results),
+        'retries': sum(result['requests']['retries'] for result in results)
+    }
+    print(f"Sharded crawl summary: {json.dumps(summary)}")
+    return summary
+
+
+if __name__ == "__main__":
+    # Dynamic inputs
+    start_date = input("Enter start date (YYYY-MM-DD): ")
+    end_date = input("Enter end date (YYYY-MM-DD): ")
+    page_size = int(input("Enter page Data size: "))
+    internalcode = input("Enter internal code: ")
+    month = input("Enter month: ")
+    source = input("Enter source: ")
+    base_path = input("Enter the base path to save files: ")
+
+    run_sharded_crawl(start_date, end_date, page_size, internalcode, month, source, base_path)
@@ -0,0 +1,178 @@
+import os
+import re
+import asyncio
+import threading
+
+from Backend_webscraping_gl import MAX_CONCURRENT_REQUESTS, fetch_meeting_data_async, meeting_fund_ids
+from gl_http_client import GlassLewisClient
+from response_cache import open_default_cache
+from scrape_metrics import get_metrics
+from vote_store import GL_BROWSER_COLUMNS, normalize_api_meeting
+
+API_CONCURRENCY = int(os.environ.get('GLNEW_API_CONCURRENCY', str(MAX_CONCURRENT_REQUESTS)))
+API_QUEUE_SIZE = int(os.environ.get('GLNEW_API_QUEUE_SIZE', '200'))
+
+# Columns in the order the meeting page's table shows them
+VOTE_FIELDS = ['item', 'description', 'proponent', 'mgmt_rec', 'vote', 'for_against_mgmt', 'shares', 'fund_name']
+
+
+def meeting_id_from_link(href):
+    """The meeting ID in a Company Name href: its last run of digits, or None."""
+    numbers = re.findall(r'\d+', href or '')
+    return numbers[-1] if numbers else None
+
+
+class ListingCapture:
+    """Remember each meeting's funds and the site ID from the listing requests the page makes.
+
+    The Meetings listing the table is rendered from already says which funds
+    voted at every meeting, so the detail request can ask for exactly those,
+    as the backend scraper does. Nothing is assumed for a meeting or site the
+    capture missed: the backend's defaults belong to one particular site.
+    """
+
+    def __init__(self, page, listing_xhr):
+        self.listing_xhr = listing_xhr
+        self.lock = threading.Lock()
+        self.fund_ids = {}
+        self.site_id = None
+        page.on('response', self.on_response)
+
+    def on_response(self, response):
+        if self.listing_xhr not in response.url or response.request.method != 'POST' or response.status != 200:
+            return
+        try:
+            meetings = response.json()
+            payload = response.request.post_data_json or {}
+        except Exception:
+            return
+        if not isinstance(meetings, list):
+            return
+
+        with self.lock:
+            self.site_id = payload.get('siteId') or self.site_id
+            for meeting in meetings:
+                meeting_id = meeting.get('meetingId')
+                if meeting_id is not None:
+                    self.fund_ids[str(meeting_id)] = meeting_fund_ids(meeting)
+
+    def funds_for(self, meeting_id):
+        """The meeting's fund IDs from the listing, or None when it was not captured."""
+        with self.lock:
+            return self.fund_ids.get(meeting_id) or None
+
+
+def api_meeting_rows(meeting_data):
+    """Vote rows in the shape fetch_meeting_data saves, built from a meeting-detail payload.
+
+    Like the rendered page, this keeps one row per Item: the first fund vote
+    the payload lists for it, with its Fund Name filled in.
+    """
+    _, proposals, votes = normalize_api_meeting(meeting_data)
+    proposals = {proposal['item']: proposal for proposal in proposals}
+    extracted_meeting_data = []
+    seen_items = set()
+    for vote in votes:
+        if vote['item'] in seen_items:
+            continue
+        record = dict(proposals.get(vote['item'], {}), **vote)
+        row_data = {}
+        for field in VOTE_FIELDS:
+            if record.get(field):
+                row_data[GL_BROWSER_COLUMNS[field]] = {'text': record[field], 'title': ''}
+        if all(key in row_data for key in ['Item', 'Proposal Description', 'Vote Decision']):
+            seen_items.add(vote['item'])
+            extracted_meeting_data.append(row_data)
+    return extracted_meeting_data
+
+
+class HybridDetailFetcher:
+    """Fetch meeting details over the JSON API while the browser keeps paginating the listing.
+
+    A drop-in for AsyncTabPool: ``submit(meeting_link, visit_number)`` queues a
+    meeting and ``save(rows, visit_number, meeting_link)`` writes it, so the
+    files match the browser path. Requests go through a GlassLewisClient of the
+    fetcher's own, with the backend's rate limit, retries and response cache,
+    so closing it leaves the backend's shared client open. Meetings the API
+    cannot serve, or whose funds or site the listing capture did not see, are
+    left in ``failed`` for the caller to render in the browser instead.
+    """
+
+    def __init__(self, capture, save, concurrency=API_CONCURRENCY, queue_size=API_QUEUE_SIZE):
+        self.capture = capture
+        self.save = save
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.completed = 0
+        self.failed = []
+        self.loop = None
+        self.queue = None
+        self.error = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise RuntimeError(f"API fetcher failed to start: {self.error}")
+
+    def run(self):
+        try:
+            asyncio.run(self.serve())
+        except Exception as e:
+            self.error = e
+            self.ready.set()
+
+    async def serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        client = GlassLewisClient()
+        cache = open_default_cache()
+        await client.start_async(self.concurrency)
+        try:
+            self.ready.set()
+            await asyncio.gather(*(self.work(client, cache) for _ in range(self.concurrency)))
+        finally:
+            await client.close_async()
+            client.close()
+            if cache is not None:
+                cache.close()
+
+    async def work(self, client, cache):
+        metrics = get_metrics()
+        while True:
+            job = await self.queue.get()
+            metrics.set_gauge('detail_queue_depth', self.queue.qsize())
+            if job is None:
+                break
+
+            meeting_link, visit_number = job
+            meeting_id = meeting_id_from_link(meeting_link)
+            fund_ids = self.capture.funds_for(meeting_id) if meeting_id is not None else None
+            site_id = self.capture.site_id
+            meeting_data = None
+            if fund_ids and site_id:
+                meeting_data = await fetch_meeting_data_async(client, meeting_id, fund_ids, cache, site_id)
+            if meeting_data is None:
+                metrics.inc('api_fallbacks_total')
+                self.failed.append(job)
+                continue
+
+            extracted_meeting_data = api_meeting_rows(meeting_data)
+            # Write off the event loop so the other requests keep going
+            await asyncio.to_thread(self.save, extracted_meeting_data, visit_number, meeting_link)
+            metrics.inc('meetings_saved_total')
+            self.completed += 1
+
+    def submit(self, *job):
+        """Queue a meeting from the calling thread, waiting while the queue is full."""
+        if not self.thread.is_alive():
+            raise RuntimeError(f"API fetcher has stopped: {self.error}")
+        asyncio.run_coroutine_threadsafe(self.queue.put(job), self.loop).result()
+
+    def close(self):
+        """Finish every queued meeting, then close the HTTP session."""
+        if self.thread.is_alive():
+            for _ in range(self.concurrency):
+                asyncio.run_coroutine_threadsafe(self.queue.put(None), self.loop).result()
+            self.thread.join()
+        return {'completed': self.completed, 'failed': len(self.failed)}
@@ -0,0 +1,109 @@
+import os
+import asyncio
+import threading
+
+from playwright.async_api import async_playwright
+
+from browser_profile import new_page_async
+from browser_session import connect_browser_async
+from gl_http_client import backoff_delay
+from scrape_metrics import get_metrics
+
+DETAIL_TABS = int(os.environ.get('GLNEW_DETAIL_TABS', '4'))  # 0 keeps one fresh tab per meeting, one at a time
+DETAIL_QUEUE_SIZE = int(os.environ.get('GLNEW_DETAIL_QUEUE_SIZE', '100'))
+DETAIL_RETRIES = int(os.environ.get('GLNEW_DETAIL_RETRIES', '2'))
+
+
+class AsyncTabPool:
+    """A fixed set of reusable async Playwright tabs working through meeting links concurrently.
+
+    The pool runs its own event loop, browser and tabs on a background thread,
+    so the synchronous listing scraper keeps paginating while details are
+    fetched. ``submit`` blocks once ``queue_size`` jobs are waiting, which keeps
+    the listing from running far ahead of the tabs.
+
+    Every job is ``visit(page, *job)``. A job that raises is retried up to
+    ``retries`` times with backoff. If the tab itself has died, it is replaced,
+    so one bad page never takes the others down. Jobs that still fail are
+    collected in ``failed``.
+    """
+
+    def __init__(self, visit, tabs=DETAIL_TABS, queue_size=DETAIL_QUEUE_SIZE, retries=DETAIL_RETRIES):
+        self.visit = visit
+        self.tabs = tabs
+        self.queue_size = queue_size
+        self.retries = retries
+        self.completed = 0
+        self.retried = 0
+        self.failed = []
+        self.loop = None
+        self.queue = None
+        self.error = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise RuntimeError(f"Tab pool failed to start: {self.error}")
+
+    def run(self):
+        try:
+            asyncio.run(self.serve())
+        except Exception as e:
+            self.error = e
+            self.ready.set()
+
+    async def serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        async with async_playwright() as p:
+            browser = await connect_browser_async(p)
+            try:
+                pages = [await new_page_async(browser) for _ in range(self.tabs)]
+                self.ready.set()
+                await asyncio.gather(*(self.work(browser, page) for page in pages))
+            finally:
+                await browser.close()
+
+    async def work(self, browser, page):
+        metrics = get_metrics()
+        while True:
+            job = await self.queue.get()
+            metrics.set_gauge('detail_queue_depth', self.queue.qsize())
+            if job is None:
+                break
+
+            for attempt in range(self.retries + 1):
+                if page.is_closed():
+                    page = await new_page_async(browser)  # The tab crashed or was closed: replace it
+                try:
+                    await self.visit(page, *job)
+                    self.completed += 1
+                    break
+                except Exception as e:
+                    if attempt < self.retries:
+                        self.retried += 1
+                        metrics.inc('detail_retries_total')
+                        print(f"Retrying {job[0]} after error: {e}")
+                        await asyncio.sleep(backoff_delay(attempt))
+                    else:
+                        metrics.inc('meetings_failed_total')
+                        print(f"Giving up on {job[0]}: {e}")
+                        self.failed.append(job)
+
+        if not page.is_closed():
+            await page.close()
+
+    def submit(self, *job):
+        """Queue a job from the calling thread, waiting while the queue is full."""
+        if not self.thread.is_alive():
+            raise RuntimeError(f"Tab pool has stopped: {self.error}")
+        asyncio.run_coroutine_threadsafe(self.queue.put(job), self.loop).result()
+
+    def close(self):
+        """Let the tabs finish every queued job, then shut the browser down."""
+        if self.thread.is_alive():
+            for _ in range(self.tabs):
+                asyncio.run_coroutine_threadsafe(self.queue.put(None), self.loop).result()
+            self.thread.join()
+        return {'completed': self.completed, 'retried': self.retried, 'failed': len(self.failed)}
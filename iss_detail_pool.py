@@ -0,0 +1,102 @@
+import os
+import queue
+import logging
+import threading
+
+from playwright.sync_api import sync_playwright
+
+from browser_profile import new_page
+from browser_session import connect_browser
+from scrape_metrics import get_metrics
+
+DETAIL_RETRIES = int(os.environ.get('ISS_DETAIL_RETRIES', '1'))  # Further attempts for a job that raised
+
+
+class DetailPagePool:
+    """Visit detail views on N pages at once while the caller's grid page stays put.
+
+    Playwright's sync API is bound to the thread that started it, so every
+    worker thread runs its own Playwright instance and browser. Each worker
+    opens one context seeded with the main page's ``storage_state``, which
+    carries the session cookies and local storage over. ``visit(page, *job)``
+    is called for every submitted job. A job that raises is queued again up
+    to ``retries`` times, then collected in ``failed``.
+    """
+
+    def __init__(self, visit, workers, storage_state=None, retries=DETAIL_RETRIES):
+        self.visit = visit
+        self.storage_state = storage_state
+        self.retries = retries
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.settled = threading.Condition(self.lock)
+        self.outstanding = 0  # Submitted jobs not yet completed or given up on
+        self.completed = 0
+        self.retried = 0
+        self.failed = []
+        self.threads = [threading.Thread(target=self.run_worker, args=(index,), daemon=True)
+                        for index in range(1, workers + 1)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, *job):
+        with self.lock:
+            self.outstanding += 1
+        self.jobs.put((0, job))
+        get_metrics().set_gauge('detail_queue_depth', self.jobs.qsize())
+
+    def run_worker(self, index):
+        try:
+            with sync_playwright() as p:
+                browser = connect_browser(p)
+                try:
+                    context = browser.new_context(storage_state=self.storage_state)
+                    self.work(new_page(context))
+                finally:
+                    browser.close()
+        except Exception as e:
+            logging.error("Detail worker %d stopped: %s", index, e)
+
+    def work(self, page):
+        while True:
+            item = self.jobs.get()
+            if item is None:
+                return
+            attempt, job = item
+            get_metrics().set_gauge('detail_queue_depth', self.jobs.qsize())
+            try:
+                self.visit(page, *job)
+                with self.lock:
+                    self.completed += 1
+                    self.outstanding -= 1
+                    self.settled.notify_all()
+            except Exception as e:
+                logging.error("Error while visiting meeting detail %s (attempt %d): %s", job[0], attempt + 1, e)
+                with self.lock:
+                    if attempt < self.retries:
+                        self.retried += 1
+                        self.jobs.put((attempt + 1, job))
+                    else:
+                        self.failed.append(job)
+                        self.outstanding -= 1
+                        self.settled.notify_all()
+
+    def close(self):
+        """Wait for every queued job and its retries, then stop the workers and their browsers."""
+        with self.lock:
+            while self.outstanding and any(thread.is_alive() for thread in self.threads):
+                self.settled.wait(timeout=1)
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+
+        # Jobs left behind by workers that never started count as failures
+        while True:
+            try:
+                item = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self.failed.append(item[1])
+        return {'completed': self.completed, 'retried': self.retried, 'failed': len(self.failed)}
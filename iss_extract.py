@@ -0,0 +1,260 @@
+import os
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # optional: the BeautifulSoup extractor is used instead
+    etree = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional
+    LexborHTMLParser = None
+
+# 'auto' picks the fastest installed backend: selectolax, then lxml, then bs4
+HTML_PARSER = os.environ.get('ISS_HTML_PARSER', 'auto')
+
+# Define the keys we want to extract
+REQUIRED_KEYS = (
+    'listDetail_BallotItemNumber',
+    'listDetail_Proposal',
+    'listDetail_ShareholderProposal',
+    'listDetail_MgtRecVote',
+    'listDetail_ClientVoteList'
+)
+
+# BeautifulSoup's get_text() leaves out strings inside these tags, so the fast backends skip them too
+NON_TEXT_TAGS = {'script', 'style', 'template', 'rt', 'rp'}
+
+
+def is_hidden(style):
+    return (style or '').find('display:none') != -1
+
+
+def collect_grid_page(grid_cells):
+    """``(cells, hrefs)`` lists from an ``iter_grid_cells`` generator."""
+    cells = []
+    hrefs = []
+    for cell, href in grid_cells:
+        cells.append(cell)
+        if href:
+            hrefs.append(href)
+    return cells, hrefs
+
+
+def add_detail_cell(detail_data, aria_describedby, text_content, title):
+    detail_data[aria_describedby] = {
+        'text': text_content,
+        'title': title or ''
+    }
+
+
+class SoupExtractor:
+    """The original extraction: BeautifulSoup over the whole document, every tr and td."""
+
+    name = 'bs4'
+
+    def meeting_details(self, detail_content, meeting_id):
+        detail_soup = BeautifulSoup(detail_content, 'html.parser')
+
+        # Initialize the filtered data structure
+        filtered_data = {
+            'Meeting ID': meeting_id,
+            'Details': []
+        }
+
+        # Iterate through each row in the meeting details
+        for meeting_row in detail_soup.find_all('tr'):
+            detail_data = {}  # Initialize a dictionary for each detail entry
+
+            # Extract data from the <td> elements within the <tr>
+            for cell in meeting_row.find_all('td'):
+                aria_describedby = cell.get('aria-describedby', '')
+                text_content = cell.get_text(strip=True)
+
+                # Skip hidden cells or those without meaningful data
+                if aria_describedby in REQUIRED_KEYS and text_content and not is_hidden(cell.get('style', '')):
+                    add_detail_cell(detail_data, aria_describedby, text_content, cell.get('title', ''))
+
+            # Append the detail entry to the list if it contains data
+            if detail_data:
+                filtered_data['Details'].append(detail_data)
+
+        return filtered_data
+
+    def iter_grid_cells(self, page_content):
+        """Yield ``(cell, href)`` for every grid cell in document order; href is None without a link."""
+        soup = BeautifulSoup(page_content, 'html.parser')
+        for cell in soup.select('td[aria-describedby]'):
+            link = cell.find('a')
+            yield ({'aria_describedby': cell.get('aria-describedby', ''),
+                    'text': cell.get_text(strip=True),
+                    'title': cell.get('title', '')},
+                   link.get('href') if link else None)
+
+    def grid_page(self, page_content):
+        return collect_grid_page(self.iter_grid_cells(page_content))
+
+
+class RowCollector:
+    """Group matched cells under every <tr> that contains them, in document order.
+
+    The BeautifulSoup path visits each tr and all of its descendant tds, so a
+    cell inside a nested table counts for the inner and the outer row. The fast
+    backends select only the required cells and rebuild the same rows: adding
+    a cell's ancestor rows outermost first gives each row its first-seen
+    position, which is its document order.
+    """
+
+    def __init__(self):
+        self.rows = {}  # row key -> detail_data, in document order
+
+    def add(self, row_keys, aria_describedby, text_content, title):
+        for row_key in reversed(row_keys):
+            detail_data = self.rows.setdefault(row_key, {})
+            add_detail_cell(detail_data, aria_describedby, text_content, title)
+
+    def details(self):
+        return [detail_data for detail_data in self.rows.values() if detail_data]
+
+
+class LxmlExtractor:
+    """libxml2 parse plus precompiled XPath that touches only the required cells."""
+
+    name = 'lxml'
+
+    def __init__(self):
+        keys = ' or '.join(f'@aria-describedby="{key}"' for key in REQUIRED_KEYS)
+        self.detail_cells = etree.XPath(f'//td[{keys}]')
+        self.grid_cells = etree.XPath('//td[@aria-describedby]')
+        self.first_link = etree.XPath('(.//a)[1]/@href')
+
+    def text(self, element):
+        parts = []
+
+        def walk(node):
+            # Comments have a non-string tag; their text is skipped, their tail kept
+            if isinstance(node.tag, str) and node.tag not in NON_TEXT_TAGS:
+                if node.text:
+                    parts.append(node.text.strip())
+                for child in node:
+                    walk(child)
+                    if child.tail:
+                        parts.append(child.tail.strip())
+
+        walk(element)
+        return ''.join(parts)
+
+    def parse(self, content):
+        return lxml_html.document_fromstring(content)
+
+    def meeting_details(self, detail_content, meeting_id):
+        rows = RowCollector()
+        for cell in self.detail_cells(self.parse(detail_content)):
+            if is_hidden(cell.get('style')):
+                continue
+            text_content = self.text(cell)
+            if text_content:
+                rows.add(list(cell.iterancestors('tr')), cell.get('aria-describedby'), text_content, cell.get('title'))
+
+        return {
+            'Meeting ID': meeting_id,
+            'Details': rows.details()
+        }
+
+    def iter_grid_cells(self, page_content):
+        for cell in self.grid_cells(self.parse(page_content)):
+            links = self.first_link(cell)
+            yield ({'aria_describedby': cell.get('aria-describedby') or '',
+                    'text': self.text(cell),
+                    'title': cell.get('title') or ''},
+                   links[0] if links else None)
+
+    def grid_page(self, page_content):
+        return collect_grid_page(self.iter_grid_cells(page_content))
+
+
+class SelectolaxExtractor:
+    """Lexbor parse plus a precompiled CSS selector list for the required cells."""
+
+    name = 'selectolax'
+
+    def __init__(self):
+        self.detail_selector = ', '.join(f'td[aria-describedby="{key}"]' for key in REQUIRED_KEYS)
+
+    def text(self, node):
+        parts = []
+
+        def walk(parent):
+            for child in parent.iter(include_text=True):
+                if child.tag == '-text':
+                    parts.append(child.text_content.strip())
+                elif child.tag not in NON_TEXT_TAGS and child.tag != '_comment':
+                    walk(child)
+
+        walk(node)
+        return ''.join(parts)
+
+    def ancestor_rows(self, node):
+        rows = []
+        parent = node.parent
+        while parent is not None:
+            if parent.tag == 'tr':
+                rows.append(parent.mem_id)
+            parent = parent.parent
+        return rows
+
+    def meeting_details(self, detail_content, meeting_id):
+        rows = RowCollector()
+        for cell in LexborHTMLParser(detail_content).css(self.detail_selector):
+            attributes = cell.attributes
+            if is_hidden(attributes.get('style')):
+                continue
+            text_content = self.text(cell)
+            if text_content:
+                rows.add(self.ancestor_rows(cell), attributes.get('aria-describedby'), text_content,
+                         attributes.get('title'))
+
+        return {
+            'Meeting ID': meeting_id,
+            'Details': rows.details()
+        }
+
+    def iter_grid_cells(self, page_content):
+        for cell in LexborHTMLParser(page_content).css('td[aria-describedby]'):
+            attributes = cell.attributes
+            link = cell.css_first('a')
+            yield ({'aria_describedby': attributes.get('aria-describedby') or '',
+                    'text': self.text(cell),
+                    'title': attributes.get('title') or ''},
+                   link.attributes.get('href') if link is not None else None)
+
+    def grid_page(self, page_content):
+        return collect_grid_page(self.iter_grid_cells(page_content))
+
+
+def available_extractors():
+    extractors = {}
+    if LexborHTMLParser is not None:
+        extractors['selectolax'] = SelectolaxExtractor
+    if etree is not None:
+        extractors['lxml'] = LxmlExtractor
+    extractors['bs4'] = SoupExtractor
+    return extractors
+
+
+_extractors = {}
+
+
+def get_extractor(name=HTML_PARSER):
+    """Return the extractor for ``name`` ('auto', 'selectolax', 'lxml' or 'bs4'), built once."""
+    extractors = available_extractors()
+    if name == 'auto':
+        name = next(iter(extractors))
+    if name not in extractors:
+        raise ValueError(f"HTML parser {name!r} is not installed; available: {', '.join(extractors)}")
+    if name not in _extractors:
+        _extractors[name] = extractors[name]()
+    return _extractors[name]
@@ -0,0 +1,129 @@
+import re
+import html
+import threading
+
+from scrape_metrics import get_metrics
+
+# jqGrid tags every cell with aria-describedby="<grid id>_<column name>", so JSON row keys map straight onto them
+GRID_ID = 'list'
+DETAIL_GRID_ID = 'listDetail'
+DETAIL_FIELDS = {'BallotItemNumber', 'Proposal', 'ShareholderProposal', 'MgtRecVote', 'ClientVoteList'}
+
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+def payload_rows(payload):
+    """Return the row dicts of a jqGrid JSON payload, or None if it is not one we can read.
+
+    Rows in the positional ``{'id', 'cell': [...]}`` layout are rejected, since their
+    column names live in the grid's colModel rather than in the payload.
+    """
+    rows = payload.get('rows') if isinstance(payload, dict) else payload
+    if not isinstance(rows, list) or not rows:
+        return None
+    if not all(isinstance(row, dict) for row in rows) or any('cell' in row for row in rows):
+        return None
+    return rows
+
+
+def cell_text(value):
+    """Plain text of a grid value, which may carry formatter markup."""
+    if value is None:
+        return ''
+    return html.unescape(TAG_PATTERN.sub('', str(value))).strip()
+
+
+class ResponseCapture:
+    """Keep the jqGrid JSON payloads a page receives, so callers can skip HTML parsing.
+
+    Payloads are numbered in arrival order: take ``mark()`` before an action and
+    ask for ``grid_rows(mark)`` or ``detail_rows(mark)`` once the action has
+    rendered. Both return None when nothing matching arrived, which is the
+    caller's cue to fall back to the DOM. Only the newest payload of each kind
+    is kept, so memory stays at one grid page and one ballot however long the
+    run is.
+    """
+
+    def __init__(self, page):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.newest = {}  # is_detail -> (number, rows)
+        page.on('response', self.on_response)
+
+    def on_response(self, response):
+        if response.request.resource_type not in ('xhr', 'fetch') or response.status != 200:
+            return
+        try:
+            rows = payload_rows(response.json())
+        except Exception:
+            return  # Not JSON; jqGrid servers often send it as text/plain, so the content type is no guide
+        if rows is None:
+            return
+
+        is_detail = any(DETAIL_FIELDS.intersection(row) for row in rows)
+        with self.lock:
+            self.newest[is_detail] = (self.count, rows)
+            self.count += 1
+
+    def mark(self):
+        with self.lock:
+            return self.count
+
+    def latest(self, since, detail):
+        with self.lock:
+            number, rows = self.newest.get(detail, (-1, None))
+        return rows if number >= since else None
+
+    def grid_rows(self, since):
+        return self.latest(since, detail=False)
+
+    def detail_rows(self, since):
+        return self.latest(since, detail=True)
+
+
+def iter_grid_cells(rows):
+    """Yield grid rows in the page_data layout the DOM path produces: one entry per cell."""
+    for row in rows:
+        for column, value in row.items():
+            text = cell_text(value)
+            yield {'aria_describedby': f'{GRID_ID}_{column}', 'text': text, 'title': text}
+
+
+def meeting_details(rows, meeting_id):
+    """Ballot rows in the same structure extract_meeting_details builds from the page HTML."""
+    filtered_data = {
+        'Meeting ID': meeting_id,
+        'Details': []
+    }
+    for row in rows:
+        detail_data = {}
+        for column, value in row.items():
+            text = cell_text(value)
+            if column in DETAIL_FIELDS and text:
+                detail_data[f'{DETAIL_GRID_ID}_{column}'] = {'text': text, 'title': text}
+        if detail_data:
+            filtered_data['Details'].append(detail_data)
+    return filtered_data
+
+
+_captures = {}
+_captures_lock = threading.Lock()
+
+
+def capture_for(page):
+    """The ResponseCapture listening on ``page``, attached on first use and dropped when the page closes."""
+    with _captures_lock:
+        capture = _captures.get(page)
+        if capture is None:
+            capture = _captures[page] = ResponseCapture(page)
+            page.on('close', release_capture)
+        return capture
+
+
+def release_capture(page):
+    with _captures_lock:
+        _captures.pop(page, None)
+
+
+def record_source(kind, source):
+    get_metrics().inc('payload_source_total', kind=kind, source=source)
@@ -0,0 +1,161 @@
+import os
+import re
+import json
+import shutil
+import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+from frontend_webscraping_ISS import DEFAULT_SITE_PATH, run_scraping_process
+from vote_store import open_ndjson
+
+ISS_DATE_FORMAT = '%d-%b-%Y'
+SHARD_MODE = os.environ.get('ISS_SHARD_MODE', 'dates')  # 'dates' splits the range, 'pages' splits the grid pages
+SHARD_WINDOW_DAYS = int(os.environ.get('ISS_SHARD_WINDOW_DAYS', '30'))
+SHARD_WORKERS = int(os.environ.get('ISS_SHARD_WORKERS', str(os.cpu_count() or 1)))
+
+MEETING_FILE_PATTERN = re.compile(r'meeting_data_(.+)_(\d+)\.json$')
+PAGE_FILE_PATTERN = re.compile(r'page_data_(\d+)\.json$')
+
+
+def plan_iss_shards(start_date, end_date, mode=SHARD_MODE, window_days=SHARD_WINDOW_DAYS, workers=SHARD_WORKERS):
+    """Split an ISS crawl into independent shards.
+
+    In ``dates`` mode each shard is a ``window_days`` slice of the range. In
+    ``pages`` mode every shard queries the whole range and takes every
+    ``workers``-th grid page, which suits ranges the site cannot split finely.
+    """
+    if mode == 'pages':
+        return [{'shard': index + 1, 'start_date': start_date, 'end_date': end_date, 'page_shard': (index, workers)}
+                for index in range(workers)]
+
+    shards = []
+    window_start = datetime.strptime(start_date, ISS_DATE_FORMAT).date()
+    last_day = datetime.strptime(end_date, ISS_DATE_FORMAT).date()
+    while window_start <= last_day:
+        window_end = min(last_day, window_start + timedelta(days=window_days - 1))
+        shards.append({
+            'shard': len(shards) + 1,
+            'start_date': window_start.strftime(ISS_DATE_FORMAT),
+            'end_date': window_end.strftime(ISS_DATE_FORMAT),
+            'page_shard': None
+        })
+        window_start = window_end + timedelta(days=1)
+    return shards
+
+
+def shard_directory(base_path, shard):
+    return os.path.join(base_path, f"shard_{shard['shard']}")
+
+
+def run_shard(shard, site_path, base_path):
+    """Process-pool entry point: one shard, one browser (plus its detail pool), one output directory."""
+    output_dir = shard_directory(base_path, shard)
+    summary = run_scraping_process(shard['start_date'], shard['end_date'], site_path, shard['page_shard'],
+                                   output_dir, metrics_dir=output_dir)
+    return dict(summary, shard=shard['shard'])
+
+
+def merge_ndjson_records(path, target, shard_number, meeting_files):
+    """Copy one shard's NDJSON stream to ``target``, dropping meetings already merged; returns the duplicates.
+
+    Records are renamed the way the JSON files are, so the merged streams
+    read back like the merged directory.
+    """
+    duplicates = 0
+    with open_ndjson(path) as source, open_ndjson(target, 'w') as merged:
+        for line in source:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            meeting_match = MEETING_FILE_PATTERN.match(entry['file'])
+            page_match = PAGE_FILE_PATTERN.match(entry['file'])
+            if meeting_match:
+                meeting_id = meeting_match.group(1)
+                if meeting_id in meeting_files:
+                    duplicates += 1
+                    continue
+                meeting_files[meeting_id] = entry['file']
+            elif page_match:
+                entry['file'] = f'page_data_W{shard_number}_{page_match.group(1)}.json'
+            merged.write(json.dumps(entry, separators=(',', ':')) + '\n')
+    return duplicates
+
+
+def merge_shard_outputs(shard_dirs, output_dir):
+    """Move shard files into ``output_dir``, keeping one meeting_data record per meeting ID.
+
+    A meeting near a window edge or listed on several pages can be scraped by
+    more than one shard; the first shard's copy wins and the rest stay behind
+    in their shard directory. Page files are renamed ``page_data_W<shard>_<n>``
+    so shards do not overwrite each other. With ISS_OUTPUT_FORMAT=ndjson each
+    shard's stream is copied record by record under the same rules, and the
+    duplicate records are dropped.
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    meeting_files = {}
+    visited = set()
+    duplicates = 0
+    for shard_number, shard_dir in enumerate(shard_dirs, start=1):
+        if not os.path.isdir(shard_dir):
+            continue
+        for name in sorted(os.listdir(shard_dir)):
+            path = os.path.join(shard_dir, name)
+            meeting_match = MEETING_FILE_PATTERN.match(name)
+            page_match = PAGE_FILE_PATTERN.match(name)
+            if meeting_match:
+                meeting_id = meeting_match.group(1)
+                if meeting_id in meeting_files:
+                    duplicates += 1
+                    continue
+                meeting_files[meeting_id] = name
+                shutil.move(path, os.path.join(output_dir, name))
+            elif page_match:
+                shutil.move(path, os.path.join(output_dir, f'page_data_W{shard_number}_{page_match.group(1)}.json'))
+            elif name.startswith('Records_'):
+                duplicates += merge_ndjson_records(path, os.path.join(output_dir, f'W{shard_number}_{name}'),
+                                                   shard_number, meeting_files)
+                os.remove(path)
+            elif name == 'visitedMeetings.json':
+                with open(path, 'r', encoding='utf-8') as f:
+                    visited.update(json.load(f))
+
+    with open(os.path.join(output_dir, 'visitedMeetings.json'), 'w', encoding='utf-8') as f:
+        json.dump(sorted(visited), f, ensure_ascii=False, indent=2)
+    return {'meetings': len(meeting_files), 'duplicates': duplicates, 'visited': len(visited)}
+
+
+def run_sharded_iss_crawl(start_date, end_date, site_path=DEFAULT_SITE_PATH, base_path='.', mode=SHARD_MODE,
+                          window_days=SHARD_WINDOW_DAYS, workers=SHARD_WORKERS):
+    """Crawl an ISS date range as parallel shards, one browser process each, then merge the results.
+
+    Every shard process also runs its own ISS_DETAIL_WORKERS detail browsers,
+    so the box runs ``workers * (1 + ISS_DETAIL_WORKERS)`` browsers at peak.
+    """
+    shards = plan_iss_shards(start_date, end_date, mode, window_days, workers)
+    logging.info("Planned %d %s shards across %d processes.", len(shards), mode, workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run_shard, shards, [site_path] * len(shards), [base_path] * len(shards)))
+
+    merged = merge_shard_outputs([shard_directory(base_path, shard) for shard in shards], base_path)
+    summary = {
+        'shards': len(shards),
+        'incomplete_shards': [result['shard'] for result in results if not result['complete']],
+        'failed': sum(result['failed'] for result in results),
+        **merged
+    }
+    logging.info("Sharded ISS crawl summary: %s", json.dumps(summary))
+    return summary
+
+
+if __name__ == "__main__":
+    # Dynamic inputs
+    start_date = input("Enter start date (DD-Mon-YYYY): ")
+    end_date = input("Enter end date (DD-Mon-YYYY): ")
+    site_path = input(f"Enter site path [{DEFAULT_SITE_PATH}]: ") or DEFAULT_SITE_PATH
+    base_path = input("Enter the base path to save files: ")
+
+    run_sharded_iss_crawl(start_date, end_date, site_path, base_path)
@@ -0,0 +1,281 @@
+import os
+import re
+import glob
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from datetime import date, timedelta
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+API_PREFIX = '/vote-disclosure/api/v1'
+
+
+def generate_meetings(count, funds_per_meeting=3, proposals_per_meeting=8, seed=1,
+                      start_date='2024-01-01', days=365, fund_ids=None):
+    """Build ``(listing, details)`` for ``count`` synthetic meetings, deterministic for a given seed."""
+    if fund_ids is None:
+        from Backend_webscraping_gl import FUND_IDS
+        fund_ids = FUND_IDS
+
+    rng = random.Random(seed)
+    first_day = date.fromisoformat(start_date)
+    listing = []
+    details = {}
+    for index in range(1, count + 1):
+        meeting_id = 100000 + index
+        meeting_date = (first_day + timedelta(days=rng.randrange(days))).isoformat()
+        funds = [{'fundId': fund_id, 'fundName': f'Fund {fund_id}'}
+                 for fund_id in rng.sample(fund_ids, min(funds_per_meeting, len(fund_ids)))]
+        company = f'Company {index:05d}'
+        listing.append({
+            'meetingId': meeting_id,
+            'companyName': company,
+            'meetingDate': meeting_date + 'T00:00:00',
+            'country': 'Australia',
+            'meetingType': 'Annual',
+            'funds': funds
+        })
+        details[meeting_id] = {
+            'meetingId': meeting_id,
+            'companyName': company,
+            'meetingDate': meeting_date + 'T00:00:00',
+            'proposals': [
+                {
+                    'proposalNumber': str(number),
+                    'proposalText': f'Proposal {number} for {company}',
+                    'proponent': rng.choice(['Management', 'Shareholder']),
+                    'managementRecommendation': 'For',
+                    'votes': [
+                        {
+                            'fundId': fund['fundId'],
+                            'fundName': fund['fundName'],
+                            'voteDecision': rng.choice(['For', 'Against', 'Abstain']),
+                            'sharesVoted': rng.randrange(1000, 1000000)
+                        }
+                        for fund in funds
+                    ]
+                }
+                for number in range(1, proposals_per_meeting + 1)
+            ]
+        }
+    listing.sort(key=lambda m: (m['companyName'].lower(), str(m['meetingId'])))
+    return listing, details
+
+
+def load_fixtures(directory):
+    """Load ``(listing, details)`` from a previous backend run's PageData_/MeetData_ files."""
+    def page_key(path):
+        numbers = re.findall(r'_PG(\d+)(?:_R(\d+))?_', os.path.basename(path))
+        return tuple(int(n or 0) for n in numbers[0]) if numbers else (0, 0)
+
+    listing = []
+    page_size = 0
+    for path in sorted(glob.glob(os.path.join(directory, 'PageData_*.json')), key=page_key):
+        with open(path, 'r', encoding='utf-8') as f:
+            page_data = json.load(f)
+        page_size = max(page_size, len(page_data))
+        listing.extend(page_data)
+
+    # MeetData files carry the meeting ID when the payload has one, else their page/record position
+    position = {}
+    for index, meeting in enumerate(listing):
+        position[(index // page_size + 1, index % page_size + 1)] = meeting.get('meetingId')
+
+    details = {}
+    for path in glob.glob(os.path.join(directory, 'MeetData_*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        meeting_id = payload.get('meetingId') if isinstance(payload, dict) else None
+        if meeting_id is None:
+            meeting_id = position.get(page_key(path))
+        if meeting_id is not None:
+            details[meeting_id] = payload
+    return listing, details
+
+
+class MockGlassLewisAPI:
+    """In-memory stand-in for the vote-disclosure Meetings endpoints with fault injection."""
+
+    def __init__(self, listing, details, latency_ms=0, jitter_ms=0, error_rate=0.0, throttle_rps=0, seed=1):
+        self.listing = listing
+        self.details = {str(k): v for k, v in details.items()}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rps = throttle_rps
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+        # Throttling window: at most throttle_rps requests per wall-clock second
+        self.window_start = 0.0
+        self.window_count = 0
+
+        self.counts = {'listing': 0, 'detail': 0, 'errors': 0, 'throttled': 0, 'not_modified': 0}
+
+    def delay(self):
+        with self.lock:
+            jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        seconds = max(0.0, (self.latency_ms + jitter) / 1000.0)
+        if seconds:
+            time.sleep(seconds)
+
+    def fault(self):
+        """Return ``(status, headers)`` for an injected failure, or None to serve normally."""
+        with self.lock:
+            if self.throttle_rps:
+                now = time.monotonic()
+                if now - self.window_start >= 1.0:
+                    self.window_start = now
+                    self.window_count = 0
+                self.window_count += 1
+                if self.window_count > self.throttle_rps:
+                    self.counts['throttled'] += 1
+                    return 429, {'Retry-After': '1'}
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.counts['errors'] += 1
+                return 503, {}
+        return None
+
+    def list_meetings(self, payload):
+        """Filter by date window and funds, then page, like the real listing endpoint."""
+        date_start = (payload.get('dateStart') or '')[:10]
+        date_end = (payload.get('dateEnd') or '9999-12-31')[:10]
+        funds = set(payload.get('funds') or [])
+        pagination = payload.get('pagination') or {}
+        page_number = int(pagination.get('pageNumber', 1))
+        page_size = int(pagination.get('pageSize', 100))
+
+        matches = []
+        for meeting in self.listing:
+            meeting_date = (meeting.get('meetingDate') or '')[:10]
+            if meeting_date and not (date_start <= meeting_date <= date_end):
+                continue
+            if funds:
+                meeting_funds = [f for f in meeting.get('funds', []) if f.get('fundId') in funds]
+                if not meeting_funds:
+                    continue
+                meeting = dict(meeting, funds=meeting_funds)
+            matches.append(meeting)
+
+        start = (page_number - 1) * page_size
+        with self.lock:
+            self.counts['listing'] += 1
+        return matches[start:start + page_size]
+
+    def meeting_detail(self, meeting_id):
+        with self.lock:
+            self.counts['detail'] += 1
+        return self.details.get(str(meeting_id))
+
+
+def make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive, so client connection pooling is exercised
+        # Headers and body go out as separate writes; with Nagle on, each response waits on the client's delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass  # Request logging would dominate the benchmark
+
+        def send_json(self, status, body=None, headers=None):
+            data = json.dumps(body).encode('utf-8') if body is not None else b''
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if body is not None:
+                self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if urlparse(self.path).path.rstrip('/') != f'{API_PREFIX}/Meetings':
+                return self.send_json(404, {'error': 'not found'})
+
+            api.delay()
+            fault = api.fault()
+            if fault:
+                return self.send_json(fault[0], {'error': 'injected'}, fault[1])
+            self.send_json(200, api.list_meetings(payload))
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            match = re.fullmatch(re.escape(API_PREFIX) + r'/Meetings/([^/]+)', parsed.path)
+            if not match:
+                return self.send_json(404, {'error': 'not found'})
+
+            api.delay()
+            fault = api.fault()
+            if fault:
+                return self.send_json(fault[0], {'error': 'injected'}, fault[1])
+
+            detail = api.meeting_detail(match.group(1))
+            if detail is None:
+                return self.send_json(404, {'error': 'unknown meeting'})
+
+            # Answer fund-filtered requests with a stable ETag so conditional requests can be exercised
+            fund_ids = sorted(parse_qs(parsed.query).get('fundId', []))
+            etag = '"' + hashlib.sha1(f'{match.group(1)}|{fund_ids}'.encode('utf-8')).hexdigest()[:16] + '"'
+            if self.headers.get('If-None-Match') == etag:
+                with api.lock:
+                    api.counts['not_modified'] += 1
+                return self.send_json(304, None, {'ETag': etag})
+            self.send_json(200, detail, {'ETag': etag})
+
+    return Handler
+
+
+def start_server(api, host='127.0.0.1', port=0):
+    """Serve ``api`` on a background thread. Returns ``(server, base_url)`` for GL_API_BASE."""
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}{API_PREFIX}'
+
+
+def build_api(fixtures=None, meetings=1000, funds_per_meeting=3, proposals_per_meeting=8, latency_ms=0,
+              jitter_ms=0, error_rate=0.0, throttle_rps=0, seed=1):
+    """Create a MockGlassLewisAPI from recorded fixtures or a synthetic generator."""
+    if fixtures:
+        listing, details = load_fixtures(fixtures)
+    else:
+        listing, details = generate_meetings(meetings, funds_per_meeting, proposals_per_meeting, seed)
+    return MockGlassLewisAPI(listing, details, latency_ms, jitter_ms, error_rate, throttle_rps, seed)
+
+
+def add_api_arguments(parser):
+    parser.add_argument('--fixtures', help='directory of recorded PageData_/MeetData_ files')
+    parser.add_argument('--meetings', type=int, default=1000, help='synthetic meetings to generate')
+    parser.add_argument('--funds-per-meeting', type=int, default=3)
+    parser.add_argument('--proposals-per-meeting', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--throttle-rps', type=int, default=0, help='answer 429 above this many requests/second')
+    parser.add_argument('--seed', type=int, default=1)
+
+
+def api_from_arguments(args):
+    return build_api(args.fixtures, args.meetings, args.funds_per_meeting, args.proposals_per_meeting,
+                     args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rps, args.seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Local stand-in for the Glass Lewis vote-disclosure API.')
+    add_api_arguments(parser)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server, base_url = start_server(api_from_arguments(args), args.host, args.port)
+    print(f"Mock API ready. Run the backend with GL_API_BASE={base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
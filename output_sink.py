@@ -0,0 +1,254 @@
+import os
+import abc
+import gzip
+import json
+import queue
+import threading
+from scrape_metrics import get_metrics
+
+try:
+    import zstandard
+except ImportError:  # zstd output is optional
+    zstandard = None
+
+OUTPUT_FORMAT = os.environ.get('GL_OUTPUT_FORMAT', 'json')  # 'json' (one file per record) or 'ndjson'
+OUTPUT_COMPRESSION = os.environ.get('GL_OUTPUT_COMPRESSION', '')  # '', 'gzip' or 'zstd' (ndjson only)
+OUTPUT_BATCH_SIZE = int(os.environ.get('GL_OUTPUT_BATCH_SIZE', '500'))
+OUTPUT_QUEUE_SIZE = int(os.environ.get('GL_OUTPUT_QUEUE_SIZE', '5000'))
+
+_STOP = object()
+_END_STREAM = object()
+
+
+class OutputSink(abc.ABC):
+    """Base class for record sinks that write on a background thread.
+
+    ``write`` only enqueues the record, so producers never block on disk I/O
+    unless the queue is full. The writer thread drains the queue in batches and
+    hands each batch to ``_write_batch``. An optional callback per record runs on
+    the writer thread once that record is on disk.
+
+    ``write_item``/``end_stream`` write one record as a sequence of items, so a
+    list such as a listing page never has to be held in memory as a whole.
+    """
+
+    def __init__(self, batch_size=OUTPUT_BATCH_SIZE, queue_size=OUTPUT_QUEUE_SIZE):
+        self.batch_size = batch_size
+        self.records_written = 0
+        self.files_written = 0
+        self.bytes_written = 0
+        self.error = None
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self.thread.start()
+
+    def write(self, filename, data, callback=None):
+        """Queue one record under its legacy file name."""
+        self.queue.put((filename, data, callback, False))
+
+    def write_item(self, filename, item, callback=None):
+        """Queue one element of a streamed list record."""
+        self.queue.put((filename, item, callback, True))
+
+    def end_stream(self, filename):
+        """Mark a streamed list record as complete."""
+        self.queue.put((filename, _END_STREAM, None, True))
+
+    def flush(self):
+        """Block until every queued record has been written."""
+        self.queue.join()
+        if self.error:
+            raise self.error
+
+    def close(self):
+        self.queue.put(_STOP)
+        self.thread.join()
+        self._close()
+        if self.error:
+            raise self.error
+
+    def stats(self):
+        return {
+            'records': self.records_written,
+            'files': self.files_written,
+            'bytes': self.bytes_written
+        }
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                self.queue.task_done()
+                return
+
+            # Take whatever else is already waiting, up to one batch
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                with get_metrics().stage('disk_write'):
+                    self._write_batch(batch)
+                self.records_written += len(batch)
+                for _, _, callback, _ in batch:
+                    if callback:
+                        callback()
+            except Exception as e:
+                print(f"Error writing output batch: {e}")
+                self.error = e
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self.queue.task_done()
+
+            if stop:
+                return
+
+    @abc.abstractmethod
+    def _write_batch(self, batch):
+        """Write ``(filename, data, callback, streamed)`` records; runs on the writer thread."""
+
+    def _close(self):
+        pass
+
+
+class JsonFileSink(OutputSink):
+    """Legacy layout: every record is its own JSON file in the output directory.
+
+    A streamed list is written to ``<file>.part`` and renamed once it ends, so a
+    run that stops mid-stream never leaves a truncated file under the real name.
+    """
+
+    def __init__(self, directory, indent=4, ensure_ascii=True, **kwargs):
+        self.directory = directory
+        self.indent = indent
+        self.ensure_ascii = ensure_ascii
+        self.open_streams = {}  # Streamed list files that are still being written
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        super().__init__(**kwargs)
+
+    def _write_batch(self, batch):
+        for filename, data, _, streamed in batch:
+            if streamed:
+                self._write_stream_item(filename, data)
+                continue
+            text = json.dumps(data, indent=self.indent, ensure_ascii=self.ensure_ascii)
+            with open(os.path.join(self.directory, filename), 'w', encoding='utf-8') as json_file:
+                json_file.write(text)
+            self.files_written += 1
+            self.bytes_written += len(text.encode('utf-8'))
+
+    def _write_stream_item(self, filename, item):
+        """Write list elements so the finished file matches ``json.dump(items, indent=indent)``."""
+        stream = self.open_streams.get(filename)
+        if item is _END_STREAM:
+            if stream is None:
+                text = '[]'
+                with open(os.path.join(self.directory, filename), 'w', encoding='utf-8') as json_file:
+                    json_file.write(text)
+            else:
+                text = '\n]'
+                stream.write(text)
+                stream.close()
+                del self.open_streams[filename]
+                os.replace(stream.name, os.path.join(self.directory, filename))
+            self.files_written += 1
+            self.bytes_written += len(text)
+            return
+
+        pad = ' ' * (self.indent or 0)
+        text = json.dumps(item, indent=self.indent, ensure_ascii=self.ensure_ascii).replace('\n', '\n' + pad)
+        if stream is None:
+            stream = open(os.path.join(self.directory, filename + '.part'), 'w', encoding='utf-8')
+            self.open_streams[filename] = stream
+            text = '[\n' + pad + text
+        else:
+            text = ',\n' + pad + text
+        stream.write(text)
+        self.bytes_written += len(text.encode('utf-8'))
+
+    def _close(self):
+        # Unfinished streams stay behind as .part files
+        for stream in self.open_streams.values():
+            stream.close()
+
+
+class NdjsonSink(OutputSink):
+    """Append every record as one compact JSON line to a single (optionally compressed) file.
+
+    Each line is ``{"file": <legacy file name>, "data": <record>}`` so the per-file
+    layout can always be reconstructed from the stream. Elements of a streamed
+    list record carry an ``index`` and are written as separate lines.
+    """
+
+    def __init__(self, directory, prefix, compression=OUTPUT_COMPRESSION, ensure_ascii=True, **kwargs):
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        if compression == 'gzip':
+            self.path = os.path.join(directory, f'{prefix}.ndjson.gz')
+            self.stream = gzip.open(self.path, 'ab')
+        elif compression == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("zstd output needs the 'zstandard' package")
+            self.path = os.path.join(directory, f'{prefix}.ndjson.zst')
+            self.raw_file = open(self.path, 'ab')
+            self.stream = zstandard.ZstdCompressor().stream_writer(self.raw_file)
+        elif not compression:
+            self.path = os.path.join(directory, f'{prefix}.ndjson')
+            self.stream = open(self.path, 'ab')
+        else:
+            raise ValueError(f"Unknown output compression: {compression}")
+
+        self.compression = compression
+        self.ensure_ascii = ensure_ascii
+        self.stream_counts = {}
+        super().__init__(**kwargs)
+        self.files_written = 1
+
+    def _write_batch(self, batch):
+        lines = []
+        for filename, data, _, streamed in batch:
+            if not streamed:
+                lines.append(json.dumps({'file': filename, 'data': data}, separators=(',', ':'),
+                                        ensure_ascii=self.ensure_ascii))
+            elif data is _END_STREAM:
+                self.stream_counts.pop(filename, None)
+            else:
+                index = self.stream_counts.get(filename, 0)
+                self.stream_counts[filename] = index + 1
+                lines.append(json.dumps({'file': filename, 'index': index, 'data': data}, separators=(',', ':'),
+                                        ensure_ascii=self.ensure_ascii))
+        if not lines:
+            return
+        lines = ('\n'.join(lines) + '\n').encode('utf-8')
+        self.stream.write(lines)
+        self.stream.flush()
+        self.bytes_written += len(lines)
+
+    def _close(self):
+        self.stream.close()
+        if self.compression == 'zstd':
+            self.raw_file.close()
+
+
+def open_sink(directory, prefix, output_format=OUTPUT_FORMAT, compression=OUTPUT_COMPRESSION, indent=4,
+              ensure_ascii=True):
+    """Create the sink selected by GL_OUTPUT_FORMAT / GL_OUTPUT_COMPRESSION.
+
+    ``ensure_ascii=False`` keeps non-ASCII text (company and fund names) as UTF-8 rather than \\u escapes.
+    """
+    if output_format == 'ndjson':
+        return NdjsonSink(directory, prefix, compression=compression, ensure_ascii=ensure_ascii)
+    if output_format == 'json':
+        return JsonFileSink(directory, indent=indent, ensure_ascii=ensure_ascii)
+    raise ValueError(f"Unknown output format: {output_format}")
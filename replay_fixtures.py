@@ -0,0 +1,173 @@
+import os
+import json
+import random
+import asyncio
+import hashlib
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from scrape_metrics import get_metrics
+
+# 'record' archives every response a scraper's pages receive; 'replay' answers from the archive, offline
+FIXTURE_MODE = os.environ.get('SCRAPE_FIXTURE_MODE', '')
+FIXTURE_DIR = os.environ.get('SCRAPE_FIXTURE_DIR', 'fixtures')
+REPLAY_LATENCY_MS = float(os.environ.get('SCRAPE_REPLAY_LATENCY_MS', '0'))
+REPLAY_JITTER_MS = float(os.environ.get('SCRAPE_REPLAY_JITTER_MS', '0'))
+
+# Cache-busting parameters (jQuery's _ and jqGrid's nd) change on every request and are not part of the key
+IGNORED_PARAMS = {'_', 'nd'}
+# The browser decodes and re-frames replayed bodies itself
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+
+def normalize_query(query):
+    return urlencode(sorted((name, value) for name, value in parse_qsl(query, keep_blank_values=True)
+                            if name not in IGNORED_PARAMS))
+
+
+def request_key(request):
+    """Method, URL and body digest, with cache-busting parameters taken out of the URL and form bodies."""
+    parts = urlsplit(request.url)
+    url = urlunsplit((parts.scheme, parts.netloc, parts.path, normalize_query(parts.query), ''))
+    body = request.post_data or ''
+    if 'application/x-www-form-urlencoded' in (request.headers.get('content-type') or ''):
+        body = normalize_query(body)
+    return f"{request.method} {url} {hashlib.sha1(body.encode('utf-8')).hexdigest()}"
+
+
+class ResponseArchive:
+    """Responses on disk: ``index.ndjson`` lists them in arrival order and ``bodies/`` holds the content.
+
+    Requests with the same key (the same listing asked for twice) are replayed
+    in the order they were recorded, and the last one keeps answering after that.
+    """
+
+    def __init__(self, directory=FIXTURE_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, 'index.ndjson')
+        self.body_dir = os.path.join(directory, 'bodies')
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.cursors = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries.setdefault(entry['key'], []).append(entry)
+
+    def record(self, request, status, headers, body):
+        digest = hashlib.sha1(body).hexdigest()
+        entry = {
+            'key': request_key(request),
+            'url': request.url,
+            'status': status,
+            'headers': {name: value for name, value in headers.items() if name.lower() not in DROPPED_HEADERS},
+            'body': digest
+        }
+        with self.lock:
+            if not os.path.exists(self.body_dir):
+                os.makedirs(self.body_dir)
+            body_path = os.path.join(self.body_dir, digest)
+            if not os.path.exists(body_path):
+                with open(body_path, 'wb') as f:
+                    f.write(body)
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+            self.entries.setdefault(entry['key'], []).append(entry)
+
+    def lookup(self, request):
+        """The next recorded ``(entry, body)`` for ``request``, or None when it was never recorded."""
+        key = request_key(request)
+        with self.lock:
+            entries = self.entries.get(key)
+            if not entries:
+                return None
+            position = self.cursors.get(key, 0)
+            self.cursors[key] = position + 1
+            entry = entries[min(position, len(entries) - 1)]
+        with open(os.path.join(self.body_dir, entry['body']), 'rb') as f:
+            return entry, f.read()
+
+    def stats(self):
+        with self.lock:
+            return {'responses': sum(len(entries) for entries in self.entries.values()), 'keys': len(self.entries)}
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    """The process-wide archive for FIXTURE_DIR; every page and worker thread shares it."""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = ResponseArchive()
+        return _archive
+
+
+def replay_delay():
+    """Injected latency for one replayed response, in milliseconds."""
+    return max(0.0, REPLAY_LATENCY_MS + random.uniform(-REPLAY_JITTER_MS, REPLAY_JITTER_MS))
+
+
+def record_route(route):
+    response = route.fetch()
+    get_archive().record(route.request, response.status, response.headers, response.body())
+    get_metrics().inc('fixture_requests_total', mode='record')
+    route.fulfill(response=response)
+
+
+async def record_route_async(route):
+    response = await route.fetch()
+    get_archive().record(route.request, response.status, response.headers, await response.body())
+    get_metrics().inc('fixture_requests_total', mode='record')
+    await route.fulfill(response=response)
+
+
+def fulfill_args(route):
+    """Keyword arguments for ``route.fulfill`` from the archive; an empty 404 for anything never recorded."""
+    found = get_archive().lookup(route.request)
+    if found is None:
+        get_metrics().inc('fixture_requests_total', mode='miss')
+        return {'status': 404, 'body': b''}
+    entry, body = found
+    get_metrics().inc('fixture_requests_total', mode='replay')
+    return {'status': entry['status'], 'headers': entry['headers'], 'body': body}
+
+
+def replay_route_for(page):
+    def replay_route(route):
+        delay = replay_delay()
+        if delay:
+            page.wait_for_timeout(delay)  # Lets the page's other requests proceed, unlike time.sleep
+        route.fulfill(**fulfill_args(route))
+    return replay_route
+
+
+async def replay_route_async(route):
+    delay = replay_delay()
+    if delay:
+        await asyncio.sleep(delay / 1000)
+    await route.fulfill(**fulfill_args(route))
+
+
+def attach_fixtures(page, mode=FIXTURE_MODE):
+    """Route every request of ``page`` through the archive when recording or replaying.
+
+    Attach before any other route: Playwright runs the newest route first, so
+    the lean profile still aborts assets and only what it lets through
+    reaches the archive.
+    """
+    if mode == 'record':
+        page.route('**/*', record_route)
+    elif mode == 'replay':
+        page.route('**/*', replay_route_for(page))
+
+
+async def attach_fixtures_async(page, mode=FIXTURE_MODE):
+    if mode == 'record':
+        await page.route('**/*', record_route_async)
+    elif mode == 'replay':
+        await page.route('**/*', replay_route_async)
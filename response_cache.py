@@ -0,0 +1,143 @@
+import os
+import time
+import sqlite3
+import threading
+
+CACHE_PATH = os.environ.get('GL_CACHE_PATH', 'gl_response_cache.sqlite')  # Empty string disables the cache
+CACHE_TTL = float(os.environ.get('GL_CACHE_TTL', str(24 * 60 * 60)))  # Seconds
+CACHE_MAX_BYTES = int(float(os.environ.get('GL_CACHE_MAX_MB', '512')) * 1024 * 1024)
+# Seconds to wait for another process's write lock; sharded crawls open the same file from every worker
+CACHE_BUSY_TIMEOUT = float(os.environ.get('GL_CACHE_BUSY_TIMEOUT', '60'))
+
+
+class ResponseCache:
+    """Persistent SQLite cache of API response bodies with per-entry TTL and LRU eviction.
+
+    Entries past their TTL are still returned (marked not fresh) together with the
+    ETag/Last-Modified the server sent, so callers can revalidate with a conditional
+    request instead of downloading the body again.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.conn = sqlite3.connect(path, timeout=CACHE_BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute('CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)')
+        self.total_bytes = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    @staticmethod
+    def make_key(meeting_id, fund_ids):
+        """Key on the meeting ID plus the sorted fund-ID set, so fund order does not matter."""
+        funds = ','.join(sorted({str(fund_id) for fund_id in fund_ids}, key=lambda f: (len(f), f)))
+        return f'{meeting_id}|{funds}'
+
+    def get(self, key):
+        """Return the cached entry as a dict with a ``fresh`` flag, or None on a miss."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+            fresh = row[3] > now
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale += 1
+
+        return {'body': row[0], 'etag': row[1], 'last_modified': row[2], 'fresh': fresh}
+
+    def put(self, key, body, etag=None, last_modified=None, ttl=None):
+        """Store a response body, then evict least-recently-used entries over the size cap."""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+
+        with self.lock:
+            old = self.conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses (key, body, etag, last_modified, stored_at, expires_at, last_access, size) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, body, etag, last_modified, now, expires_at, now, len(body))
+            )
+            self.total_bytes += len(body) - (old[0] if old else 0)
+            self._evict()
+
+    def touch(self, key, ttl=None):
+        """Extend an entry's TTL after the server confirmed it unchanged (HTTP 304)."""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self.lock:
+            self.conn.execute(
+                'UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?', (expires_at, now, key)
+            )
+            self.revalidated += 1
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache fits under max_bytes. Caller holds the lock."""
+        while self.total_bytes > self.max_bytes:
+            rows = self.conn.execute(
+                'SELECT key, size FROM responses ORDER BY last_access LIMIT 100'
+            ).fetchall()
+            if not rows:
+                self.total_bytes = 0
+                return
+            for key, size in rows:
+                self.conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self.total_bytes -= size
+                self.evictions += 1
+                if self.total_bytes <= self.max_bytes:
+                    return
+
+    def stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'revalidated': self.revalidated,
+                'evictions': self.evictions,
+                'bytes': self.total_bytes
+            }
+
+    def close(self):
+        self.conn.close()
+
+
+def open_default_cache():
+    """Open the cache configured through the environment, or return None when disabled."""
+    if not CACHE_PATH:
+        return None
+    return ResponseCache(CACHE_PATH)
@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import pstats
+import cProfile
+import threading
+import contextlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+METRICS_DIR = os.environ.get('SCRAPE_METRICS_DIR', '.')
+METRICS_PORT = int(os.environ.get('SCRAPE_METRICS_PORT', '0'))  # 0 disables the /metrics endpoint
+PROFILE_ENABLED = os.environ.get('SCRAPE_PROFILE', '0') == '1'
+
+
+class Metrics:
+    """Per-run stage timers, counters and gauges shared by all three scrapers.
+
+    Stage timers answer "where did the time go" (listing fetch, detail fetch or
+    navigation, HTML parse, disk write, waits); counters track HTTP
+    statuses, retries and bytes; gauges track queue depth. ``write`` exports a
+    Prometheus text file and a JSON summary at the end of the run.
+    """
+
+    def __init__(self, scraper='scraper'):
+        self.scraper = scraper
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.timers = {}  # stage -> [count, total seconds, max seconds]
+        self.counters = {}  # (name, sorted label items) -> value
+        self.gauges = {}  # name -> [current, max]
+        self.profilers = {}  # profiled function name -> cProfile.Profile
+        self.profiling = False
+        self.server = None
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            timer = self.timers.setdefault(stage, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the enclosed block under a stage name."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def counts_by(self, name, label):
+        """A counter's values in this run keyed by one of its labels, e.g. blocked requests by type."""
+        counts = {}
+        with self.lock:
+            for (counter, labels), value in self.counters.items():
+                if counter == name:
+                    key = dict(labels).get(label)
+                    counts[key] = counts.get(key, 0) + value
+        return counts
+
+    def set_gauge(self, name, value):
+        with self.lock:
+            gauge = self.gauges.setdefault(name, [0, 0])
+            gauge[0] = value
+            gauge[1] = max(gauge[1], value)
+
+    @contextlib.contextmanager
+    def profile(self, name):
+        """Capture a cProfile of the enclosed block when SCRAPE_PROFILE=1.
+
+        Repeated captures under one name accumulate into the same profile. Only one
+        profiler can run per process, so nested captures and captures started by
+        other threads while one is running are skipped.
+        """
+        with self.lock:
+            skip = not PROFILE_ENABLED or self.profiling
+            if not skip:
+                profiler = self.profilers.setdefault(name, cProfile.Profile())
+                self.profiling = True
+        if skip:
+            yield
+            return
+
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            with self.lock:
+                self.profiling = False
+
+    def instrument_page(self, page):
+        """Count HTTP statuses and response bytes for every response a Playwright page receives."""
+        def on_response(response):
+            self.inc('http_responses_total', status=response.status)
+            length = response.headers.get('content-length')
+            if length and length.isdigit():
+                self.inc('bytes_received_total', int(length))
+
+        page.on('response', on_response)
+
+    def summary(self):
+        with self.lock:
+            return {
+                'scraper': self.scraper,
+                'started': self.started,
+                'elapsed_seconds': round(time.time() - self.started, 3),
+                'stages': {
+                    stage: {'count': count, 'total_seconds': round(total, 3), 'max_seconds': round(longest, 3)}
+                    for stage, (count, total, longest) in sorted(self.timers.items())
+                },
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                'gauges': {name: {'current': current, 'max': peak} for name, (current, peak) in sorted(self.gauges.items())}
+            }
+
+    def prometheus_text(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        prefix = 'scraper'
+        scraper = f'scraper="{self.scraper}"'
+        lines = []
+        with self.lock:
+            lines.append(f'# TYPE {prefix}_stage_seconds_total counter')
+            for stage, (count, total, _) in sorted(self.timers.items()):
+                lines.append(f'{prefix}_stage_seconds_total{{{scraper},stage="{stage}"}} {total:.6f}')
+            lines.append(f'# TYPE {prefix}_stage_calls_total counter')
+            for stage, (count, _, _) in sorted(self.timers.items()):
+                lines.append(f'{prefix}_stage_calls_total{{{scraper},stage="{stage}"}} {count}')
+            lines.append(f'# TYPE {prefix}_stage_max_seconds gauge')
+            for stage, (_, _, longest) in sorted(self.timers.items()):
+                lines.append(f'{prefix}_stage_max_seconds{{{scraper},stage="{stage}"}} {longest:.6f}')
+
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f'# TYPE {prefix}_{name} counter')
+                for (counter, labels), value in sorted(self.counters.items()):
+                    if counter == name:
+                        label_text = ''.join(f',{k}="{v}"' for k, v in labels)
+                        lines.append(f'{prefix}_{name}{{{scraper}{label_text}}} {value}')
+
+            for name, (current, peak) in sorted(self.gauges.items()):
+                lines.append(f'# TYPE {prefix}_{name} gauge')
+                lines.append(f'{prefix}_{name}{{{scraper}}} {current}')
+                lines.append(f'{prefix}_{name}_max{{{scraper}}} {peak}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=METRICS_PORT):
+        """Expose /metrics over HTTP for the lifetime of the run."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                body = metrics.prometheus_text().encode('utf-8')
+                self.send_response(200 if self.path == '/metrics' else 404)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('0.0.0.0', port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def write(self, directory=METRICS_DIR):
+        """Write <scraper>_metrics.prom, <scraper>_metrics.json and any captured profiles."""
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        prom_path = os.path.join(directory, f'{self.scraper}_metrics.prom')
+        with open(prom_path, 'w') as f:
+            f.write(self.prometheus_text())
+
+        json_path = os.path.join(directory, f'{self.scraper}_metrics.json')
+        with open(json_path, 'w') as f:
+            json.dump(self.summary(), f, indent=4)
+
+        for name, profiler in self.profilers.items():
+            profile_path = os.path.join(directory, f'{self.scraper}_{name}.prof')
+            pstats.Stats(profiler).dump_stats(profile_path)
+
+        if self.server is not None:
+            self.server.shutdown()
+            self.server = None
+        return json_path
+
+
+_metrics = None
+
+
+def get_metrics():
+    """Return the process-wide Metrics instance (one scraper runs per process)."""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+
+def start_run(scraper):
+    """Reset metrics for a new run of ``scraper`` and start the /metrics endpoint if configured."""
+    global _metrics
+    _metrics = Metrics(scraper)
+    if METRICS_PORT:
+        _metrics.serve(METRICS_PORT)
+    return _metrics
@@ -0,0 +1,54 @@
+import asyncio
+import os
+
+import Backend_webscraping_gl as backend
+from crawl_checkpoint import CheckpointJournal
+from gl_http_client import GlassLewisClient
+from mock_gl_server import build_api, start_server
+from response_cache import ResponseCache
+
+
+def run_crawl(monkeypatch, base_path, meetings=25, page_size=10, journal=None, cache=None, api=None):
+    api = api or build_api(meetings=meetings, funds_per_meeting=2, proposals_per_meeting=2)
+    server, api_base = start_server(api)
+    monkeypatch.setattr(backend, 'MEETINGS_URL', f'{api_base}/Meetings')
+    try:
+        return asyncio.run(backend.crawl('2024-01-01', '2024-12-31', page_size, 'X', '2024-01', 'api', str(base_path),
+                                         client=GlassLewisClient(0), journal=journal, cache=cache, max_concurrency=4))
+    finally:
+        server.shutdown()
+
+
+def output_files(base_path, prefix):
+    return sorted(name for name in os.listdir(base_path) if name.startswith(prefix))
+
+
+def test_crawl_pipelines_every_page_without_a_journal(tmp_path, monkeypatch):
+    summary = run_crawl(monkeypatch, tmp_path)
+    assert summary == {'pages': 3, 'meetings_saved': 25, 'meetings_skipped': 0, 'meetings_failed': 0,
+                       'complete': True}
+    assert len(output_files(tmp_path, 'MeetData_')) == 25
+    assert output_files(tmp_path, 'PageData_') == [f'PageData_X_2024-01_PG{page}_api.json' for page in (1, 2, 3)]
+
+
+def test_crawl_journals_finished_pages_and_resumes(tmp_path, monkeypatch):
+    params = {'window': 'test'}
+    journal = CheckpointJournal(str(tmp_path / 'journal.ndjson'), params)
+    assert run_crawl(monkeypatch, tmp_path, journal=journal)['complete']
+    journal.close()
+    assert {page: journal.page_count(page) for page in (1, 2, 3)} == {1: 10, 2: 10, 3: 5}
+
+    resumed = CheckpointJournal(str(tmp_path / 'journal.ndjson'), params)
+    summary = run_crawl(monkeypatch, tmp_path, journal=resumed)
+    resumed.close()
+    assert summary['meetings_saved'] == 0 and summary['complete']
+
+
+def test_crawl_serves_repeat_details_from_the_response_cache(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+    api = build_api(meetings=12, funds_per_meeting=2, proposals_per_meeting=2)
+    assert run_crawl(monkeypatch, tmp_path / 'first', cache=cache, api=api)['meetings_saved'] == 12
+    assert run_crawl(monkeypatch, tmp_path / 'second', cache=cache, api=api)['meetings_saved'] == 12
+    cache.close()
+    assert api.counts['detail'] == 12
+    assert (cache.misses, cache.hits) == (12, 12)
@@ -0,0 +1,8 @@
+from benchmark_browser import run_succeeded
+
+
+def test_only_complete_runs_without_failures_succeed():
+    assert run_succeeded({'complete': True, 'failed': 0, 'pages': 3})
+    assert not run_succeeded({'complete': False, 'failed': 0})
+    assert not run_succeeded({'complete': True, 'failed': 2})
+    assert not run_succeeded(None)
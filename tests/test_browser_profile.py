@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip('playwright')
+
+from browser_profile import ESTIMATED_BYTES, block_reason, blocked_summary, record_blocked
+from scrape_metrics import start_run
+
+
+class Request:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+def test_block_reason():
+    assert block_reason(Request('https://www.google-analytics.com/collect', 'fetch')) == 'tracker'
+    assert block_reason(Request('https://cdn.segment.com/a.js', 'script')) == 'tracker'
+    assert block_reason(Request('https://vds.example.com/logo.png', 'image')) == 'image'
+    assert block_reason(Request('https://vds.example.com/api/rows', 'xhr')) is None
+    assert block_reason(Request('https://vds.example.com/app.js', 'script')) is None
+    assert block_reason(Request('https://notgoogle-analytics.com/x', 'fetch')) is None
+
+
+def test_blocked_counts_are_per_run():
+    first = start_run('iss')
+    record_blocked('image')
+    record_blocked('image')
+    record_blocked('tracker')
+    assert blocked_summary(first) == {
+        'blocked': {'image': 2, 'tracker': 1},
+        'blocked_total': 3,
+        'bytes_saved_estimate': 2 * ESTIMATED_BYTES['image'] + ESTIMATED_BYTES['tracker']
+    }
+
+    start_run('iss')
+    record_blocked('font')
+    assert blocked_summary()['blocked'] == {'font': 1}
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from consolidate_output import Columns, consolidate, load_table
+from mock_gl_server import generate_meetings
+
+
+def listing_rows(columns):
+    listings = columns.tables['listings']
+    return list(zip(listings['row'], listings['column'], listings['text']))
+
+
+def test_iss_page_data_starts_a_row_when_a_column_repeats():
+    cells = [{'aria_describedby': column, 'text': text, 'title': text}
+             for column, text in [('list_Ticker', 'A'), ('list_Company', 'Alpha'),
+                                  ('list_Ticker', 'B'), ('list_Company', 'Beta'), ('list_Ticker', 'C')]]
+    columns = Columns()
+    columns.add_page_data('page_data_1.json', cells, '2024-01')
+    assert listing_rows(columns) == [(0, 'list_Ticker', 'A'), (0, 'list_Company', 'Alpha'),
+                                     (1, 'list_Ticker', 'B'), (1, 'list_Company', 'Beta'), (2, 'list_Ticker', 'C')]
+    assert set(columns.tables['listings']['source']) == {'iss'}
+
+
+def test_glnew_page_data_keeps_one_row_per_entry():
+    rows = [{'Company Name': {'text': 'Alpha', 'title': ''}, 'Country': {'text': 'AU', 'title': ''}},
+            {'Company Name': {'text': 'Beta', 'title': ''}}]
+    columns = Columns()
+    columns.add_page_data('page_data_1.json', rows, '2024-01')
+    assert listing_rows(columns) == [(0, 'Company Name', 'Alpha'), (0, 'Country', 'AU'), (1, 'Company Name', 'Beta')]
+    assert set(columns.tables['listings']['source']) == {'gl_browser'}
+
+
+def test_backend_meeting_listed_and_fetched_is_one_meeting_row(tmp_path):
+    listing, details = generate_meetings(6, funds_per_meeting=2, proposals_per_meeting=3)
+    scraped = tmp_path / 'scraped'
+    scraped.mkdir()
+    (scraped / 'PageData_X_2024-01_PG1_api.json').write_text(json.dumps(listing))
+    # The last meeting's detail fetch failed, so only its listing row is left
+    for record_number, meeting in enumerate(listing[:-1], 1):
+        meeting_file = scraped / f'MeetData_X_2024-01_PG1_R{record_number}_api.json'
+        meeting_file.write_text(json.dumps(details[meeting['meetingId']]))
+
+    output_dir = str(tmp_path / 'dataset')
+    summary = consolidate(str(scraped), output_dir, workers=1, batch_size=2)
+    assert summary['meetings'] == 6
+    assert summary['votes'] == 5 * 2 * 3
+
+    meetings = load_table(output_dir, 'meetings').to_pylist()
+    assert sorted(meeting['meeting_id'] for meeting in meetings) == sorted(str(m['meetingId']) for m in listing)
+    listed_only = str(listing[-1]['meetingId'])
+    assert all(('PageData_' if meeting['meeting_id'] == listed_only else 'MeetData_') in meeting['source_file']
+               for meeting in meetings)
+
+
+def test_glnew_meetings_of_two_runs_keep_their_own_meeting_ids(tmp_path):
+    scraped = tmp_path / 'scraped'
+    for run, meeting_id in [('run1', '101'), ('run2', '202'), ('run3', '101')]:
+        (scraped / run).mkdir(parents=True)
+        rows = [{'Item': {'text': '1', 'title': ''}, 'Proposal Description': {'text': 'Elect', 'title': ''},
+                 'Vote Decision': {'text': 'For', 'title': ''}, 'Meeting ID': {'text': meeting_id, 'title': ''}}]
+        (scraped / run / 'meeting_data_1.json').write_text(json.dumps(rows))
+
+    output_dir = str(tmp_path / 'dataset')
+    summary = consolidate(str(scraped), output_dir, workers=1, batch_size=2)
+    assert summary['meetings'] == 2
+    meetings = load_table(output_dir, 'meetings').to_pylist()
+    assert sorted(meeting['meeting_id'] for meeting in meetings) == ['101', '202']
+    assert {vote['meeting_id'] for vote in load_table(output_dir, 'votes').to_pylist()} == {'101', '202'}
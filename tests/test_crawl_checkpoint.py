@@ -0,0 +1,63 @@
+import json
+
+from crawl_checkpoint import CheckpointJournal, incremental_start_date, load_last_date_end, save_last_date_end
+
+PARAMS = {'start_date': '2024-01-01', 'end_date': '2024-01-31', 'page_size': 10}
+
+
+def test_journal_resumes_finished_pages_and_meetings(tmp_path):
+    path = str(tmp_path / 'journal.ndjson')
+    journal = CheckpointJournal(path, PARAMS)
+    journal.record_meeting(1, 1, 501)
+    journal.record_page(1, 10)
+    journal.close()
+
+    resumed = CheckpointJournal(path, PARAMS)
+    assert resumed.page_count(1) == 10 and resumed.page_count(2) is None
+    assert resumed.is_meeting_done('501') and not resumed.run_complete
+    resumed.close()
+
+
+def test_journal_of_another_query_is_ignored(tmp_path):
+    path = str(tmp_path / 'journal.ndjson')
+    journal = CheckpointJournal(path, PARAMS)
+    journal.record_meeting(1, 1, 501)
+    journal.record_complete()
+    journal.close()
+
+    other = CheckpointJournal(path, dict(PARAMS, page_size=50))
+    assert not other.is_meeting_done(501) and not other.run_complete
+    other.close()
+
+
+def test_torn_last_line_is_skipped_and_terminated(tmp_path):
+    path = str(tmp_path / 'journal.ndjson')
+    journal = CheckpointJournal(path, PARAMS)
+    journal.record_meeting(1, 1, 501)
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"event": "meeting", "page": 1, "rec')  # Crashed mid-write
+
+    resumed = CheckpointJournal(path, PARAMS)
+    resumed.record_meeting(1, 2, 502)
+    resumed.close()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert lines[-3].endswith('"rec')
+    assert [json.loads(line)['event'] for line in lines[-2:]] == ['start', 'meeting']
+    final = CheckpointJournal(path, PARAMS)
+    assert final.is_meeting_done(501) and final.is_meeting_done(502)
+    final.close()
+
+
+def test_incremental_window_starts_after_the_last_synced_day(tmp_path):
+    path = str(tmp_path / 'sync.json')
+    assert load_last_date_end('X_api', path) is None
+    save_last_date_end('X_api', '2024-02-29', path)
+    save_last_date_end('Y_api', '2024-01-15', path)
+    assert load_last_date_end('X_api', path) == '2024-02-29'
+
+    assert incremental_start_date('2024-01-01', None) == '2024-01-01'
+    assert incremental_start_date('2024-01-01', '2024-02-29') == '2024-03-01'
+    assert incremental_start_date('2024-06-01', '2024-02-29') == '2024-06-01'
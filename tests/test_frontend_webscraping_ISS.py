@@ -0,0 +1,148 @@
+import pytest
+
+pytest.importorskip('playwright')
+pa = pytest.importorskip('pyarrow')
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from consolidate_output import parse_batch
+from frontend_webscraping_ISS import SITE_BASE, capture_mark, iter_grid_page, open_meeting_detail
+from output_sink import NdjsonSink
+from wait_strategy import WaitTimeout
+
+GRID_HTML = ''.join(
+    ['<table id="list">']
+    + [f'<tr><td aria-describedby="list_Ticker"><a href="javascript:show(\'MTcy\',\'{900 + row}\')">T{row}</a></td>'
+       f'<td aria-describedby="list_Company" title="Company {row}">Company {row}</td></tr>' for row in range(3)]
+    + ['</table>']
+)
+
+
+class GridPage:
+    """Just enough of a Playwright page for the DOM path of iter_grid_page."""
+
+    def on(self, event, handler):
+        pass
+
+    def content(self):
+        return GRID_HTML
+
+
+def test_streamed_ndjson_page_keeps_its_grid_rows(tmp_path):
+    sink = NdjsonSink(str(tmp_path), 'Records_ISS_MTcy')
+    hrefs = []
+    for cell, href in iter_grid_page(GridPage(), 0):
+        if cell is not None:
+            sink.write_item('page_data_1.json', cell)
+        if href:
+            hrefs.append(href)
+        # A detail worker saving a meeting while the page is still streaming
+        if len(hrefs) == 1 and cell is not None and cell['aria_describedby'] == 'list_Company':
+            sink.write('meeting_data_900_1.json', {'Meeting ID': '900', 'Details': []})
+    sink.end_stream('page_data_1.json')
+    sink.write_item('page_data_2.json', {'aria_describedby': 'list_Ticker', 'text': 'T9', 'title': 'T9'})
+    sink.end_stream('page_data_2.json')
+    sink.close()
+
+    listings = parse_batch([sink.path])['listings'].to_pylist()
+    page_1 = [(row['row'], row['column']) for row in listings if row['source_file'] == 'page_data_1.json']
+    assert page_1 == [(0, 'list_Ticker'), (0, 'list_Company'), (1, 'list_Ticker'), (1, 'list_Company'),
+                      (2, 'list_Ticker'), (2, 'list_Company')]
+    assert [row['row'] for row in listings if row['source_file'] == 'page_data_2.json'] == [0]
+    assert len(hrefs) == 3
+
+
+class DetailPage:
+    """Records navigation; the meeting handler swaps the ballot the page shows."""
+
+    def __init__(self):
+        self.url = 'about:blank'
+        self.calls = []
+        self.ballot = ''
+
+    def goto(self, url):
+        self.calls.append(('goto', url))
+        self.url = url
+
+    def wait_for_load_state(self, state):
+        self.calls.append(('load_state', state))
+
+    def evaluate(self, expression, arg=None):
+        if 'showMeeting' in expression:
+            self.calls.append(('handler', expression))
+            self.ballot = expression
+            return None
+        return self.ballot
+
+    def wait_for_function(self, expression, arg=None, timeout=None):
+        assert self.ballot != arg
+        self.calls.append(('rows_changed', None))
+
+
+def test_detail_workers_load_the_site_once_and_reuse_it():
+    page = DetailPage()
+    for meeting_id in ('901', '902'):
+        href = f"javascript:showMeeting('MTcy','{meeting_id}','0')"
+        open_meeting_detail(page, meeting_id, href, 'MTcy')
+        page.url = f'{SITE_BASE}MTcy/meeting'  # The handler moves the app to its detail view
+
+    assert [call for call, _ in page.calls] == ['goto', 'load_state', 'handler', 'rows_changed',
+                                                'handler', 'rows_changed']
+    assert page.calls[0][1] == f'{SITE_BASE}MTcy/'
+
+
+class StuckDetailPage(DetailPage):
+    """The handler runs but the ballot never changes."""
+
+    def wait_for_function(self, expression, arg=None, timeout=None):
+        raise PlaywrightTimeoutError('timed out')
+
+
+def test_detail_view_that_never_changes_raises_instead_of_saving_stale_rows():
+    page = StuckDetailPage()
+    page.url = f'{SITE_BASE}MTcy/meeting'
+    page.ballot = 'rows of meeting 901'
+    with pytest.raises(WaitTimeout):
+        open_meeting_detail(page, '902', "javascript:showMeeting('MTcy','902','0')", 'MTcy')
+
+
+class Response:
+    class request:
+        resource_type = 'xhr'
+
+    status = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class XhrGridPage:
+    """A grid page whose rows arrived as jqGrid JSON; its links are only in the DOM."""
+
+    def __init__(self, rows, hrefs):
+        self.handlers = {}
+        self.rows = rows
+        self.hrefs = hrefs
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def eval_on_selector_all(self, selector, expression):
+        return self.hrefs
+
+    def load(self):
+        self.handlers['response'](Response({'rows': self.rows}))
+
+
+def test_xhr_grid_rows_come_with_their_own_links():
+    rows = [{'Ticker': 'T0', 'Company': 'Alpha'}, {'Ticker': 'T1', 'Company': 'Beta'}]
+    hrefs = ["javascript:show('MTcy','900')", None, "javascript:show('MTcy','999')"]
+    page = XhrGridPage(rows, hrefs)
+    since = capture_mark(page)
+    page.load()
+
+    pairs = [(cell and cell['text'], href) for cell, href in iter_grid_page(page, since)]
+    assert pairs == [('T0', hrefs[0]), ('Alpha', None), ('T1', None), ('Beta', None), (None, hrefs[2])]
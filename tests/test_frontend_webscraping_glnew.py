@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+pytest.importorskip('playwright')
+
+from frontend_webscraping_glnew import clean_snapshot, meeting_rows, page_rows, save_meeting_data
+
+MEETING_HEADERS = [' Item ', 'Proposal Description', 'Vote Decision', 'Shares Voted', 'For/Against Management', 'Notes']
+
+
+def snapshot_row(*texts, visible=None, link=None):
+    visible = visible or [True] * len(texts)
+    return {'cells': [{'text': text, 'title': f'title {text}', 'visible': shown} for text, shown in zip(texts, visible)],
+            'link': link}
+
+
+def meeting_snapshot(rows):
+    return clean_snapshot({'headers': list(MEETING_HEADERS), 'rows': rows})
+
+
+def test_listing_rows_are_keyed_by_header_with_the_links_meeting_id():
+    snapshot = clean_snapshot({'headers': ['Company Name ', 'Meeting Date'], 'rows': [
+        snapshot_row(' Alpha Ltd ', '05/01/2024', 'extra cell', link='/Russell/meeting/1234'),
+        snapshot_row('Beta Ltd', '06/01/2024', link=None)
+    ]})
+    rows = page_rows(snapshot)
+    assert rows[0] == {'Company Name': {'text': 'Alpha Ltd', 'title': 'title  Alpha Ltd '},
+                       'Meeting Date': {'text': '05/01/2024', 'title': 'title 05/01/2024'},
+                       'Meeting ID': {'text': '1234', 'title': ''}}
+    assert 'Meeting ID' not in rows[1]
+
+
+def test_meeting_rows_swap_the_shares_and_for_against_columns():
+    rows = meeting_rows(meeting_snapshot([snapshot_row('1', 'Elect Director', 'For', 'For', '1,000')]))
+    assert rows[0]['Shares Voted']['text'] == '1,000'
+    assert rows[0]['For/Against Management']['text'] == 'For'
+    assert rows[0]['Item'] == {'text': '1', 'title': 'title 1'}
+
+
+def test_meeting_rows_keep_only_visible_non_empty_cells():
+    rows = meeting_rows(meeting_snapshot([
+        snapshot_row('1', 'Elect Director', 'For', '  ', 'hidden', visible=[True, True, True, True, False]),
+        # The Vote Decision cell is hidden, so the row is incomplete
+        snapshot_row('2', 'Ratify Auditors', 'Against', visible=[True, True, False])
+    ]))
+    assert len(rows) == 1
+    assert set(rows[0]) == {'Item', 'Proposal Description', 'Vote Decision'}
+
+
+def test_meeting_rows_keep_the_first_row_of_each_item():
+    rows = meeting_rows(meeting_snapshot([
+        snapshot_row('1', 'Elect Director', 'For'),
+        snapshot_row('1', 'Elect Director', 'Against'),
+        snapshot_row('2', 'Ratify Auditors', 'For'),
+        snapshot_row('', 'Total', '')
+    ]))
+    assert [(row['Item']['text'], row['Vote Decision']['text']) for row in rows] == [('1', 'For'), ('2', 'For')]
+
+
+def test_saved_meeting_rows_carry_the_meeting_id(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rows = meeting_rows(meeting_snapshot([snapshot_row('1', 'Elect Director', 'For')]))
+    save_meeting_data(rows, 3, 'https://votedisclosure.glasslewis.com/Russell/meeting/987')
+    saved = json.loads((tmp_path / 'meeting_data_3.json').read_text(encoding='utf-8'))
+    assert [row['Meeting ID']['text'] for row in saved] == ['987']
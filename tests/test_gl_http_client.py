@@ -0,0 +1,40 @@
+import gl_http_client
+from gl_http_client import TokenBucket, backoff_delay
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_bucket_allows_a_burst_then_queues_callers(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(gl_http_client.time, 'monotonic', clock.monotonic)
+    bucket = TokenBucket(rate=2, capacity=2)
+    assert [bucket._reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+
+    # Refilled tokens first pay back the callers queued ahead
+    clock.now += 0.5
+    assert bucket._reserve() == 1.0
+    clock.now += 2
+    assert bucket._reserve() == 0.0
+
+
+def test_bucket_never_holds_more_than_its_capacity(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(gl_http_client.time, 'monotonic', clock.monotonic)
+    bucket = TokenBucket(rate=5)
+    clock.now += 60
+    assert [bucket._reserve() for _ in range(6)] == [0.0] * 5 + [0.2]
+
+
+def test_backoff_is_capped_jitter_but_honours_retry_after(monkeypatch):
+    monkeypatch.setattr(gl_http_client.random, 'uniform', lambda low, high: high)
+    assert backoff_delay(0) == gl_http_client.BACKOFF_BASE
+    assert backoff_delay(3) == gl_http_client.BACKOFF_BASE * 8
+    assert backoff_delay(30) == gl_http_client.BACKOFF_MAX
+    assert backoff_delay(0, retry_after='12') == max(12.0, gl_http_client.BACKOFF_BASE)
+    assert backoff_delay(0, retry_after='Wed, 21 Oct 2015 07:28:00 GMT') == gl_http_client.BACKOFF_BASE
@@ -0,0 +1,45 @@
+from gl_shard_crawl import merge_shard_listings, plan_shards, process_rate
+from response_cache import ResponseCache
+
+
+def test_plan_pairs_every_window_with_every_fund_group():
+    shards = plan_shards('2024-01-01', '2024-03-10', window_days=30, fund_group_size=2, funds=[1, 2, 3])
+    windows = [(shard['start_date'], shard['end_date']) for shard in shards]
+    assert windows == [('2024-01-01', '2024-01-30')] * 2 + [('2024-01-31', '2024-02-29')] * 2 \
+        + [('2024-03-01', '2024-03-10')] * 2
+    assert [shard['funds'] for shard in shards[:2]] == [[1, 2], [3]]
+    assert [shard['shard'] for shard in shards] == [1, 2, 3, 4, 5, 6]
+
+
+def test_plan_without_fund_groups_keeps_all_funds_together():
+    shards = plan_shards('2024-01-01', '2024-01-01', window_days=30, fund_group_size=0, funds=[1, 2, 3])
+    assert shards == [{'shard': 1, 'start_date': '2024-01-01', 'end_date': '2024-01-01', 'funds': [1, 2, 3]}]
+
+
+def test_merge_dedupes_meetings_and_unites_their_funds():
+    first = [{'meetingId': 2, 'companyName': 'beta', 'funds': [{'fundId': 1}]},
+             {'meetingId': 1, 'companyName': 'Alpha', 'funds': [{'fundId': 1}]}]
+    second = [{'meetingId': 2, 'companyName': 'beta', 'funds': [{'fundId': 1}, {'fundId': 7}]},
+              {'meetingId': None, 'companyName': 'no id'}]
+    merged, duplicates = merge_shard_listings([first, second])
+    assert duplicates == 1
+    assert [meeting['meetingId'] for meeting in merged] == [1, 2]
+    assert [fund['fundId'] for fund in merged[1]['funds']] == [1, 7]
+    assert first[0]['funds'] == [{'fundId': 1}]  # Inputs are not mutated
+
+
+def test_processes_share_the_request_rate():
+    assert process_rate(4, requests_per_second=10) == 2.5
+    assert process_rate(0, requests_per_second=10) == 10
+    assert process_rate(8, requests_per_second=0) == 0
+
+
+def test_cache_connections_wait_for_each_other(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    first, second = ResponseCache(path), ResponseCache(path)
+    assert second.conn.execute('PRAGMA busy_timeout').fetchone()[0] > 5000
+    first.put('1|1', b'{}')
+    second.put('2|1', b'[]')
+    assert first.get('2|1')['body'] == b'[]'
+    first.close()
+    second.close()
@@ -0,0 +1,59 @@
+import Backend_webscraping_gl
+import glnew_hybrid
+from glnew_hybrid import HybridDetailFetcher, ListingCapture, api_meeting_rows, meeting_id_from_link
+
+
+class Page:
+    def on(self, event, handler):
+        pass
+
+
+def test_meeting_id_is_the_last_number_in_the_link():
+    assert meeting_id_from_link('/CSIM/meeting/1234567') == '1234567'
+    assert meeting_id_from_link('/CSIM/meetings') is None
+    assert meeting_id_from_link(None) is None
+
+
+def test_api_rows_keep_one_row_per_item_like_the_rendered_page():
+    meeting = {
+        'meetingId': 7,
+        'proposals': [
+            {'proposalNumber': '1', 'proposalText': 'Elect Director', 'proponent': 'Management',
+             'managementRecommendation': 'For',
+             'votes': [{'fundId': 11, 'fundName': 'Fund A', 'voteDecision': 'For', 'sharesVoted': 100},
+                       {'fundId': 12, 'fundName': 'Fund B', 'voteDecision': 'Against', 'sharesVoted': 200}]},
+            {'proposalNumber': '2', 'proposalText': 'Ratify Auditors',
+             'votes': [{'fundId': 11, 'fundName': 'Fund A', 'voteDecision': 'For'}]}
+        ],
+        # A fund-first entry for an item with no proposal text must not break the rows
+        'funds': [{'fundId': 13, 'fundName': 'Fund C', 'votes': [{'itemNumber': '3', 'voteDecision': 'For'}]}]
+    }
+    rows = api_meeting_rows(meeting)
+    assert [row['Item']['text'] for row in rows] == ['1', '2']
+    assert rows[0]['Fund Name']['text'] == 'Fund A'
+    assert rows[0]['Vote Decision']['text'] == 'For'
+    assert rows[0]['Shares Voted']['text'] == '100'
+
+
+def test_meetings_the_listing_capture_missed_go_to_the_browser(monkeypatch):
+    monkeypatch.setattr(glnew_hybrid, 'open_default_cache', lambda: None)
+    capture = ListingCapture(Page(), '/Meetings')
+    capture.fund_ids['555'] = [11, 12]  # Funds seen, but never a siteId
+
+    fetcher = HybridDetailFetcher(capture, save=lambda rows, visit_number, meeting_link: None, concurrency=1)
+    fetcher.submit('https://vds.example.com/meeting/555', 1)
+    fetcher.submit('https://vds.example.com/meeting/556', 2)
+    assert fetcher.close() == {'completed': 0, 'failed': 2}
+    assert capture.funds_for('556') is None
+
+
+
+def test_fetcher_closes_its_own_client_not_the_shared_one(monkeypatch):
+    monkeypatch.setattr(glnew_hybrid, 'open_default_cache', lambda: None)
+    closed = []
+    monkeypatch.setattr(glnew_hybrid.GlassLewisClient, 'close', lambda client: closed.append(client))
+    shared = Backend_webscraping_gl.get_default_client()
+
+    fetcher = HybridDetailFetcher(ListingCapture(Page(), '/Meetings'), save=lambda *args: None, concurrency=1)
+    fetcher.close()
+    assert len(closed) == 1 and closed[0] is not shared
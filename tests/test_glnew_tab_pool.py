@@ -0,0 +1,87 @@
+import contextlib
+
+import pytest
+
+pytest.importorskip('playwright')
+
+import glnew_tab_pool
+from glnew_tab_pool import AsyncTabPool
+
+
+class Tab:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class Browser:
+    def __init__(self):
+        self.tabs = []
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    browser = Browser()
+
+    @contextlib.asynccontextmanager
+    async def async_playwright():
+        yield None
+
+    async def connect_browser_async(playwright):
+        return browser
+
+    async def new_page_async(owner):
+        tab = Tab(len(owner.tabs))
+        owner.tabs.append(tab)
+        return tab
+
+    monkeypatch.setattr(glnew_tab_pool, 'async_playwright', async_playwright)
+    monkeypatch.setattr(glnew_tab_pool, 'connect_browser_async', connect_browser_async)
+    monkeypatch.setattr(glnew_tab_pool, 'new_page_async', new_page_async)
+    monkeypatch.setattr(glnew_tab_pool, 'backoff_delay', lambda attempt: 0)
+    return browser
+
+
+def test_failed_jobs_are_retried_then_given_up(browser):
+    attempts = {}
+
+    async def visit(page, link, visit_number):
+        attempts[link] = attempts.get(link, 0) + 1
+        if link == 'flaky' and attempts[link] == 1:
+            raise RuntimeError('table never loaded')
+        if link == 'broken':
+            raise RuntimeError('always fails')
+
+    pool = AsyncTabPool(visit, tabs=2, retries=2)
+    for number, link in enumerate(['ok', 'flaky', 'broken'], 1):
+        pool.submit(link, number)
+    assert pool.close() == {'completed': 2, 'retried': 3, 'failed': 1}
+    assert attempts == {'ok': 1, 'flaky': 2, 'broken': 3}
+    assert pool.failed == [('broken', 3)]
+    assert browser.closed and all(tab.closed for tab in browser.tabs)
+
+
+def test_a_tab_that_died_is_replaced_before_the_retry(browser):
+    visited_on = []
+
+    async def visit(page, link, visit_number):
+        visited_on.append(page.number)
+        if len(visited_on) == 1:
+            page.closed = True  # The tab crashed mid-job
+            raise RuntimeError('Target closed')
+
+    pool = AsyncTabPool(visit, tabs=1, retries=1)
+    pool.submit('meeting', 1)
+    assert pool.close() == {'completed': 1, 'retried': 1, 'failed': 0}
+    assert visited_on == [0, 1]
+    assert len(browser.tabs) == 2
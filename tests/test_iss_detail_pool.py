@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip('playwright')
+
+from iss_detail_pool import DetailPagePool
+
+
+class LocalPool(DetailPagePool):
+    """Workers run jobs without a browser."""
+
+    def run_worker(self, index):
+        self.work(page=None)
+
+
+def test_failed_jobs_are_retried_then_given_up():
+    attempts = {}
+
+    def visit(page, meeting_id):
+        attempts[meeting_id] = attempts.get(meeting_id, 0) + 1
+        if meeting_id == 'flaky' and attempts[meeting_id] == 1:
+            raise RuntimeError('rows did not change')
+        if meeting_id == 'broken':
+            raise RuntimeError('always fails')
+
+    pool = LocalPool(visit, workers=2, retries=1)
+    for meeting_id in ('ok', 'flaky', 'broken'):
+        pool.submit(meeting_id)
+    assert pool.close() == {'completed': 2, 'retried': 2, 'failed': 1}
+    assert pool.failed == [('broken',)]
+    assert attempts == {'ok': 1, 'flaky': 2, 'broken': 2}
+
+
+def test_jobs_count_as_failed_when_no_worker_starts():
+    class DeadPool(DetailPagePool):
+        def run_worker(self, index):
+            pass
+
+    pool = DeadPool(lambda page, meeting_id: None, workers=2)
+    pool.submit('a')
+    assert pool.close() == {'completed': 0, 'retried': 0, 'failed': 1}
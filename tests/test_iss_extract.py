@@ -0,0 +1,35 @@
+import pytest
+
+from bench_iss_extract import synthetic_page
+from iss_extract import available_extractors, get_extractor
+
+PAGE = synthetic_page(meetings=5, ballot_items=14)
+
+
+@pytest.mark.parametrize('name', sorted(available_extractors()))
+def test_extractors_match_beautifulsoup(name):
+    reference, extractor = get_extractor('bs4'), get_extractor(name)
+    assert extractor.meeting_details(PAGE, 'M1') == reference.meeting_details(PAGE, 'M1')
+    assert extractor.grid_page(PAGE) == reference.grid_page(PAGE)
+
+
+def test_meeting_details_skip_hidden_and_unlisted_cells():
+    details = get_extractor('bs4').meeting_details(PAGE, 'M1')
+    assert details['Meeting ID'] == 'M1'
+    first = details['Details'][0]
+    assert first['listDetail_BallotItemNumber']['text'] == '1'
+    assert first['listDetail_MgtRecVote']['text'] == 'For'
+    assert not any('listDetail_Rationale' in row for row in details['Details'])
+    assert [row['listDetail_BallotItemNumber']['text'] for row in details['Details']
+            if 'listDetail_ShareholderProposal' in row] == ['5', '10']
+
+
+def test_grid_cells_carry_their_links():
+    cells, hrefs = get_extractor('bs4').grid_page(PAGE)
+    assert len(hrefs) == 5 and hrefs[0] == "javascript:showMeeting('MTcy','900000','0')"
+    assert cells[0] == {'aria_describedby': 'list_Ticker', 'text': 'T0', 'title': 'T0'}
+
+
+def test_unknown_parser_is_rejected():
+    with pytest.raises(ValueError):
+        get_extractor('html5lib-fast')
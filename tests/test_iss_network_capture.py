@@ -0,0 +1,96 @@
+from iss_network_capture import ResponseCapture, _captures, capture_for, iter_grid_cells, meeting_details, payload_rows
+
+
+class Request:
+    resource_type = 'xhr'
+
+
+class Response:
+    request = Request()
+    status = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class Page:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+
+GRID = {'rows': [{'Ticker': 'AAA', 'Company': 'A'}]}
+DETAIL = {'rows': [{'BallotItemNumber': '1', 'Proposal': 'Elect'}]}
+
+
+def test_capture_returns_the_newest_payload_after_a_mark():
+    page = Page()
+    capture = ResponseCapture(page)
+    page.handlers['response'](Response(GRID))
+    since = capture.mark()
+    assert capture.grid_rows(since) is None
+
+    page.handlers['response'](Response(DETAIL))
+    newer_grid = {'rows': [{'Ticker': 'BBB', 'Company': 'B'}]}
+    page.handlers['response'](Response(newer_grid))
+    assert capture.detail_rows(since) == DETAIL['rows']
+    assert capture.grid_rows(since) == newer_grid['rows']
+    assert capture.grid_rows(0) == newer_grid['rows']
+    assert capture.detail_rows(capture.mark()) is None
+
+
+def test_capture_keeps_one_payload_of_each_kind():
+    page = Page()
+    capture = ResponseCapture(page)
+    for number in range(50):
+        page.handlers['response'](Response({'rows': [{'Ticker': str(number)}]}))
+    assert capture.mark() == 50
+    assert len(capture.newest) == 1
+
+
+def test_capture_is_released_when_the_page_closes():
+    page = Page()
+    capture_for(page)
+    assert page in _captures
+    page.handlers['close'](page)
+    assert page not in _captures
+
+
+def test_grid_cells_follow_the_page_data_layout():
+    rows = [{'Ticker': '<a href="#">AAA</a>', 'Company': 'A &amp; Sons', 'MeetingDate': None}]
+    assert list(iter_grid_cells(rows)) == [
+        {'aria_describedby': 'list_Ticker', 'text': 'AAA', 'title': 'AAA'},
+        {'aria_describedby': 'list_Company', 'text': 'A & Sons', 'title': 'A & Sons'},
+        {'aria_describedby': 'list_MeetingDate', 'text': '', 'title': ''}
+    ]
+
+
+def test_meeting_details_keep_ballot_fields_with_text():
+    rows = [
+        {'BallotItemNumber': '1', 'Proposal': '<b>Elect</b> Director', 'MgtRecVote': 'For', 'ClientVoteList': 'For',
+         'Hidden': 'x'},
+        {'BallotItemNumber': '', 'Proposal': ' ', 'Other': 'only unkept fields'},
+        {'BallotItemNumber': 2, 'ShareholderProposal': 'Yes'}
+    ]
+    details = meeting_details(rows, '900')
+    assert details['Meeting ID'] == '900'
+    assert details['Details'] == [
+        {'listDetail_BallotItemNumber': {'text': '1', 'title': '1'},
+         'listDetail_Proposal': {'text': 'Elect Director', 'title': 'Elect Director'},
+         'listDetail_MgtRecVote': {'text': 'For', 'title': 'For'},
+         'listDetail_ClientVoteList': {'text': 'For', 'title': 'For'}},
+        {'listDetail_BallotItemNumber': {'text': '2', 'title': '2'},
+         'listDetail_ShareholderProposal': {'text': 'Yes', 'title': 'Yes'}}
+    ]
+
+
+def test_positional_and_empty_payloads_are_not_read():
+    assert payload_rows({'rows': [{'id': 1, 'cell': ['AAA', 'A']}]}) is None
+    assert payload_rows({'rows': []}) is None
+    assert payload_rows('<html></html>') is None
+    assert payload_rows([{'Ticker': 'AAA'}]) == [{'Ticker': 'AAA'}]
@@ -0,0 +1,73 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip('playwright')
+
+from iss_shard_crawl import merge_shard_outputs, plan_iss_shards
+from output_sink import NdjsonSink
+from vote_store import iter_ndjson
+
+
+def test_date_shards_cover_the_range_in_windows():
+    shards = plan_iss_shards('01-Jan-2024', '15-Feb-2024', mode='dates', window_days=30)
+    assert [(shard['start_date'], shard['end_date']) for shard in shards] == [
+        ('01-Jan-2024', '30-Jan-2024'), ('31-Jan-2024', '15-Feb-2024')]
+    assert all(shard['page_shard'] is None for shard in shards)
+
+
+def test_page_shards_split_the_grid_pages():
+    shards = plan_iss_shards('01-Jan-2024', '15-Feb-2024', mode='pages', workers=3)
+    assert [shard['page_shard'] for shard in shards] == [(0, 3), (1, 3), (2, 3)]
+    assert {(shard['start_date'], shard['end_date']) for shard in shards} == {('01-Jan-2024', '15-Feb-2024')}
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def test_merge_keeps_the_first_copy_of_each_meeting(tmp_path):
+    shard_dirs = []
+    for shard, meeting_ids in ((1, ['10', '11']), (2, ['11', '12'])):
+        shard_dir = tmp_path / f'shard_{shard}'
+        shard_dir.mkdir()
+        shard_dirs.append(str(shard_dir))
+        for meeting_id in meeting_ids:
+            write_json(shard_dir / f'meeting_data_{meeting_id}_1.json', {'Meeting ID': meeting_id, 'shard': shard})
+        write_json(shard_dir / 'page_data_1.json', [])
+        write_json(shard_dir / 'visitedMeetings.json', meeting_ids)
+
+    output_dir = tmp_path / 'merged'
+    assert merge_shard_outputs(shard_dirs, str(output_dir)) == {'meetings': 3, 'duplicates': 1, 'visited': 3}
+    assert sorted(os.listdir(output_dir)) == ['meeting_data_10_1.json', 'meeting_data_11_1.json',
+                                              'meeting_data_12_1.json', 'page_data_W1_1.json',
+                                              'page_data_W2_1.json', 'visitedMeetings.json']
+    with open(output_dir / 'meeting_data_11_1.json') as f:
+        assert json.load(f)['shard'] == 1
+
+
+def test_merge_dedupes_ndjson_streams(tmp_path):
+    shard_dirs = []
+    for shard, meeting_ids in ((1, ['10', '11']), (2, ['11', '12'])):
+        shard_dir = tmp_path / f'shard_{shard}'
+        shard_dirs.append(str(shard_dir))
+        sink = NdjsonSink(str(shard_dir), 'Records_ISS_MTcy')
+        sink.write_item('page_data_1.json', {'aria_describedby': 'list_Ticker', 'text': 'T', 'title': 'T'})
+        sink.end_stream('page_data_1.json')
+        for meeting_id in meeting_ids:
+            sink.write(f'meeting_data_{meeting_id}_1.json', {'Meeting ID': meeting_id, 'shard': shard})
+        sink.close()
+
+    output_dir = tmp_path / 'merged'
+    summary = merge_shard_outputs(shard_dirs, str(output_dir))
+    assert summary['meetings'] == 3 and summary['duplicates'] == 1
+
+    records = [record for name in sorted(os.listdir(output_dir)) if name.endswith('.ndjson')
+               for record in iter_ndjson(str(output_dir / name))]
+    assert sorted(name for name, _ in records) == ['meeting_data_10_1.json', 'meeting_data_11_1.json',
+                                                   'meeting_data_12_1.json', 'page_data_W1_1.json',
+                                                   'page_data_W2_1.json']
+    assert dict(records)['meeting_data_11_1.json']['shard'] == 1
+    assert not os.path.exists(shard_dirs[0] + '/Records_ISS_MTcy.ndjson')
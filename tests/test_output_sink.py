@@ -0,0 +1,63 @@
+import json
+import os
+
+import pytest
+
+from output_sink import JsonFileSink, NdjsonSink, OutputSink
+from vote_store import iter_ndjson
+
+PAGE = [{'meetingId': 1, 'funds': [{'fundId': 7}]}, {'meetingId': 2, 'funds': []}]
+
+
+def test_base_sink_cannot_be_used_directly():
+    with pytest.raises(TypeError):
+        OutputSink()
+
+
+def test_json_sink_streams_the_same_file_json_dump_writes(tmp_path):
+    sink = JsonFileSink(str(tmp_path), indent=2)
+    for meeting in PAGE:
+        sink.write_item('PageData_1.json', meeting)
+    sink.end_stream('PageData_1.json')
+    sink.end_stream('PageData_2.json')
+    sink.write('MeetData_1.json', {'meetingId': 1})
+    sink.close()
+
+    assert (tmp_path / 'PageData_1.json').read_text() == json.dumps(PAGE, indent=2)
+    assert json.loads((tmp_path / 'PageData_2.json').read_text()) == []
+    assert json.loads((tmp_path / 'MeetData_1.json').read_text()) == {'meetingId': 1}
+    assert sink.stats()['files'] == 3
+
+
+def test_unfinished_stream_never_appears_under_its_name(tmp_path):
+    sink = JsonFileSink(str(tmp_path))
+    sink.write_item('PageData_1.json', PAGE[0])
+    sink.close()
+    assert sorted(os.listdir(tmp_path)) == ['PageData_1.json.part']
+
+
+@pytest.mark.parametrize('compression', ['', 'gzip'])
+def test_ndjson_sink_round_trips_records(tmp_path, compression):
+    sink = NdjsonSink(str(tmp_path), 'Records', compression=compression)
+    sink.write_item('PageData_1.json', PAGE[0])
+    sink.write('MeetData_1.json', {'meetingId': 1})
+    sink.write_item('PageData_1.json', PAGE[1])
+    sink.end_stream('PageData_1.json')
+    sink.write_item('PageData_2.json', PAGE[0])
+    sink.end_stream('PageData_2.json')
+    sink.close()
+
+    assert list(iter_ndjson(sink.path)) == [('MeetData_1.json', {'meetingId': 1}), ('PageData_1.json', PAGE),
+                                            ('PageData_2.json', [PAGE[0]])]
+
+
+def test_json_sink_can_keep_non_ascii_text_as_utf8(tmp_path):
+    sink = JsonFileSink(str(tmp_path), indent=2, ensure_ascii=False)
+    sink.write('meeting_data_1_1.json', {'Company': 'Nestlé S.A.'})
+    sink.write_item('page_data_1.json', {'text': 'Société Générale'})
+    sink.end_stream('page_data_1.json')
+    sink.close()
+
+    assert 'Nestlé' in (tmp_path / 'meeting_data_1_1.json').read_text(encoding='utf-8')
+    streamed = (tmp_path / 'page_data_1.json').read_text(encoding='utf-8')
+    assert streamed == json.dumps([{'text': 'Société Générale'}], indent=2, ensure_ascii=False)
@@ -0,0 +1,37 @@
+from replay_fixtures import ResponseArchive, request_key
+
+
+class Request:
+    def __init__(self, url, method='GET', post_data=None, content_type=None):
+        self.url = url
+        self.method = method
+        self.post_data = post_data
+        self.headers = {'content-type': content_type} if content_type else {}
+
+
+def test_key_ignores_cache_busters_and_parameter_order():
+    first = Request('https://vds.example.com/grid?b=2&a=1&_=1700000000&nd=42#top')
+    second = Request('https://vds.example.com/grid?a=1&b=2&_=1800000000')
+    assert request_key(first) == request_key(second)
+    assert request_key(first) != request_key(Request('https://vds.example.com/grid?a=1&b=3'))
+
+    form = 'application/x-www-form-urlencoded; charset=UTF-8'
+    assert request_key(Request('https://x/list', 'POST', 'page=1&nd=5&rows=50', form)) == \
+        request_key(Request('https://x/list', 'POST', 'rows=50&page=1&nd=9', form))
+    assert request_key(Request('https://x/list', 'POST', '{"page": 1}')) != \
+        request_key(Request('https://x/list', 'POST', '{"page": 2}'))
+
+
+def test_archive_replays_in_recorded_order_then_repeats_the_last(tmp_path):
+    request = Request('https://vds.example.com/grid?page=1')
+    archive = ResponseArchive(str(tmp_path))
+    archive.record(request, 200, {'Content-Type': 'application/json', 'Content-Length': '2'}, b'[1]')
+    archive.record(request, 200, {'Content-Type': 'application/json'}, b'[2]')
+
+    replay = ResponseArchive(str(tmp_path))
+    assert replay.stats() == {'responses': 2, 'keys': 1}
+    bodies = [replay.lookup(request)[1] for _ in range(3)]
+    assert bodies == [b'[1]', b'[2]', b'[2]']
+    entry, _ = replay.lookup(request)
+    assert entry['headers'] == {'Content-Type': 'application/json'}
+    assert replay.lookup(Request('https://vds.example.com/grid?page=2')) is None
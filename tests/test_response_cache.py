@@ -0,0 +1,59 @@
+import response_cache
+from response_cache import ResponseCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def open_cache(tmp_path, monkeypatch, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, 'time', clock.time)
+    return ResponseCache(str(tmp_path / 'cache.sqlite'), **kwargs), clock
+
+
+def test_key_ignores_fund_order():
+    assert ResponseCache.make_key(5, [30, 4, 200]) == ResponseCache.make_key('5', ['200', 4, 30]) == '5|4,30,200'
+
+
+def test_entries_go_stale_after_their_ttl_and_touch_renews_them(tmp_path, monkeypatch):
+    cache, clock = open_cache(tmp_path, monkeypatch, ttl=60)
+    assert cache.get('1|1') is None
+    cache.put('1|1', '{"a": 1}', etag='"v1"')
+    assert cache.get('1|1') == {'body': b'{"a": 1}', 'etag': '"v1"', 'last_modified': None, 'fresh': True}
+
+    clock.now += 61
+    entry = cache.get('1|1')
+    assert entry['fresh'] is False and entry['body'] == b'{"a": 1}'
+
+    cache.touch('1|1')
+    assert cache.get('1|1')['fresh'] is True
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'stale': 1, 'revalidated': 1, 'evictions': 0, 'bytes': 8}
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted_over_the_cap(tmp_path, monkeypatch):
+    cache, clock = open_cache(tmp_path, monkeypatch, max_bytes=30)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, b'x' * 10)
+        clock.now += 1
+    cache.get('a')  # Now more recent than b
+    clock.now += 1
+
+    cache.put('d', b'x' * 10)
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in ('a', 'c', 'd'))
+    assert cache.stats()['evictions'] == 1 and cache.stats()['bytes'] == 30
+
+    # Replacing an entry only counts its new size
+    cache.put('a', b'x' * 5)
+    assert cache.stats()['bytes'] == 25
+    cache.close()
+
+    reopened = ResponseCache(str(tmp_path / 'cache.sqlite'), max_bytes=30)
+    assert reopened.stats()['bytes'] == 25
+    reopened.close()
@@ -0,0 +1,105 @@
+import json
+
+from mock_gl_server import generate_meetings
+from vote_store import (ISS_COLUMNS, SOURCE_GL_API, SOURCE_GL_BROWSER, SOURCE_ISS, VoteStore, classify_file,
+                        normalize_api_meeting, normalize_ballot_rows)
+
+
+def test_files_are_classified_by_name():
+    assert classify_file('out/MeetData_X_2024-01_PG1_R3_api.json') == (SOURCE_GL_API, 'meeting')
+    assert classify_file('PageData_X_2024-01_PG1_api.json') == (SOURCE_GL_API, 'listing')
+    assert classify_file('meeting_data_901234_2.json') == (SOURCE_ISS, 'meeting')
+    assert classify_file('meeting_data_17.json') == (SOURCE_GL_BROWSER, 'meeting')
+    assert classify_file('page_data_1.json') == (None, None)
+
+
+def test_proposal_first_and_fund_first_payloads_normalise_alike():
+    proposal_first = {'meetingId': 9, 'companyName': 'Alpha', 'meetingDate': '2024-05-01T00:00:00', 'proposals': [
+        {'proposalNumber': '1', 'proposalText': 'Elect', 'votes': [
+            {'fundId': 1, 'fundName': 'F1', 'voteDecision': 'For', 'sharesVoted': 10}]}]}
+    fund_first = {'id': 9, 'company': 'Alpha', 'date': '2024-05-01', 'funds': [
+        {'fundId': 1, 'fundName': 'F1', 'votes': [
+            {'itemNumber': '1', 'description': 'Elect', 'vote': 'For', 'shares': 10}]}]}
+
+    first, second = normalize_api_meeting(proposal_first), normalize_api_meeting(fund_first)
+    assert first == second
+    meeting, proposals, votes = first
+    assert (meeting['meeting_id'], meeting['meeting_date']) == ('9', '2024-05-01')
+    assert proposals == [{'item': '1', 'description': 'Elect', 'proponent': None, 'mgmt_rec': None}]
+    assert votes[0]['fund_id'] == '1' and votes[0]['shares'] == '10'
+
+
+def test_ballot_rows_skip_rows_without_an_item():
+    rows = [{'listDetail_BallotItemNumber': {'text': '1'}, 'listDetail_Proposal': {'text': 'Elect'},
+             'listDetail_ClientVoteList': {'text': 'For'}},
+            {'listDetail_Proposal': {'text': 'No item'}}]
+    proposals, votes = normalize_ballot_rows(rows, ISS_COLUMNS)
+    assert [proposal['item'] for proposal in proposals] == ['1']
+    assert votes == [{'item': '1', 'fund_id': '', 'fund_name': None, 'vote': 'For', 'for_against_mgmt': None,
+                      'shares': None}]
+
+
+def test_ingest_upserts_listing_and_detail_into_one_meeting(tmp_path):
+    listing, details = generate_meetings(3, funds_per_meeting=2, proposals_per_meeting=2)
+    (tmp_path / 'PageData_X_2024-01_PG1_api.json').write_text(json.dumps(listing))
+    meeting_id = listing[0]['meetingId']
+    (tmp_path / 'MeetData_X_2024-01_PG1_R1_api.json').write_text(json.dumps(details[meeting_id]))
+
+    store = VoteStore(str(tmp_path / 'votes.sqlite'))
+    assert store.ingest_directory(str(tmp_path)) == 4
+    assert len(store.meetings()) == 3
+    votes = store.fund_votes(company=listing[0]['companyName'])
+    assert len(votes) == 2 * 2
+    # Ingesting again replaces rather than duplicates
+    store.ingest_directory(str(tmp_path))
+    assert len(store.meetings()) == 3 and len(store.fund_votes(company=listing[0]['companyName'])) == 4
+    store.close()
+
+
+def cell(text):
+    return {'text': text, 'title': ''}
+
+
+def test_browser_meetings_are_keyed_on_their_meeting_id_and_dated_from_the_listing(tmp_path):
+    # Two runs both start numbering visits at 1
+    for run, meeting_id in [('run1', '101'), ('run2', '202')]:
+        (tmp_path / run).mkdir()
+        rows = [{'Item': cell('1'), 'Proposal Description': cell('Elect'), 'Vote Decision': cell('For'),
+                 'Fund Name': cell(f'Fund {run}'), 'Meeting ID': cell(meeting_id)}]
+        (tmp_path / run / 'meeting_data_1.json').write_text(json.dumps(rows))
+        listing = [{'Company Name': cell(f'Company {meeting_id}'), 'Meeting Date': cell('05/01/2024'),
+                    'Meeting ID': cell(meeting_id)}]
+        (tmp_path / run / 'page_data_1.json').write_text(json.dumps(listing))
+    # A file from before the scraper saved the ID falls back to its run directory
+    (tmp_path / 'run3').mkdir()
+    (tmp_path / 'run3' / 'meeting_data_1.json').write_text(json.dumps(
+        [{'Item': cell('1'), 'Proposal Description': cell('Elect'), 'Vote Decision': cell('Against')}]))
+
+    store = VoteStore(str(tmp_path / 'votes.sqlite'))
+    store.ingest_directory(str(tmp_path))
+    meetings = {meeting['meeting_id']: meeting for meeting in store.meetings(source=SOURCE_GL_BROWSER)}
+    assert set(meetings) == {'101', '202', str(tmp_path / 'run3' / 'meeting_data_1')}
+    assert (meetings['101']['company'], meetings['101']['meeting_date']) == ('Company 101', '2024-05-01')
+
+    votes = store.fund_votes(fund_id='Fund run2', company='Company 202')
+    assert [(vote['meeting_id'], vote['vote']) for vote in votes] == [('202', 'For')]
+    store.close()
+
+
+def test_iss_grid_rows_give_meetings_their_company_and_date(tmp_path):
+    cells = []
+    for meeting_id, company in [('900', 'Alpha'), ('901', 'Beta')]:
+        cells += [{'aria_describedby': 'list_Ticker', 'text': 'T', 'title': 'T'},
+                  {'aria_describedby': 'list_MeetingId', 'text': meeting_id, 'title': meeting_id},
+                  {'aria_describedby': 'list_Company', 'text': company, 'title': company},
+                  {'aria_describedby': 'list_MeetingDate', 'text': '15-Jan-2024', 'title': ''}]
+    (tmp_path / 'page_data_1.json').write_text(json.dumps(cells))
+    (tmp_path / 'meeting_data_901_1.json').write_text(json.dumps({'Meeting ID': '901', 'Details': [
+        {'listDetail_BallotItemNumber': cell('1'), 'listDetail_ClientVoteList': cell('For')}]}))
+
+    store = VoteStore(str(tmp_path / 'votes.sqlite'))
+    assert store.ingest_directory(str(tmp_path)) == 3
+    votes = store.fund_votes(company='Beta', start_date='2024-01-01')
+    assert [(vote['meeting_id'], vote['meeting_date'], vote['vote']) for vote in votes] == [('901', '2024-01-15', 'For')]
+    assert [meeting['company'] for meeting in store.meetings(source=SOURCE_ISS)] == ['Alpha', 'Beta']
+    store.close()
@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip('playwright')
+
+from wait_strategy import AdaptiveTimeout
+
+
+def test_timeout_stays_at_the_ceiling_until_it_has_samples():
+    timeout = AdaptiveTimeout('grid', floor_ms=1000, ceiling_ms=30000, multiplier=4)
+    timeout.observe(100)
+    timeout.observe(200)
+    assert timeout.timeout_ms() == 30000
+    timeout.observe(300)
+    assert timeout.timeout_ms() == 1200
+
+
+def test_timeout_is_kept_between_floor_and_ceiling():
+    timeout = AdaptiveTimeout('grid', floor_ms=1000, ceiling_ms=30000, multiplier=4)
+    for _ in range(3):
+        timeout.observe(10)
+    assert timeout.timeout_ms() == 1000
+    timeout.observe(20000)
+    assert timeout.timeout_ms() == 30000
+
+
+def test_a_timed_out_wait_doubles_the_timeout():
+    timeout = AdaptiveTimeout('grid', floor_ms=1000, ceiling_ms=30000, multiplier=4, window=3)
+    for _ in range(3):
+        timeout.observe(500)
+    assert timeout.timeout_ms() == 2000
+    timeout.timed_out()
+    assert timeout.timeout_ms() == 4000
+    for _ in range(5):
+        timeout.timed_out()
+    assert timeout.timeout_ms() == 30000
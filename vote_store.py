@@ -0,0 +1,505 @@
+import io
+import os
+import re
+import glob
+import gzip
+import json
+import time
+import sqlite3
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # Only needed for .ndjson.zst output
+    zstandard = None
+
+VOTE_STORE_PATH = os.environ.get('VOTE_STORE_PATH', 'votes.sqlite')
+
+# Source labels stored with every meeting
+SOURCE_GL_API = 'gl_api'  # Backend_webscraping_gl.py MeetData_/PageData_ files
+SOURCE_GL_BROWSER = 'gl_browser'  # frontend_webscraping_glnew.py meeting_data_{n}.json
+SOURCE_ISS = 'iss'  # frontend_webscraping_ISS.py meeting_data_{id}_{n}.json
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    meeting_key TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    meeting_id TEXT NOT NULL,
+    company TEXT,
+    ticker TEXT,
+    country TEXT,
+    meeting_date TEXT,
+    meeting_type TEXT,
+    source_file TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS proposals (
+    meeting_key TEXT NOT NULL REFERENCES meetings (meeting_key),
+    item TEXT NOT NULL,
+    description TEXT,
+    proponent TEXT,
+    mgmt_rec TEXT,
+    PRIMARY KEY (meeting_key, item)
+);
+CREATE TABLE IF NOT EXISTS fund_votes (
+    meeting_key TEXT NOT NULL REFERENCES meetings (meeting_key),
+    item TEXT NOT NULL,
+    fund_id TEXT NOT NULL,
+    fund_name TEXT,
+    vote TEXT,
+    for_against_mgmt TEXT,
+    shares TEXT,
+    PRIMARY KEY (meeting_key, item, fund_id)
+);
+CREATE INDEX IF NOT EXISTS meetings_company ON meetings (company COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS meetings_date ON meetings (meeting_date);
+CREATE INDEX IF NOT EXISTS meetings_source ON meetings (source);
+CREATE INDEX IF NOT EXISTS fund_votes_fund ON fund_votes (fund_id);
+"""
+
+# Column names used by the two browser scrapers
+ISS_COLUMNS = {
+    'item': 'listDetail_BallotItemNumber',
+    'description': 'listDetail_Proposal',
+    'proponent': 'listDetail_ShareholderProposal',
+    'mgmt_rec': 'listDetail_MgtRecVote',
+    'vote': 'listDetail_ClientVoteList'
+}
+GL_BROWSER_COLUMNS = {
+    'item': 'Item',
+    'description': 'Proposal Description',
+    'proponent': 'Proponent',
+    'mgmt_rec': 'Management Recommendation',
+    'vote': 'Vote Decision',
+    'for_against_mgmt': 'For/Against Management',
+    'shares': 'Shares Voted',
+    'fund_name': 'Fund Name',
+    'meeting_id': 'Meeting ID'
+}
+
+# Listing columns the meeting fields are read from: the ISS grid's cells and the glnew table's headers.
+# Both scrapers add the Meeting ID of each row's link, which is what joins a listing row to its meeting.
+ISS_LISTING_COLUMNS = {
+    'meeting_id': 'list_MeetingId',
+    'company': 'list_Company',
+    'ticker': 'list_Ticker',
+    'country': 'list_Country',
+    'meeting_date': 'list_MeetingDate',
+    'meeting_type': 'list_MeetingType'
+}
+GL_BROWSER_LISTING_COLUMNS = {
+    'meeting_id': 'Meeting ID',
+    'company': 'Company Name',
+    'ticker': 'Ticker',
+    'country': 'Country',
+    'meeting_date': 'Meeting Date',
+    'meeting_type': 'Meeting Type'
+}
+
+PAGE_DATA_PATTERN = re.compile(r'page_data_.+\.json$')
+
+
+def _first(data, *keys):
+    """Return the first non-empty value among ``keys`` (API field names vary between endpoints)."""
+    for key in keys:
+        value = data.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _text(value):
+    return None if value is None else str(value).strip()
+
+
+def _iso_date(value):
+    """Normalise the date formats the three scrapers produce to YYYY-MM-DD."""
+    if not value:
+        return None
+    value = str(value).strip()
+    if re.match(r'\d{4}-\d{2}-\d{2}', value):
+        return value[:10]
+    for fmt in ('%d-%b-%Y', '%m/%d/%Y', '%d %b %Y', '%b %d, %Y', '%m.%d.%Y'):
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return value
+
+
+def normalize_api_meeting(payload):
+    """Flatten a Glass Lewis API meeting payload into ``(meeting, proposals, votes)``.
+
+    Handles both proposal-first payloads (each proposal carries its fund votes) and
+    fund-first payloads (each fund carries its proposal votes).
+    """
+    meeting = {
+        'meeting_id': _text(_first(payload, 'meetingId', 'id')),
+        'company': _text(_first(payload, 'companyName', 'company', 'issuerName')),
+        'ticker': _text(_first(payload, 'ticker', 'symbol')),
+        'country': _text(_first(payload, 'country', 'countryName')),
+        'meeting_date': _iso_date(_first(payload, 'meetingDate', 'date')),
+        'meeting_type': _text(_first(payload, 'meetingType', 'type'))
+    }
+    proposals = {}
+    votes = []
+
+    def add_proposal(proposal):
+        item = _text(_first(proposal, 'proposalNumber', 'number', 'ballotItemNumber', 'itemNumber', 'item'))
+        if item is None:
+            return None
+        proposals.setdefault(item, {
+            'item': item,
+            'description': _text(_first(proposal, 'proposalText', 'description', 'title', 'proposal')),
+            'proponent': _text(_first(proposal, 'proponent', 'proposedBy')),
+            'mgmt_rec': _text(_first(proposal, 'managementRecommendation', 'mgmtRec', 'managementVote'))
+        })
+        return item
+
+    def add_vote(item, fund, vote):
+        fund_id = _text(_first(fund, 'fundId', 'id'))
+        if fund_id is None:
+            return
+        votes.append({
+            'item': item,
+            'fund_id': fund_id,
+            'fund_name': _text(_first(fund, 'fundName', 'name')),
+            'vote': _text(_first(vote, 'voteDecision', 'vote', 'voteCast', 'decision')),
+            'for_against_mgmt': _text(_first(vote, 'forAgainstManagement', 'withAgainstManagement')),
+            'shares': _text(_first(vote, 'sharesVoted', 'shares'))
+        })
+
+    for proposal in payload.get('proposals') or payload.get('ballotItems') or []:
+        item = add_proposal(proposal)
+        if item is None:
+            continue
+        for vote in proposal.get('votes') or proposal.get('fundVotes') or proposal.get('funds') or []:
+            add_vote(item, vote, vote)
+
+    for fund in payload.get('funds') or []:
+        for vote in fund.get('proposals') or fund.get('votes') or fund.get('ballotItems') or []:
+            item = add_proposal(vote)
+            if item is not None:
+                add_vote(item, fund, vote)
+
+    return meeting, list(proposals.values()), votes
+
+
+def normalize_ballot_rows(rows, columns, fund_id=''):
+    """Flatten browser-scraped ballot rows ({column: {'text', 'title'}}) into ``(proposals, votes)``."""
+    proposals = {}
+    votes = []
+
+    def cell(row, field):
+        column = columns.get(field)
+        value = row.get(column) if column else None
+        if isinstance(value, dict):
+            return _text(value.get('text'))
+        return _text(value)
+
+    for row in rows:
+        item = cell(row, 'item')
+        if item is None:
+            continue
+        fund_name = cell(row, 'fund_name')
+        proposals.setdefault(item, {
+            'item': item,
+            'description': cell(row, 'description'),
+            'proponent': cell(row, 'proponent'),
+            'mgmt_rec': cell(row, 'mgmt_rec')
+        })
+        vote = cell(row, 'vote')
+        if vote is not None:
+            votes.append({
+                'item': item,
+                # Without an ID the fund's name keys its vote, so funds stay apart and can be asked for
+                'fund_id': fund_id or fund_name or '',
+                'fund_name': fund_name,
+                'vote': vote,
+                'for_against_mgmt': cell(row, 'for_against_mgmt'),
+                'shares': cell(row, 'shares')
+            })
+
+    return list(proposals.values()), votes
+
+
+def gl_browser_meeting_id(rows, filename):
+    """The Meeting ID a glnew meeting file's rows carry, else its path without the extension.
+
+    The file name alone is only the visit number, which every run restarts,
+    so older files without the ID are at least told apart by their run directory.
+    """
+    for row in rows:
+        value = row.get(GL_BROWSER_COLUMNS['meeting_id'])
+        if isinstance(value, dict) and _text(value.get('text')):
+            return _text(value.get('text'))
+    return os.path.splitext(filename)[0].replace(os.sep, '/')
+
+
+def page_data_source(data):
+    """ISS page files are flat cell lists keyed by aria-describedby; glnew ones are rows keyed by header."""
+    if data and isinstance(data[0], dict) and 'aria_describedby' in data[0]:
+        return SOURCE_ISS
+    return SOURCE_GL_BROWSER
+
+
+def iter_grid_rows(cells):
+    """Group the flat cells of an ISS page file into ``{column: cell}`` rows: a column seen twice starts the next row."""
+    row = {}
+    for cell in cells:
+        column = cell.get('aria_describedby')
+        if column in row:
+            yield row
+            row = {}
+        row[column] = cell
+    if row:
+        yield row
+
+
+def normalize_listing_rows(data):
+    """Meetings (ID, company, date, ...) listed in an ISS or glnew page file, as ``(source, meetings)``.
+
+    Rows without a Meeting ID, as in files saved before the scrapers added it, are skipped.
+    """
+    source = page_data_source(data)
+    if source == SOURCE_ISS:
+        rows, columns = iter_grid_rows(data), ISS_LISTING_COLUMNS
+    else:
+        rows, columns = data, GL_BROWSER_LISTING_COLUMNS
+
+    meetings = []
+    for row in rows:
+        meeting = {}
+        for field, column in columns.items():
+            value = row.get(column)
+            meeting[field] = _text(value.get('text')) if isinstance(value, dict) else None
+        if meeting['meeting_id']:
+            meeting['meeting_date'] = _iso_date(meeting['meeting_date'])
+            meetings.append(meeting)
+    return source, meetings
+
+
+def classify_file(filename):
+    """Map an output file name to the scraper and record type that produced it."""
+    name = os.path.basename(filename)
+    if name.startswith('MeetData_'):
+        return SOURCE_GL_API, 'meeting'
+    if name.startswith('PageData_'):
+        return SOURCE_GL_API, 'listing'
+    if re.match(r'meeting_data_.+_\d+\.json$', name):
+        return SOURCE_ISS, 'meeting'
+    if re.match(r'meeting_data_\d+\.json$', name):
+        return SOURCE_GL_BROWSER, 'meeting'
+    return None, None
+
+
+def open_ndjson(path, mode='r'):
+    """Text stream over an output_sink NDJSON file (plain, gzip or zstd by extension), for ``'r'`` or ``'w'``."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("Reading or writing .zst output needs the 'zstandard' package")
+        if mode == 'w':
+            raw = zstandard.ZstdCompressor().stream_writer(open(path, 'wb'))
+        else:
+            raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True)
+        return io.TextIOWrapper(raw, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def iter_ndjson(path):
+    """Yield ``(file, data)`` pairs from an output_sink NDJSON file (plain, gzip or zstd).
+
+    The elements of a streamed list record are gathered back into one list, so a
+    record reads the same as its JSON file. Only the stream being read is held:
+    it ends at the next streamed line of another file, or of a restart at index 0.
+    """
+    streamed_file, items = None, []
+    with open_ndjson(path) as stream:
+        for line in stream:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if 'index' not in entry:
+                # Whole records may be written while a list is still being streamed
+                yield entry['file'], entry['data']
+                continue
+            if entry['file'] != streamed_file or entry['index'] == 0:
+                if streamed_file is not None:
+                    yield streamed_file, items
+                streamed_file, items = entry['file'], []
+            items.append(entry['data'])
+    if streamed_file is not None:
+        yield streamed_file, items
+
+
+class VoteStore:
+    """SQLite store of normalised meetings, proposals and fund votes from all three scrapers."""
+
+    def __init__(self, path=VOTE_STORE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(SCHEMA)
+
+    def upsert_meeting(self, source, meeting, proposals=None, votes=None, source_file=None):
+        """Insert or update a meeting. Proposals/votes, when given, replace the stored ones."""
+        meeting_id = meeting['meeting_id']
+        meeting_key = f'{source}:{meeting_id}'
+        with self.conn:
+            # COALESCE keeps fields a richer earlier record supplied (e.g. company from the listing)
+            self.conn.execute("""
+                INSERT INTO meetings (meeting_key, source, meeting_id, company, ticker, country, meeting_date,
+                                      meeting_type, source_file, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (meeting_key) DO UPDATE SET
+                    company = COALESCE(excluded.company, meetings.company),
+                    ticker = COALESCE(excluded.ticker, meetings.ticker),
+                    country = COALESCE(excluded.country, meetings.country),
+                    meeting_date = COALESCE(excluded.meeting_date, meetings.meeting_date),
+                    meeting_type = COALESCE(excluded.meeting_type, meetings.meeting_type),
+                    source_file = COALESCE(excluded.source_file, meetings.source_file),
+                    updated_at = excluded.updated_at
+            """, (meeting_key, source, meeting_id, meeting.get('company'), meeting.get('ticker'),
+                  meeting.get('country'), meeting.get('meeting_date'), meeting.get('meeting_type'),
+                  source_file, time.time()))
+
+            if proposals is None and votes is None:
+                return meeting_key
+
+            # A re-scrape is the new truth for this meeting's ballot
+            self.conn.execute('DELETE FROM fund_votes WHERE meeting_key = ?', (meeting_key,))
+            self.conn.execute('DELETE FROM proposals WHERE meeting_key = ?', (meeting_key,))
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO proposals (meeting_key, item, description, proponent, mgmt_rec) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(meeting_key, p['item'], p['description'], p['proponent'], p['mgmt_rec']) for p in proposals or []]
+            )
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO fund_votes (meeting_key, item, fund_id, fund_name, vote, for_against_mgmt, shares) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(meeting_key, v['item'], v['fund_id'], v['fund_name'], v['vote'], v['for_against_mgmt'], v['shares'])
+                 for v in votes or []]
+            )
+        return meeting_key
+
+    def ingest_record(self, filename, data):
+        """Normalise and store one output record. Returns the number of meetings stored."""
+        source, kind = classify_file(filename)
+        stem = os.path.splitext(os.path.basename(filename))[0]
+
+        if source == SOURCE_GL_API and kind == 'listing':
+            count = 0
+            for listed in data:
+                meeting, _, _ = normalize_api_meeting(listed)
+                if meeting['meeting_id']:
+                    self.upsert_meeting(source, meeting, source_file=filename)
+                    count += 1
+            return count
+
+        if source == SOURCE_GL_API:
+            meeting, proposals, votes = normalize_api_meeting(data)
+            if not meeting['meeting_id']:
+                meeting['meeting_id'] = stem
+            self.upsert_meeting(source, meeting, proposals, votes, source_file=filename)
+            return 1
+
+        if source == SOURCE_ISS:
+            proposals, votes = normalize_ballot_rows(data.get('Details', []), ISS_COLUMNS)
+            meeting = {'meeting_id': _text(data.get('Meeting ID')) or stem}
+            self.upsert_meeting(source, meeting, proposals, votes, source_file=filename)
+            return 1
+
+        if source == SOURCE_GL_BROWSER:
+            proposals, votes = normalize_ballot_rows(data, GL_BROWSER_COLUMNS)
+            meeting = {'meeting_id': gl_browser_meeting_id(data, filename)}
+            self.upsert_meeting(source, meeting, proposals, votes, source_file=filename)
+            return 1
+
+        if PAGE_DATA_PATTERN.match(os.path.basename(filename)):
+            # The browser listings are where those scrapers' company and meeting date come from
+            source, meetings = normalize_listing_rows(data)
+            for meeting in meetings:
+                self.upsert_meeting(source, meeting, source_file=filename)
+            return len(meetings)
+
+        return 0
+
+    def ingest_directory(self, directory):
+        """Ingest every recognised JSON and NDJSON output file under ``directory``."""
+        count = 0
+        for path in sorted(glob.glob(os.path.join(directory, '**', '*.json'), recursive=True)):
+            if classify_file(path)[0] is None and not PAGE_DATA_PATTERN.match(os.path.basename(path)):
+                continue
+            with open(path, 'r', encoding='utf-8') as json_file:
+                count += self.ingest_record(path, json.load(json_file))
+
+        for path in sorted(glob.glob(os.path.join(directory, '**', '*.ndjson*'), recursive=True)):
+            for filename, data in iter_ndjson(path):
+                count += self.ingest_record(filename, data)
+        return count
+
+    def fund_votes(self, fund_id=None, company=None, start_date=None, end_date=None, source=None):
+        """How did fund X vote on company Y: one dict per fund vote, newest meetings first."""
+        clauses = []
+        params = []
+        if fund_id is not None:
+            clauses.append('v.fund_id = ?')
+            params.append(str(fund_id))
+        if company is not None:
+            clauses.append('m.company LIKE ? COLLATE NOCASE')
+            params.append(f'%{company}%')
+        if start_date is not None:
+            clauses.append('m.meeting_date >= ?')
+            params.append(start_date)
+        if end_date is not None:
+            clauses.append('m.meeting_date <= ?')
+            params.append(end_date)
+        if source is not None:
+            clauses.append('m.source = ?')
+            params.append(source)
+        where = ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+
+        rows = self.conn.execute(f"""
+            SELECT m.source, m.meeting_id, m.company, m.meeting_date, p.item, p.description, p.proponent,
+                   p.mgmt_rec, v.fund_id, v.fund_name, v.vote, v.for_against_mgmt, v.shares
+            FROM fund_votes v
+            JOIN meetings m ON m.meeting_key = v.meeting_key
+            LEFT JOIN proposals p ON p.meeting_key = v.meeting_key AND p.item = v.item
+            {where}
+            ORDER BY m.meeting_date DESC, m.company, v.item
+        """, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def meetings(self, company=None, start_date=None, end_date=None, source=None):
+        """List stored meetings, optionally filtered by company, date range and source."""
+        clauses = []
+        params = []
+        if company is not None:
+            clauses.append('company LIKE ? COLLATE NOCASE')
+            params.append(f'%{company}%')
+        if start_date is not None:
+            clauses.append('meeting_date >= ?')
+            params.append(start_date)
+        if end_date is not None:
+            clauses.append('meeting_date <= ?')
+            params.append(end_date)
+        if source is not None:
+            clauses.append('source = ?')
+            params.append(source)
+        where = ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+        rows = self.conn.execute(f'SELECT * FROM meetings {where} ORDER BY meeting_date DESC, company', params)
+        return [dict(row) for row in rows.fetchall()]
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    directory = input("Enter the directory of scraped files: ")
+    store = VoteStore(input(f"Enter the vote store path [{VOTE_STORE_PATH}]: ") or VOTE_STORE_PATH)
+    print(f"Stored {store.ingest_directory(directory)} meetings in {store.path}")
+    store.close()
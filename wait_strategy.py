@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import logging
+import threading
+import contextlib
+from collections import deque
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from scrape_metrics import get_metrics
+
+WAIT_MIN_MS = int(os.environ.get('SCRAPE_WAIT_MIN_MS', '2000'))
+WAIT_MAX_MS = int(os.environ.get('SCRAPE_WAIT_MAX_MS', '30000'))
+WAIT_MULTIPLIER = float(os.environ.get('SCRAPE_WAIT_MULTIPLIER', '4'))
+
+
+class WaitTimeout(Exception):
+    """A wait the caller cannot carry on without timed out."""
+
+
+class AdaptiveTimeout:
+    """A timeout learned from how long one kind of transition has actually taken.
+
+    Until a few waits have been observed it stays at the ceiling. After that it
+    is the slowest recent wait times ``multiplier``, kept between ``floor_ms``
+    and ``ceiling_ms``. A wait that times out doubles it, so a site that slows
+    down is given room again.
+    """
+
+    def __init__(self, name, floor_ms=WAIT_MIN_MS, ceiling_ms=WAIT_MAX_MS, multiplier=WAIT_MULTIPLIER, window=20):
+        self.name = name
+        self.floor_ms = floor_ms
+        self.ceiling_ms = ceiling_ms
+        self.multiplier = multiplier
+        self.samples = deque(maxlen=window)
+        self.lock = threading.Lock()
+        self.current_ms = ceiling_ms
+
+    def observe(self, elapsed_ms):
+        with self.lock:
+            self.samples.append(elapsed_ms)
+            if len(self.samples) >= 3:
+                self.current_ms = min(self.ceiling_ms, max(self.floor_ms, max(self.samples) * self.multiplier))
+
+    def timed_out(self):
+        with self.lock:
+            self.current_ms = min(self.ceiling_ms, self.current_ms * 2)
+
+    def timeout_ms(self):
+        with self.lock:
+            return self.current_ms
+
+
+_timeouts = {}
+_timeouts_lock = threading.Lock()
+
+
+def adaptive_timeout(name):
+    with _timeouts_lock:
+        timeout = _timeouts.get(name)
+        if timeout is None:
+            timeout = _timeouts[name] = AdaptiveTimeout(name)
+        return timeout
+
+
+def timed_wait(name, wait):
+    """Run ``wait(timeout_ms)``, learn from how long it took, and record it under stage ``wait_<name>``.
+
+    Returns False instead of raising when the wait times out: the callers
+    used to sleep blindly, so carrying on is never worse than before.
+    """
+    timeout = adaptive_timeout(name)
+    metrics = get_metrics()
+    started = time.perf_counter()
+    try:
+        wait(timeout.timeout_ms())
+    except PlaywrightTimeoutError:
+        metrics.observe(f'wait_{name}', time.perf_counter() - started)
+        metrics.inc('wait_timeouts_total', wait=name)
+        logging.warning("Timed out after %d ms waiting for %s", timeout.timeout_ms(), name)
+        timeout.timed_out()
+        return False
+
+    elapsed = time.perf_counter() - started
+    metrics.observe(f'wait_{name}', elapsed)
+    timeout.observe(elapsed * 1000)
+    metrics.set_gauge(f'wait_{name}_timeout_ms', timeout.timeout_ms())
+    return True
+
+
+def row_set(selector):
+    """JS expression for the text of every element matching ``selector``: changes when the grid's rows do."""
+    return f"Array.from(document.querySelectorAll({json.dumps(selector)})).map(el => el.textContent).join('\\u0001')"
+
+
+@contextlib.contextmanager
+def wait_for_change(page, name, expression, required=False):
+    """Wait, after the enclosed action, until the JS ``expression`` evaluates to something new.
+
+    Use with ``row_set`` for "grid row set changed". An empty or missing value
+    never counts as the change, since grids clear themselves before they refill. With ``required`` a
+    timeout raises WaitTimeout, for callers that would otherwise read the
+    old content.
+    """
+    before = page.evaluate(f"() => {expression}")
+    yield
+    changed = timed_wait(name, lambda timeout_ms: page.wait_for_function(
+        f"(before) => {{ const now = {expression}; return Boolean(now) && now !== before; }}",
+        arg=before, timeout=timeout_ms))
+    if required and not changed:
+        raise WaitTimeout(f"{name} did not change")
+
+
+@contextlib.contextmanager
+def wait_for_xhr(page, name, url_part):
+    """Wait for the XHR or fetch whose URL contains ``url_part`` that the enclosed action triggers."""
+    def matches(response):
+        return url_part in response.url and response.request.resource_type in ('xhr', 'fetch')
+
+    timeout = adaptive_timeout(name)
+    started = time.perf_counter()
+    acted = False
+    try:
+        with page.expect_response(matches, timeout=timeout.timeout_ms()):
+            yield
+            acted = True
+    except PlaywrightTimeoutError:
+        if not acted:
+            raise  # The action itself timed out, which is the caller's error to handle
+        get_metrics().inc('wait_timeouts_total', wait=name)
+        logging.warning("Timed out after %d ms waiting for %s", timeout.timeout_ms(), name)
+        timeout.timed_out()
+    else:
+        timeout.observe((time.perf_counter() - started) * 1000)
+    get_metrics().observe(f'wait_{name}', time.perf_counter() - started)
+
+
+def wait_for_selector(page, name, selector, state='visible'):
+    return timed_wait(name, lambda timeout_ms: page.wait_for_selector(selector, state=state, timeout=timeout_ms))
+
+
+def wait_for_enabled(page, name, selector):
+    """Wait until the element matching ``selector`` exists and is no longer disabled."""
+    return timed_wait(name, lambda timeout_ms: page.wait_for_function(
+        "(selector) => { const el = document.querySelector(selector); return el !== null && !el.disabled; }",
+        arg=selector, timeout=timeout_ms))